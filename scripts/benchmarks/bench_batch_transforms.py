@@ -0,0 +1,112 @@
+"""
+Benchmark: Transformaciones de ejemplo de batch_processing
+==========================================================
+
+Compara clean_sales_data y enrich_customer_data actuales (máscara única,
+sin copias defensivas, categóricos por códigos) con las versiones
+anteriores (df.copy() + drop_duplicates + dropna, pd.cut con etiquetas).
+Para cada caso informa el mejor tiempo y el pico de memoria asignada
+(tracemalloc) por chunk.
+
+Uso:
+    python bench_batch_transforms.py --rows 100000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'pipelines'))
+
+from batch_processing import clean_sales_data, enrich_customer_data  # noqa: E402
+
+
+def legacy_clean_sales_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Versión anterior de clean_sales_data"""
+    df = df.copy()
+    df = df.drop_duplicates()
+    df = df.dropna(subset=['cantidad', 'precio_unitario'])
+    df['total'] = df['cantidad'] * df['precio_unitario']
+    df['processed_at'] = datetime.now()
+    return df
+
+
+def legacy_enrich_customer_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Versión anterior de enrich_customer_data"""
+    df = df.copy()
+    df['age_group'] = pd.cut(df['edad'], bins=[0, 25, 35, 50, 100], labels=['18-25', '26-35', '36-50', '51+'])
+    df['value_segment'] = pd.cut(
+        df['total_gastado'], bins=[0, 1000, 5000, float('inf')], labels=['Low', 'Medium', 'High']
+    )
+    return df
+
+
+def build_sales(rows: int) -> pd.DataFrame:
+    """Chunk sintético de ventas (~1% duplicados y ~1% nulos)"""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'venta_id': np.arange(rows),
+        'cliente_id': rng.integers(1, 10_000, rows),
+        'producto': rng.choice(['A', 'B', 'C', 'D'], rows),
+        'cantidad': rng.integers(1, 20, rows).astype(float),
+        'precio_unitario': rng.uniform(1, 500, rows).round(2),
+    })
+    df.loc[rng.choice(rows, rows // 100, replace=False), 'cantidad'] = np.nan
+    df.iloc[-rows // 100:] = df.iloc[:rows // 100].to_numpy()
+    return df
+
+
+def build_customers(rows: int) -> pd.DataFrame:
+    """Chunk sintético de clientes"""
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        'cliente_id': np.arange(rows),
+        'edad': rng.integers(18, 90, rows),
+        'total_gastado': rng.exponential(2000, rows).round(2),
+    })
+
+
+def measure(func, df: pd.DataFrame, repeat: int) -> tuple:
+    """Mejor tiempo (segundos) y pico de memoria asignada (bytes) de func(df)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    """Ejecutar el benchmark e imprimir tiempo y memoria por caso"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    sales = build_sales(args.rows)
+    customers = build_customers(args.rows)
+    cases = [
+        ('clean_sales (anterior)', legacy_clean_sales_data, sales),
+        ('clean_sales (actual)', clean_sales_data, sales),
+        ('enrich_customer (anterior)', legacy_enrich_customer_data, customers),
+        ('enrich_customer (actual)', enrich_customer_data, customers),
+    ]
+
+    print(f"\n{'caso':<28}{'ms':>10}{'pico MB':>10}")
+    for name, func, df in cases:
+        seconds, peak = measure(func, df, args.repeat)
+        print(f"{name:<28}{seconds * 1000:>10.2f}{peak / 1024 ** 2:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
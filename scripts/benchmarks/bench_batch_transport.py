@@ -0,0 +1,90 @@
+"""
+Benchmark: Transporte de chunks entre BatchProcessor y sus workers
+==================================================================
+
+Mide el costo de enviar un chunk numérico ancho a un worker del pool y
+recibir el resultado (transformación identidad, solo IPC):
+
+- pickle: lo que hace Pool.map/imap con DataFrames (serializar, pasar por
+  el pipe y deserializar, ida y vuelta)
+- shared_memory: descriptores de frame_to_shared_memory; por el pipe solo
+  viaja el descriptor y cada grupo de columnas se copia una vez por sentido
+
+Uso:
+    python bench_batch_transport.py --rows 100000 --cols 50
+"""
+
+import argparse
+import multiprocessing as mp
+from multiprocessing import resource_tracker
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'pipelines'))
+
+from batch_processing import frame_from_shared_memory, frame_to_shared_memory  # noqa: E402
+
+
+def build_frame(rows: int, cols: int) -> pd.DataFrame:
+    """Chunk sintético numérico ancho"""
+    rng = np.random.default_rng(42)
+    data = {f"f{i}": rng.random(rows) for i in range(cols - 1)}
+    data['id'] = np.arange(rows)
+    return pd.DataFrame(data)
+
+
+def pickle_identity(df: pd.DataFrame) -> pd.DataFrame:
+    """Worker: recibe y devuelve el DataFrame por pickle"""
+    return df
+
+
+def shared_identity(descriptor: dict) -> dict:
+    """Worker: recibe y devuelve el DataFrame por memoria compartida"""
+    df = frame_from_shared_memory(descriptor, unlink=True)
+    return frame_to_shared_memory(df)
+
+
+def best_of(func, repeat: int) -> float:
+    """Mejor tiempo (segundos) de func"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Ejecutar el benchmark e imprimir tiempos por transporte"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--cols', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = build_frame(args.rows, args.cols)
+    megabytes = df.memory_usage(index=False).sum() / 1024 ** 2
+    print(f"\nChunk: {args.rows:,} filas x {args.cols} columnas ({megabytes:.1f} MB)")
+
+    resource_tracker.ensure_running()
+    with mp.Pool(processes=1) as pool:
+        cases = [
+            ('pickle', lambda: pool.apply(pickle_identity, (df,))),
+            ('shared_memory', lambda: frame_from_shared_memory(
+                pool.apply(shared_identity, (frame_to_shared_memory(df),)), unlink=True
+            )),
+        ]
+        print(f"\n{'transporte':<16}{'ms/chunk':>10}{'MB/s':>10}{'speedup':>10}")
+        baseline = None
+        for name, func in cases:
+            seconds = best_of(func, args.repeat)
+            baseline = baseline or seconds
+            print(f"{name:<16}{seconds * 1000:>10.1f}{2 * megabytes / seconds:>10,.0f}{baseline / seconds:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
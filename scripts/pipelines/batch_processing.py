@@ -4,21 +4,56 @@ Script de Procesamiento por Lotes (Batch Processing)
 
 Pipeline para procesamiento por lotes de grandes volúmenes de datos:
 - Lectura eficiente de datos en chunks
-- Procesamiento paralelo con multiprocessing
+- Procesamiento paralelo con multiprocessing en streaming (prefetch acotado)
 - Agregaciones y transformaciones complejas
 - Monitoreo de progreso y rendimiento
+- Modo por rangos de bytes: cada worker lee y parsea su parte del archivo
+- Transporte por memoria compartida de columnas numéricas (sin pickle)
+- Agregación por clave con estados parciales combinables (HyperLogLog,
+  t-digest) y reducción en árbol en paralelo, con volcado a disco por
+  buckets de hash si se fija un presupuesto de memoria
+- Modo supervisado: reintentos con backoff, reemplazo de workers caídos y
+  cuarentena de chunks que fallan repetidamente
+- Perfilado por etapa y por worker (BatchProfiler) con percentiles y salida
+  JSON lines o Prometheus
+- Deduplicación entre chunks por hash de columnas clave (SeenKeys)
 """
 
 import pandas as pd
 import numpy as np
+import heapq
+import io
+import json
 import logging
+import mmap
+import os
+import pickle
+import shutil
+import sys
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Callable
+from typing import List, Dict, Any, Callable, Iterator, Optional
 import multiprocessing as mp
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from functools import partial
+from multiprocessing import resource_tracker, shared_memory
 import time
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from .hashed_keys import HashJournal, HashedKeySet, hash_rows
+except ImportError:  # Ejecutado como script, con scripts/pipelines en sys.path
+    from hashed_keys import HashJournal, HashedKeySet, hash_rows
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,20 +62,1461 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class SeenKeys:
+    """
+    Conjunto de claves ya vistas, guardadas como hashes uint64
+    
+    Las claves de cada fila se reducen a un hash de 64 bits de forma
+    vectorizada y se guardan en un HashedKeySet (corridas ordenadas de NumPy
+    con fusión por niveles, 8 bytes por clave), de modo que los duplicados
+    entre chunks se detectan sin conservar las filas. La comparación es
+    exacta sobre el hash, no sobre la clave (ver hashed_keys).
+    
+    Con filter(df, commit=False) las claves nuevas quedan pendientes hasta
+    commit(), que se llama tras escribir el chunk: si la escritura falla el
+    chunk puede reintentarse sin que sus filas cuenten como duplicadas.
+    
+    Con 'state_path' (.npy) el conjunto persiste entre ejecuciones; save()
+    solo anexa las claves confirmadas desde el último guardado a un
+    HashJournal y reescribe el .npy cuando el registro supera al estado.
+    """
+    
+    def __init__(self, columns: Optional[List[str]] = None, state_path: Optional[str] = None):
+        """
+        Args:
+            columns: Columnas clave (None = todas las columnas)
+            state_path: Archivo .npy para persistir los hashes entre ejecuciones
+        """
+        self.columns = list(columns) if columns else None
+        self.state_path = Path(state_path) if state_path else None
+        self.dropped = 0
+        self._pending: Optional[np.ndarray] = None
+        self._pending_dropped = 0
+        self._unsaved: List[np.ndarray] = []
+        self._saved = 0
+        self._journal = None
+        hashes = None
+        if self.state_path is not None:
+            self._journal = HashJournal(self.state_path)
+            if self.state_path.exists():
+                hashes = np.load(self.state_path)
+                self._saved = len(hashes)
+            if self._journal.entries:
+                # unique: una compactación interrumpida deja el registro duplicado
+                hashes = np.unique(np.concatenate([
+                    hashes if hashes is not None else np.empty(0, dtype=np.uint64),
+                    self._journal.read()
+                ]))
+        self._keys = HashedKeySet(hashes)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def filter(self, df: pd.DataFrame, commit: bool = True) -> pd.DataFrame:
+        """
+        Descartar filas cuya clave ya se vio (en el chunk o en chunks previos)
+        
+        Args:
+            df: Chunk a deduplicar
+            commit: Registrar ya las claves nuevas (False = quedan pendientes
+                hasta commit(); un nuevo filter descarta las no confirmadas)
+            
+        Returns:
+            Chunk sin duplicados
+        """
+        self._pending = None
+        self._pending_dropped = 0
+        if df.empty:
+            return df
+        hashes = hash_rows(df, self.columns)
+        first = self._keys.first_unseen(hashes)
+        self._pending = hashes[first]
+        self._pending_dropped = len(df) - len(first)
+        if commit:
+            self.commit()
+        
+        if len(first) == len(df):
+            return df
+        return df.take(first)
+    
+    def commit(self) -> None:
+        """Registrar las claves del último chunk filtrado (tras escribirlo)"""
+        if self._pending is None:
+            return
+        self._keys.add(self._pending)
+        self._unsaved.append(self._pending)
+        self.dropped += self._pending_dropped
+        self._pending = None
+        self._pending_dropped = 0
+    
+    def save(self) -> None:
+        """Persistir las claves confirmadas (si hay state_path)"""
+        if self.state_path is None:
+            return
+        new = np.concatenate(self._unsaved) if self._unsaved else np.empty(0, dtype=np.uint64)
+        self._unsaved = []
+        if self.state_path.exists() and self._journal.entries + len(new) <= self._saved:
+            self._journal.append(new)
+            return
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, self._keys.to_array())
+        tmp_path.replace(self.state_path)
+        self._saved = len(self._keys)
+        self._journal.clear()
+
+
+SHARED_DTYPE_KINDS = 'biufcmM'
+
+
+def frame_to_shared_memory(df: pd.DataFrame, name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Copiar las columnas numéricas de un DataFrame a un bloque de memoria compartida
+    
+    Las columnas se agrupan por dtype en matrices contiguas (una por dtype,
+    como los bloques internos de pandas) y se devuelve un descriptor ligero
+    (nombre del bloque y posición de cada grupo) que se envía a otro proceso
+    en lugar del DataFrame serializado. Las columnas no numéricas viajan
+    aparte por pickle. El bloque debe liberarse con
+    frame_from_shared_memory(..., unlink=True) o release_shared_memory.
+    
+    Args:
+        df: DataFrame a compartir
+        name: Nombre del bloque (None = nombre aleatorio)
+        
+    Returns:
+        Descriptor del DataFrame en memoria compartida
+    """
+    groups: Dict[str, List[int]] = {}
+    rest_positions = []
+    for position, dtype in enumerate(df.dtypes):
+        if isinstance(dtype, np.dtype) and dtype.kind in SHARED_DTYPE_KINDS:
+            groups.setdefault(dtype.str, []).append(position)
+        else:
+            rest_positions.append(position)
+    
+    layout = []
+    offset = 0
+    for dtype, positions in groups.items():
+        layout.append((dtype, positions, offset))
+        nbytes = len(positions) * len(df) * np.dtype(dtype).itemsize
+        offset += -(-nbytes // 8) * 8  # alinear a 8 bytes
+    
+    shm = shared_memory.SharedMemory(name=name, create=True, size=max(offset, 1))
+    try:
+        for dtype, positions, start in layout:
+            block = np.ndarray((len(positions), len(df)), dtype=dtype, buffer=shm.buf, offset=start)
+            for row, position in enumerate(positions):
+                block[row] = df.iloc[:, position].to_numpy()
+            del block
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    
+    rest = None
+    if rest_positions:
+        rest = df.iloc[:, rest_positions].set_axis(rest_positions, axis=1)
+    return {
+        'shm': shm.name,
+        'rows': len(df),
+        'layout': layout,
+        'columns': list(df.columns),
+        'index': df.index,
+        'rest': rest
+    }
+
+
+def frame_from_shared_memory(descriptor: Dict[str, Any], unlink: bool = False) -> pd.DataFrame:
+    """
+    Reconstruir un DataFrame a partir de su descriptor de memoria compartida
+    
+    Cada grupo de columnas se copia una sola vez desde el bloque compartido
+    (sin deserializar) y se usa como bloque del DataFrame sin más copias,
+    de modo que el resultado no depende del bloque compartido.
+    
+    Args:
+        descriptor: Descriptor creado por frame_to_shared_memory
+        unlink: Liberar el bloque tras leerlo
+        
+    Returns:
+        DataFrame reconstruido
+    """
+    rows = descriptor['rows']
+    frames = []
+    shm = shared_memory.SharedMemory(name=descriptor['shm'])
+    try:
+        for dtype, positions, start in descriptor['layout']:
+            block = np.ndarray((len(positions), rows), dtype=dtype, buffer=shm.buf, offset=start).copy()
+            frames.append(pd.DataFrame(block.T, columns=positions, copy=False))
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+    
+    if descriptor['rest'] is not None:
+        frames.append(descriptor['rest'].reset_index(drop=True))
+    
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, axis=1, copy=False)
+    order = list(range(len(descriptor['columns'])))
+    if list(df.columns) != order:
+        df = df[order]
+    df.columns = descriptor['columns']
+    df.index = descriptor['index']
+    return df
+
+
+def result_block_name(source: str) -> str:
+    """
+    Nombre del bloque de resultado de un chunk compartido
+    
+    Se deriva del bloque de entrada para que el proceso principal pueda
+    liberar los resultados que un worker creó pero nunca llegaron a leerse
+    (p. ej. si la escritura se interrumpe o el pool se termina).
+    """
+    return f"{source.lstrip('/')}r"
+
+
+def release_shared_memory(name: str) -> None:
+    """Liberar un bloque de memoria compartida si aún existe"""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pico de memoria residente del proceso actual en bytes (None si no disponible)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB, macOS bytes
+    return int(peak) if sys.platform == 'darwin' else int(peak) * 1024
+
+
+def estimate_frame_bytes(df: pd.DataFrame, sample_rows: int = 1000) -> int:
+    """
+    Estimar la memoria de un DataFrame sin recorrer todas sus cadenas
+    
+    Las columnas de dtype NumPy no objeto se miden de forma exacta (nbytes);
+    las de objeto (cadenas) se miden con memory_usage(deep=True) sobre una
+    muestra de filas equiespaciadas y se escalan al total. Cuesta O(columnas
+    + sample_rows) en lugar de O(filas) como memory_usage(deep=True).
+    
+    Args:
+        df: DataFrame a medir
+        sample_rows: Filas de la muestra para las columnas de objeto
+        
+    Returns:
+        Bytes estimados (columnas e índice)
+    """
+    shallow = df.memory_usage(index=True, deep=False)
+    object_columns = [col for col, dtype in df.dtypes.items() if dtype == object]
+    if not object_columns or len(df) == 0:
+        return int(shallow.sum())
+    positions = np.linspace(0, len(df) - 1, num=min(sample_rows, len(df)), dtype=np.int64)
+    sample = df.iloc[positions][object_columns]
+    deep_sample = sample.memory_usage(index=False, deep=True)
+    object_bytes = float(deep_sample.sum()) * len(df) / len(positions)
+    object_shallow = float(df[object_columns].memory_usage(index=False, deep=False).sum())
+    return int(shallow.sum() - object_shallow + object_bytes)
+
+
+def _timed_iter(iterable) -> Iterator[tuple]:
+    """Iterar devolviendo (elemento, segundos que tardó en producirse)"""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        yield item, time.perf_counter() - start
+
+
+class BatchProfiler:
+    """
+    Instrumentación por chunk y por worker de un procesamiento por lotes
+    
+    Por chunk registra tiempos de lectura/parseo, transformación y escritura,
+    filas de entrada/salida, bytes del chunk, pico de RSS y espera en cola
+    (paralelo). Resume cada métrica con p50/p95/p99 y calcula la utilización
+    de cada worker (tiempo ocupado / duración total). Se exporta como JSON
+    lines o en formato de texto de Prometheus.
+    """
+    
+    STAGES = ('read', 'transform', 'write', 'queue_wait')
+    QUANTILES = (0.5, 0.95, 0.99)
+    
+    def __init__(self, job: str = 'batch'):
+        """
+        Args:
+            job: Nombre del trabajo (etiqueta 'job' en Prometheus)
+        """
+        self.job = job
+        self.chunks: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+    
+    def start(self) -> None:
+        """Iniciar (o reiniciar) la medición"""
+        self.chunks = []
+        self.started = time.perf_counter()
+        self.duration = None
+    
+    def stop(self) -> None:
+        """Cerrar la medición (fija la duración total)"""
+        self.duration = time.perf_counter() - self.started
+    
+    def record_chunk(self, **fields: Any) -> None:
+        """
+        Registrar las métricas de un chunk
+        
+        Campos habituales: chunk, worker, read_seconds, transform_seconds,
+        write_seconds, queue_wait_seconds, rows_in, rows_out, bytes_in,
+        peak_rss_bytes
+        """
+        self.chunks.append(fields)
+    
+    def _values(self, field: str) -> np.ndarray:
+        return np.array([chunk[field] for chunk in self.chunks if chunk.get(field) is not None], dtype=np.float64)
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Resumen de métricas
+        
+        Returns:
+            Diccionario con, por etapa, total/mean/p50/p95/p99 en segundos;
+            totales de filas y bytes; pico de RSS; y por worker chunks,
+            segundos ocupados y utilización
+        """
+        duration = self.duration if self.duration is not None else time.perf_counter() - self.started
+        summary = {'job': self.job, 'chunks': len(self.chunks), 'duration': duration, 'stages': {}}
+        for stage in self.STAGES:
+            values = self._values(f"{stage}_seconds")
+            if len(values) == 0:
+                continue
+            stage_summary = {'total': float(values.sum()), 'mean': float(values.mean())}
+            for q in self.QUANTILES:
+                stage_summary[f"p{int(q * 100)}"] = float(np.percentile(values, q * 100))
+            summary['stages'][stage] = stage_summary
+        
+        for field in ('rows_in', 'rows_out', 'bytes_in'):
+            summary[field] = int(self._values(field).sum())
+        rss = self._values('peak_rss_bytes')
+        summary['peak_rss_bytes'] = int(rss.max()) if len(rss) else None
+        
+        workers: Dict[str, Dict[str, Any]] = {}
+        for chunk in self.chunks:
+            worker = workers.setdefault(str(chunk.get('worker', 'main')), {'chunks': 0, 'busy_seconds': 0.0})
+            worker['chunks'] += 1
+            worker['busy_seconds'] += chunk.get('transform_seconds') or 0.0
+        for worker in workers.values():
+            worker['utilization'] = worker['busy_seconds'] / duration if duration > 0 else 0.0
+        summary['workers'] = workers
+        return summary
+    
+    def write_jsonl(self, path: str) -> None:
+        """Escribir una línea JSON por chunk y una línea final con el resumen"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for chunk in self.chunks:
+                f.write(json.dumps({'type': 'chunk', 'job': self.job, **chunk}, default=str) + '\n')
+            f.write(json.dumps({'type': 'summary', **self.summary()}, default=str) + '\n')
+    
+    def to_prometheus(self) -> str:
+        """Métricas en formato de texto de Prometheus"""
+        summary = self.summary()
+        job = self.job.replace('"', '\\"')
+        lines = [
+            '# HELP batch_stage_seconds Duración por chunk de cada etapa',
+            '# TYPE batch_stage_seconds summary',
+        ]
+        for stage, values in summary['stages'].items():
+            for q in self.QUANTILES:
+                lines.append(
+                    f'batch_stage_seconds{{job="{job}",stage="{stage}",quantile="{q}"}} {values[f"p{int(q * 100)}"]}'
+                )
+            lines.append(f'batch_stage_seconds_sum{{job="{job}",stage="{stage}"}} {values["total"]}')
+            lines.append(f'batch_stage_seconds_count{{job="{job}",stage="{stage}"}} {summary["chunks"]}')
+        
+        lines += ['# HELP batch_rows_total Filas procesadas', '# TYPE batch_rows_total counter']
+        lines.append(f'batch_rows_total{{job="{job}",direction="in"}} {summary["rows_in"]}')
+        lines.append(f'batch_rows_total{{job="{job}",direction="out"}} {summary["rows_out"]}')
+        lines += ['# HELP batch_bytes_total Bytes en memoria de los chunks de entrada',
+                  '# TYPE batch_bytes_total counter',
+                  f'batch_bytes_total{{job="{job}"}} {summary["bytes_in"]}']
+        if summary['peak_rss_bytes'] is not None:
+            lines += ['# HELP batch_peak_rss_bytes Pico de memoria residente',
+                      '# TYPE batch_peak_rss_bytes gauge',
+                      f'batch_peak_rss_bytes{{job="{job}"}} {summary["peak_rss_bytes"]}']
+        lines += ['# HELP batch_worker_utilization Fracción del tiempo total ocupada por worker',
+                  '# TYPE batch_worker_utilization gauge']
+        for worker, values in summary['workers'].items():
+            lines.append(f'batch_worker_utilization{{job="{job}",worker="{worker}"}} {values["utilization"]}')
+        lines += ['# HELP batch_duration_seconds Duración total del trabajo',
+                  '# TYPE batch_duration_seconds gauge',
+                  f'batch_duration_seconds{{job="{job}"}} {summary["duration"]}']
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus(self, path: str) -> None:
+        """Escribir las métricas en formato Prometheus (p. ej. para node_exporter textfile)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _process_shared_chunk(task: tuple, transform_func: Callable) -> Dict[str, Any]:
+    """
+    Transformar un chunk recibido por memoria compartida (se ejecuta en el worker)
+    
+    Args:
+        task: Tupla (número de chunk, descriptor del chunk de entrada)
+        transform_func: Función de transformación
+        
+    Returns:
+        Diccionario con el descriptor del resultado ('result' es None si hubo
+        error), los segundos de transformación y métricas del worker
+    """
+    seq, descriptor = task
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        chunk_df = frame_from_shared_memory(descriptor)
+        result = frame_to_shared_memory(transform_func(chunk_df), name=result_block_name(descriptor['shm']))
+        error = None
+    except Exception as e:
+        result, error = None, str(e)
+    return {'seq': seq, 'source': descriptor['shm'], 'result': result, 'error': error,
+            'seconds': time.perf_counter() - start, 'worker': os.getpid(),
+            'started_at': started_at, 'peak_rss_bytes': peak_rss_bytes()}
+
+
+def _process_pickled_chunk(task: tuple, transform_func: Callable) -> Dict[str, Any]:
+    """
+    Transformar un chunk recibido por pickle (se ejecuta en el worker)
+    
+    Args:
+        task: Tupla (número de chunk, DataFrame del chunk)
+        transform_func: Función de transformación
+        
+    Returns:
+        Diccionario con el resultado (None si hubo error), los segundos de
+        transformación y métricas del worker
+    """
+    seq, chunk_df = task
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        result, error = transform_func(chunk_df), None
+    except Exception as e:
+        result, error = None, str(e)
+    return {'seq': seq, 'result': result, 'error': error, 'seconds': time.perf_counter() - start,
+            'worker': os.getpid(), 'started_at': started_at, 'peak_rss_bytes': peak_rss_bytes()}
+
+
+class AdaptiveChunkSizer:
+    """
+    Tamaño de chunk adaptativo según memoria y latencia medidas
+    
+    Tras cada chunk se actualiza (media móvil exponencial) la memoria por
+    fila y los segundos por fila, y el siguiente tamaño se acerca al mayor
+    que respete ambos objetivos. El cambio por paso se limita a la mitad o
+    al doble para no oscilar.
+    """
+    
+    def __init__(
+        self,
+        initial_size: int,
+        target_bytes: float,
+        target_seconds: float,
+        min_size: int = 1000,
+        max_size: int = 1_000_000,
+        smoothing: float = 0.5
+    ):
+        """
+        Args:
+            initial_size: Tamaño del primer chunk
+            target_bytes: Memoria objetivo por chunk (DataFrame de entrada)
+            target_seconds: Latencia objetivo de transformación por chunk
+            min_size: Tamaño mínimo de chunk
+            max_size: Tamaño máximo de chunk
+            smoothing: Peso de la última medición en la media móvil
+        """
+        self.size = int(min(max(initial_size, min_size), max_size))
+        self.target_bytes = target_bytes
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.smoothing = smoothing
+        self.bytes_per_row: Optional[float] = None
+        self.seconds_per_row: Optional[float] = None
+        self.history: List[int] = []
+    
+    def _smooth(self, current: Optional[float], value: float) -> float:
+        return value if current is None else self.smoothing * value + (1 - self.smoothing) * current
+    
+    def observe(self, rows: int, memory_bytes: float, seconds: float) -> None:
+        """
+        Registrar la medición de un chunk y recalcular el tamaño
+        
+        Args:
+            rows: Filas del chunk
+            memory_bytes: Memoria del DataFrame del chunk
+            seconds: Segundos de procesamiento del chunk
+        """
+        self.history.append(rows)
+        if rows == 0:
+            return
+        self.bytes_per_row = self._smooth(self.bytes_per_row, memory_bytes / rows)
+        self.seconds_per_row = self._smooth(self.seconds_per_row, seconds / rows)
+        
+        target = self.target_bytes / max(self.bytes_per_row, 1e-9)
+        if self.seconds_per_row > 0:
+            target = min(target, self.target_seconds / self.seconds_per_row)
+        target = min(max(target, self.size / 2), self.size * 2)
+        self.size = int(min(max(target, self.min_size), self.max_size))
+    
+    def report(self) -> Dict[str, Any]:
+        """Tamaños usados y mediciones, para las estadísticas"""
+        return {
+            'chunk_sizes': list(self.history),
+            'chunk_size_final': self.size,
+            'bytes_per_row': self.bytes_per_row,
+            'seconds_per_row': self.seconds_per_row
+        }
+
+
+def split_byte_ranges(input_path: str, n_parts: int) -> List[tuple]:
+    """
+    Dividir un CSV en rangos de bytes alineados a saltos de línea
+    
+    Solo se leen unos pocos bytes alrededor de cada corte, no el archivo.
+    Requiere que ningún campo entrecomillado contenga saltos de línea.
+    
+    Args:
+        input_path: Ruta del archivo CSV
+        n_parts: Número de rangos deseado
+        
+    Returns:
+        Lista de tuplas (inicio, fin) que excluyen la cabecera
+    """
+    with open(input_path, 'rb') as f:
+        header = f.readline()
+        data_start = len(header)
+        size = f.seek(0, io.SEEK_END)
+        
+        boundaries = [data_start]
+        step = max(1, (size - data_start) // max(1, n_parts))
+        for i in range(1, n_parts):
+            target = max(data_start + i * step, boundaries[-1])
+            if target >= size:
+                break
+            f.seek(target)
+            f.readline()  # avanzar hasta el final de la línea en curso
+            boundaries.append(f.tell())
+        boundaries.append(size)
+    
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+class _ByteRangeStream(io.RawIOBase):
+    """
+    Flujo binario de solo lectura sobre vistas (memoryview) de un mmap
+    
+    El parser de pandas copia los bytes directamente del mapeo a su buffer
+    con readinto, sin materializar el rango ni concatenarlo con la cabecera.
+    """
+    
+    def __init__(self, views: List[memoryview]):
+        super().__init__()
+        self._views = deque(views)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while self._views and len(self._views[0]) == 0:
+            self._views.popleft().release()
+        if not self._views:
+            return 0
+        view = self._views[0]
+        n = min(len(buffer), len(view))
+        buffer[:n] = view[:n]
+        self._views[0] = view[n:]
+        view.release()
+        return n
+    
+    def close(self) -> None:
+        while self._views:
+            self._views.popleft().release()
+        super().close()
+
+
+@contextmanager
+def open_byte_range(input_path: str, byte_range: tuple) -> Iterator[io.RawIOBase]:
+    """
+    Abrir un rango de bytes de un CSV, con la cabecera antepuesta, como flujo
+    binario para pd.read_csv
+    
+    Con mmap el flujo lee de memoryviews del mapeo (una sola copia, la del
+    parser); los archivos que no admiten mmap (p. ej. vacíos) se leen de
+    forma normal.
+    
+    Args:
+        input_path: Ruta del archivo CSV
+        byte_range: Tupla (inicio, fin) del rango
+        
+    Yields:
+        Flujo con los bytes de la cabecera seguidos de los del rango
+    """
+    start, end = byte_range
+    with open(input_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            header = f.readline()
+            f.seek(start)
+            yield io.BytesIO(header + f.read(end - start))
+            return
+        try:
+            data = memoryview(mm)
+            stream = _ByteRangeStream([data[:mm.find(b'\n') + 1], data[start:end]])
+            try:
+                yield stream
+            finally:
+                stream.close()
+                data.release()
+        finally:
+            mm.close()
+
+
+def _process_byte_range(
+    input_path: str,
+    part_path: str,
+    transform_func: Callable,
+    byte_range: tuple
+) -> Dict[str, Any]:
+    """
+    Leer, transformar y escribir un rango de bytes (se ejecuta en el worker)
+    
+    Args:
+        input_path: Ruta del archivo CSV
+        part_path: Ruta del archivo parcial de salida
+        transform_func: Función de transformación
+        byte_range: Tupla (inicio, fin) del rango
+        
+    Returns:
+        Diccionario con la ruta parcial, filas escritas y error (si lo hubo)
+    """
+    start, end = byte_range
+    try:
+        with open_byte_range(input_path, byte_range) as data:
+            chunk_df = pd.read_csv(data)
+        transformed = transform_func(chunk_df)
+        transformed.to_csv(part_path, index=False)
+        return {'part': part_path, 'rows': len(transformed), 'error': None}
+        
+    except Exception as e:
+        return {'part': None, 'rows': 0, 'error': f"{start}-{end}: {str(e)}"}
+
+
+def merge_part_files(part_paths: List[str], output_path: str) -> None:
+    """
+    Unir archivos CSV parciales en uno solo conservando una única cabecera
+    
+    Las partes con la misma cabecera que la primera se copian byte a byte;
+    una parte con otras columnas u otro orden se reindexa a las columnas de
+    la primera parte con filas para no desalinear los valores; las partes
+    sin filas (p. ej. un DataFrame vacío sin columnas) se omiten.
+    
+    Args:
+        part_paths: Rutas parciales en el orden deseado
+        output_path: Ruta del archivo final
+    """
+    with open(output_path, 'wb') as out:
+        first_header = columns = None
+        for part_path in part_paths:
+            with open(part_path, 'rb') as part:
+                header = part.readline()
+                if not part.peek(1):
+                    continue
+                if first_header is None:
+                    first_header = header
+                    columns = pd.read_csv(io.BytesIO(header)).columns
+                    out.write(header)
+                if header == first_header:
+                    shutil.copyfileobj(part, out, 1024 * 1024)
+                    continue
+                part.seek(0)
+                pd.read_csv(part).reindex(columns=columns).to_csv(out, header=False, index=False)
+        if first_header is None and part_paths:
+            # Ninguna parte con filas: salida con la cabecera de la primera
+            with open(part_paths[0], 'rb') as part:
+                out.write(part.readline())
+
+
+# Estados parciales de agregación
+MAX_SPILL_LEVELS = 4  # niveles de repartición de un bucket que no cabe en el presupuesto
+SCALAR_MERGE = {'sum': 'sum', 'count': 'sum', 'size': 'sum', 'min': 'min', 'max': 'max'}
+SCALAR_AGGS = {
+    'sum': ('sum',),
+    'count': ('count',),
+    'size': ('size',),
+    'mean': ('sum', 'count'),
+    'min': ('min',),
+    'max': ('max',),
+}
+QUANTILE_AGGS = {'median': 0.5}
+
+
+def _agg_quantile(agg: str) -> Optional[float]:
+    """Cuantil de una agregación 'median' o 'pNN' (p. ej. 'p95', 'p99.9'); None si no lo es"""
+    if agg in QUANTILE_AGGS:
+        return QUANTILE_AGGS[agg]
+    if agg.startswith('p'):
+        try:
+            q = float(agg[1:]) / 100
+        except ValueError:
+            return None
+        if 0 <= q <= 1:
+            return q
+    return None
+
+
+def _group_starts(codes: np.ndarray) -> np.ndarray:
+    """Posiciones donde empieza cada grupo en un arreglo de códigos ordenado"""
+    if len(codes) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+
+def _hll_registers(codes: np.ndarray, values: pd.Series, n_groups: int, precision: int) -> np.ndarray:
+    """
+    Registros HyperLogLog por grupo (n_groups x 2^precision, uint8)
+    
+    Los valores numéricos se hashean como float64 (como las claves en
+    partition): 1 de un chunk int64 y 1.0 de un chunk con nulos son el
+    mismo valor.
+    
+    Args:
+        codes: Código de grupo de cada valor
+        values: Valores a contar (los nulos se ignoran)
+        n_groups: Número de grupos
+        precision: Bits de índice de registro
+        
+    Returns:
+        Matriz de registros
+    """
+    registers = np.zeros((n_groups, 1 << precision), dtype=np.uint8)
+    valid = values.notna().to_numpy()
+    if not valid.any():
+        return registers
+    values = values[valid]
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        values = values.astype(np.float64)
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+    
+    width = 64 - precision
+    index = (hashes >> np.uint64(width)).astype(np.int64)
+    rest = hashes & np.uint64((1 << width) - 1)
+    if width > 52:
+        # float64 representa exactos hasta 2^53: se descartan bits bajos
+        rest = rest >> np.uint64(width - 52)
+        width = 52
+    bit_length = np.frexp(rest.astype(np.float64))[1]
+    rank = (width - bit_length + 1).astype(np.uint8)
+    np.maximum.at(registers, (codes[valid], index), rank)
+    return registers
+
+
+def _hll_estimate(registers: np.ndarray) -> np.ndarray:
+    """Estimación HyperLogLog de distintos por fila de registros"""
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=1)
+    zeros = np.count_nonzero(registers == 0, axis=1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    small = (raw <= 2.5 * m) & (zeros > 0)
+    return np.where(small, linear, raw)
+
+
+def _tdigest_compress(
+    codes: np.ndarray,
+    means: np.ndarray,
+    weights: np.ndarray,
+    compression: int
+) -> tuple:
+    """
+    Comprimir centroides de t-digest de varios grupos a la vez
+    
+    Los puntos se ordenan por (grupo, valor) y se agrupan en centroides según
+    la función de escala k1 (asin): centroides pequeños en las colas y
+    grandes en el centro, ~compression/2 centroides por grupo.
+    
+    Args:
+        codes: Código de grupo de cada punto o centroide
+        means: Valor o media de cada punto
+        weights: Peso de cada punto
+        compression: Parámetro de compresión (delta)
+        
+    Returns:
+        Tupla (códigos, medias, pesos) de los centroides resultantes
+    """
+    if len(codes) == 0:
+        return codes, means, weights
+    order = np.lexsort((means, codes))
+    codes, means, weights = codes[order], means[order], weights[order]
+    
+    starts = _group_starts(codes)
+    lengths = np.diff(np.r_[starts, len(codes)])
+    cumulative = np.cumsum(weights)
+    before = cumulative - weights
+    offset = np.repeat(before[starts], lengths)
+    totals = np.repeat(np.add.reduceat(weights, starts), lengths)
+    
+    q = (before - offset + weights / 2) / totals
+    k = compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1)) + compression / 4
+    bucket = np.floor(k).astype(np.int64)
+    
+    boundaries = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (bucket[1:] != bucket[:-1])])
+    out_weights = np.add.reduceat(weights, boundaries)
+    out_means = np.add.reduceat(means * weights, boundaries) / out_weights
+    return codes[boundaries], out_means, out_weights
+
+
+def _tdigest_quantile(
+    codes: np.ndarray,
+    means: np.ndarray,
+    weights: np.ndarray,
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    q: float
+) -> np.ndarray:
+    """
+    Cuantil q por grupo a partir de centroides ordenados por (grupo, media)
+    
+    Se interpola linealmente entre los centros de los centroides, usando el
+    mínimo y el máximo exactos del grupo como extremos.
+    
+    Args:
+        codes: Código de grupo de cada centroide (ordenados)
+        means: Media de cada centroide
+        weights: Peso de cada centroide
+        mins: Mínimo exacto por grupo
+        maxs: Máximo exacto por grupo
+        q: Cuantil en [0, 1]
+        
+    Returns:
+        Arreglo con el cuantil de cada grupo (NaN si el grupo no tiene valores)
+    """
+    n_groups = len(mins)
+    result = np.full(n_groups, np.nan)
+    if len(codes) == 0:
+        return result
+    
+    starts = _group_starts(codes)
+    lengths = np.diff(np.r_[starts, len(codes)])
+    cumulative = np.cumsum(weights)
+    before = cumulative - weights
+    totals = np.add.reduceat(weights, starts)
+    fraction = (before - np.repeat(before[starts], lengths) + weights / 2) / np.repeat(totals, lengths)
+    
+    # Puntos de interpolación por grupo: mínimo (0), centroides, máximo (1)
+    group_ids = codes[starts]
+    point_codes = np.concatenate([group_ids, codes, group_ids])
+    point_fraction = np.concatenate([np.zeros(len(starts)), fraction, np.ones(len(starts))])
+    point_values = np.concatenate([mins[group_ids], means, maxs[group_ids]])
+    order = np.lexsort((point_fraction, point_codes))
+    point_codes, point_fraction, point_values = point_codes[order], point_fraction[order], point_values[order]
+    
+    keys = point_codes + point_fraction * 0.5
+    hi = np.searchsorted(keys, group_ids + q * 0.5, side='left')
+    hi = np.minimum(hi, len(keys) - 1)
+    lo = np.maximum(hi - 1, 0)
+    lo = np.where(point_codes[lo] == group_ids, lo, hi)
+    span = point_fraction[hi] - point_fraction[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.where(span > 0, (q - point_fraction[lo]) / span, 0.0)
+    result[group_ids] = point_values[lo] + (point_values[hi] - point_values[lo]) * np.clip(t, 0, 1)
+    return result
+
+
+class AggregationState:
+    """
+    Estado parcial y combinable de una agregación por clave
+    
+    Cada agregación guarda un estado que se puede combinar entre chunks:
+    sum/count/size/min/max escalares, mean como sum + count, 'nunique' como
+    pares (grupo, valor) distintos, 'approx_nunique' como registros
+    HyperLogLog y cuantiles ('median', 'p95', ...) como t-digest. La memoria
+    depende del número de grupos, no del número de filas.
+    """
+    
+    def __init__(
+        self,
+        group_by: List[str],
+        agg_spec: Dict[str, List[str]],
+        hll_precision: int = 12,
+        compression: int = 100
+    ):
+        """
+        Args:
+            group_by: Columnas de agrupación
+            agg_spec: Agregaciones por columna ({col: [agg, ...]})
+            hll_precision: Bits de índice de HyperLogLog (2^p registros por grupo)
+            compression: Compresión de t-digest (~compression/2 centroides por grupo)
+        """
+        self.group_by = list(group_by)
+        self.agg_spec = {col: list(aggs) for col, aggs in agg_spec.items()}
+        self.hll_precision = hll_precision
+        self.compression = compression
+        
+        # Estado vacío (sin grupos)
+        self.keys = pd.DataFrame(columns=self.group_by)
+        self.scalars = pd.DataFrame(columns=[self._scalar_name(col, stat) for col, stat in self.scalar_stats()])
+        self.hll: Dict[str, np.ndarray] = {}
+        self.digests: Dict[str, tuple] = {}
+        self.distinct: Dict[str, pd.DataFrame] = {}
+        for col, aggs in self.agg_spec.items():
+            if 'approx_nunique' in aggs:
+                self.hll[col] = np.zeros((0, 1 << hll_precision), dtype=np.uint8)
+            if 'nunique' in aggs:
+                self.distinct[col] = pd.DataFrame({'group': np.empty(0, dtype=np.int64), 'value': []})
+            if any(_agg_quantile(agg) is not None for agg in aggs):
+                self.digests[col] = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+    
+    def _empty_like(self) -> 'AggregationState':
+        return AggregationState(self.group_by, self.agg_spec, self.hll_precision, self.compression)
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def scalar_stats(self) -> List[tuple]:
+        """Estados escalares necesarios: lista de (columna, estadístico)"""
+        stats = [(None, 'size')]
+        for col, aggs in self.agg_spec.items():
+            for agg in aggs:
+                needed = SCALAR_AGGS.get(agg, ())
+                if _agg_quantile(agg) is not None:
+                    needed = ('min', 'max')
+                elif agg not in SCALAR_AGGS and agg not in ('nunique', 'approx_nunique'):
+                    raise ValueError(f"Agregación no soportada: {agg}")
+                for stat in needed:
+                    if (col, stat) not in stats:
+                        stats.append((col, stat))
+        return stats
+    
+    @staticmethod
+    def _scalar_name(col: Optional[str], stat: str) -> str:
+        return '__size' if col is None else f"{col}__{stat}"
+    
+    def update(self, df: pd.DataFrame) -> 'AggregationState':
+        """
+        Combinar un chunk de datos con este estado
+        
+        Args:
+            df: Chunk con las columnas de agrupación y de agregación
+            
+        Returns:
+            Nuevo estado combinado
+        """
+        return AggregationState.merge([self, self.from_frame(df)])
+    
+    def from_frame(self, df: pd.DataFrame) -> 'AggregationState':
+        """
+        Crear el estado parcial de un chunk (mismas agregaciones que este estado)
+        
+        Args:
+            df: Chunk con las columnas de agrupación y de agregación
+            
+        Returns:
+            Estado parcial del chunk
+        """
+        state = self._empty_like()
+        df = df.dropna(subset=self.group_by)
+        codes = df.groupby(self.group_by, sort=False).ngroup().to_numpy()
+        _, first = np.unique(codes, return_index=True)
+        n_groups = len(first)
+        state.keys = df[self.group_by].iloc[first].reset_index(drop=True)
+        
+        grouped = df.groupby(codes, sort=True)
+        scalars = {}
+        for col, stat in self.scalar_stats():
+            name = self._scalar_name(col, stat)
+            scalars[name] = grouped.size() if col is None else grouped[col].agg(stat)
+        state.scalars = pd.DataFrame(scalars).reset_index(drop=True)
+        
+        for col, aggs in self.agg_spec.items():
+            if 'approx_nunique' in aggs:
+                state.hll[col] = _hll_registers(codes, df[col], n_groups, self.hll_precision)
+            if 'nunique' in aggs:
+                state.distinct[col] = pd.DataFrame({'group': codes, 'value': df[col].to_numpy()}).dropna().drop_duplicates()
+            if any(_agg_quantile(agg) is not None for agg in aggs):
+                values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+                valid = ~np.isnan(values)
+                state.digests[col] = _tdigest_compress(
+                    codes[valid], values[valid], np.ones(valid.sum()), self.compression
+                )
+        return state
+    
+    @staticmethod
+    def merge(states: List['AggregationState']) -> 'AggregationState':
+        """
+        Combinar varios estados parciales en uno
+        
+        Args:
+            states: Estados con las mismas agregaciones
+            
+        Returns:
+            Estado combinado
+        """
+        template = states[0]
+        states = [state for state in states if len(state)]
+        if len(states) <= 1:
+            return states[0] if states else template
+        merged = template._empty_like()
+        
+        keys = pd.concat([state.keys for state in states], ignore_index=True)
+        codes = keys.groupby(template.group_by, sort=False).ngroup().to_numpy()
+        _, first = np.unique(codes, return_index=True)
+        merged.keys = keys.iloc[first].reset_index(drop=True)
+        offsets = np.cumsum([0] + [len(state) for state in states])
+        
+        scalars = pd.concat([state.scalars for state in states], ignore_index=True)
+        merged.scalars = scalars.groupby(codes, sort=True).agg(
+            {name: SCALAR_MERGE[name.rsplit('__', 1)[1]] for name in scalars.columns}
+        ).reset_index(drop=True)
+        
+        order = np.argsort(codes, kind='stable')
+        starts = _group_starts(codes[order])
+        for col in template.hll:
+            registers = np.concatenate([state.hll[col] for state in states])
+            merged.hll[col] = np.maximum.reduceat(registers[order], starts, axis=0)
+        
+        for col in template.digests:
+            parts = [state.digests[col] for state in states]
+            merged.digests[col] = _tdigest_compress(
+                np.concatenate([codes[offset + part[0]] for offset, part in zip(offsets, parts)]),
+                np.concatenate([part[1] for part in parts]),
+                np.concatenate([part[2] for part in parts]),
+                template.compression
+            )
+        
+        for col in template.distinct:
+            parts = []
+            for offset, state in zip(offsets, states):
+                part = state.distinct[col]
+                parts.append(part.assign(group=codes[offset + part['group'].to_numpy()]))
+            merged.distinct[col] = pd.concat(parts, ignore_index=True).drop_duplicates()
+        
+        return merged
+    
+    def memory_bytes(self) -> int:
+        """Memoria aproximada del estado (sin contar el contenido de objetos Python)"""
+        total = int(self.keys.memory_usage(index=False).sum() + self.scalars.memory_usage(index=False).sum())
+        total += sum(registers.nbytes for registers in self.hll.values())
+        total += sum(sum(part.nbytes for part in digest) for digest in self.digests.values())
+        total += sum(int(pairs.memory_usage(index=False).sum()) for pairs in self.distinct.values())
+        return total
+    
+    def partition(self, n_buckets: int, level: int = 0) -> List['AggregationState']:
+        """
+        Dividir el estado por hash de las claves en n_buckets estados disjuntos
+        
+        Las claves numéricas se hashean como float64, de modo que una misma
+        clave leída como int o float en distintos chunks cae en el mismo bucket.
+        Cada nivel usa otros dígitos (en base n_buckets) del hash, de modo que
+        un bucket de nivel L se reparte de forma uniforme en el nivel L + 1.
+        
+        Args:
+            n_buckets: Número de buckets
+            level: Nivel de repartición (0 = primer reparto)
+            
+        Returns:
+            Lista de estados, uno por bucket (pueden estar vacíos)
+        """
+        keys = self.keys.copy()
+        for col in self.group_by:
+            if pd.api.types.is_numeric_dtype(keys[col]) and not pd.api.types.is_bool_dtype(keys[col]):
+                keys[col] = keys[col].astype(np.float64)
+        hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+        buckets = (hashes // np.uint64(n_buckets) ** np.uint64(level) % np.uint64(n_buckets)).astype(np.int64)
+        
+        states = []
+        for bucket in range(n_buckets):
+            selected = np.flatnonzero(buckets == bucket)
+            remap = np.full(len(self), -1, dtype=np.int64)
+            remap[selected] = np.arange(len(selected))
+            
+            state = self._empty_like()
+            state.keys = self.keys.iloc[selected].reset_index(drop=True)
+            state.scalars = self.scalars.iloc[selected].reset_index(drop=True)
+            for col, registers in self.hll.items():
+                state.hll[col] = registers[selected]
+            for col, (codes, means, weights) in self.digests.items():
+                keep = remap[codes] >= 0
+                state.digests[col] = (remap[codes[keep]], means[keep], weights[keep])
+            for col, pairs in self.distinct.items():
+                groups = remap[pairs['group'].to_numpy()]
+                state.distinct[col] = pairs[groups >= 0].assign(group=groups[groups >= 0])
+            states.append(state)
+        return states
+    
+    def finalize(self) -> pd.DataFrame:
+        """
+        Calcular el resultado final
+        
+        Returns:
+            DataFrame indexado por las columnas de agrupación (ordenado), con una
+            columna por agregación ('col' si la columna tiene una sola
+            agregación, 'col_agg' si tiene varias)
+        """
+        n_groups = len(self)
+        result = {}
+        for col, aggs in self.agg_spec.items():
+            for agg in aggs:
+                name = col if len(aggs) == 1 else f"{col}_{agg}"
+                q = _agg_quantile(agg)
+                if n_groups == 0:
+                    result[name] = []
+                elif agg == 'mean':
+                    result[name] = self.scalars[f"{col}__sum"] / self.scalars[f"{col}__count"]
+                elif agg == 'size':
+                    result[name] = self.scalars['__size']
+                elif agg in SCALAR_AGGS:
+                    result[name] = self.scalars[f"{col}__{agg}"]
+                elif agg == 'nunique':
+                    result[name] = np.bincount(self.distinct[col]['group'].to_numpy(dtype=np.int64), minlength=n_groups)
+                elif agg == 'approx_nunique':
+                    result[name] = np.round(_hll_estimate(self.hll[col])).astype(np.int64)
+                else:
+                    result[name] = _tdigest_quantile(
+                        *self.digests[col],
+                        self.scalars[f"{col}__min"].to_numpy(dtype=np.float64),
+                        self.scalars[f"{col}__max"].to_numpy(dtype=np.float64),
+                        q
+                    )
+        
+        result = {name: np.asarray(values) for name, values in result.items()}
+        df = pd.DataFrame(result, index=pd.MultiIndex.from_frame(self.keys) if len(self.group_by) > 1
+                          else pd.Index(self.keys[self.group_by[0]], name=self.group_by[0]))
+        return df.sort_index()
+
+
+def _spill_state(state: AggregationState, spill: Dict[str, Any], tag: str, level: int = 0) -> List[str]:
+    """
+    Escribir un estado parcial a disco dividido en buckets por hash de clave
+    
+    Args:
+        state: Estado a volcar
+        spill: Configuración de volcado (dir, buckets)
+        tag: Identificador único del volcado (rango y número de volcado)
+        level: Nivel de repartición (ver AggregationState.partition)
+        
+    Returns:
+        Rutas de los archivos escritos (un archivo por bucket no vacío)
+    """
+    paths = []
+    for bucket, part in enumerate(state.partition(spill['buckets'], level)):
+        if len(part) == 0:
+            continue
+        path = Path(spill['dir']) / f"bucket-{bucket:04d}-{tag}.pkl"
+        with open(path, 'wb') as f:
+            pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+        paths.append(str(path))
+    return paths
+
+
+def _aggregate_byte_range(
+    input_path: str,
+    byte_range: tuple,
+    template: AggregationState,
+    chunk_size: int,
+    spill: Optional[Dict[str, Any]] = None
+) -> Any:
+    """
+    Agregar un rango de bytes de un CSV por chunks (se ejecuta en el worker)
+    
+    Args:
+        input_path: Ruta del archivo CSV
+        byte_range: Tupla (inicio, fin) del rango
+        template: Estado vacío con las agregaciones a calcular
+        chunk_size: Filas por chunk al parsear el rango
+        spill: Configuración de volcado a disco (dir, buckets, budget_bytes);
+            None = todo en memoria
+        
+    Returns:
+        Estado parcial del rango, o lista de archivos volcados si hay spill
+    """
+    columns = list(dict.fromkeys(template.group_by + list(template.agg_spec)))
+    state = template
+    spilled = []
+    with open_byte_range(input_path, byte_range) as data:
+        for chunk_df in pd.read_csv(data, chunksize=chunk_size, usecols=columns):
+            state = state.update(chunk_df)
+            if spill is not None and state.memory_bytes() > spill['budget_bytes']:
+                spilled += _spill_state(state, spill, f"{byte_range[0]}-{len(spilled):05d}")
+                state = template
+    
+    if spill is None:
+        return state
+    if len(state):
+        spilled += _spill_state(state, spill, f"{byte_range[0]}-final")
+    return spilled
+
+
+def _aggregate_chunk(chunk_df: pd.DataFrame, template: AggregationState) -> AggregationState:
+    """Agregar un chunk en un estado parcial (se ejecuta en el worker)"""
+    return template.update(chunk_df)
+
+
+def _spilled_by_bucket(paths: List[str]) -> Dict[int, List[str]]:
+    """Agrupar archivos volcados ('bucket-NNNN-<tag>.pkl') por bucket"""
+    files_by_bucket: Dict[int, List[str]] = {}
+    for path in paths:
+        files_by_bucket.setdefault(int(Path(path).name.split('-')[1]), []).append(path)
+    return files_by_bucket
+
+
+def _aggregate_bucket(paths: List[str], part_path: str, spill: Dict[str, Any], level: int = 0) -> int:
+    """
+    Combinar y finalizar los volcados de un bucket (se ejecuta en el worker)
+    
+    Los volcados se cargan de uno en uno sobre un acumulador. Si el
+    acumulador supera el presupuesto, se vuelca repartido en sub-buckets
+    (siguiente nivel de AggregationState.partition), el resto de volcados
+    se reparte igual y cada sub-bucket se agrega de forma recursiva: la
+    memoria queda acotada por el presupuesto y no por el tamaño del bucket.
+    
+    Args:
+        paths: Archivos volcados del bucket
+        part_path: Ruta del CSV parcial de salida
+        spill: Configuración de volcado (dir, buckets, budget_bytes)
+        level: Nivel de repartición de los volcados recibidos
+        
+    Returns:
+        Número de grupos del bucket
+    """
+    state = None
+    sub_spill = None
+    sub_paths: List[str] = []
+    for index, path in enumerate(paths):
+        with open(path, 'rb') as f:
+            loaded = pickle.load(f)
+        Path(path).unlink()
+        if sub_spill is not None:
+            sub_paths += _spill_state(loaded, sub_spill, f"{index:05d}", level + 1)
+            continue
+        state = loaded if state is None else AggregationState.merge([state, loaded])
+        if state.memory_bytes() > spill['budget_bytes'] and level + 1 < MAX_SPILL_LEVELS:
+            sub_dir = Path(part_path).with_suffix('')
+            sub_dir.mkdir()
+            sub_spill = {**spill, 'dir': str(sub_dir)}
+            sub_paths += _spill_state(state, sub_spill, 'acumulado', level + 1)
+            state = None
+    
+    if sub_spill is None:
+        df_bucket = state.finalize()
+        df_bucket.to_csv(part_path)
+        return len(df_bucket)
+    
+    groups = 0
+    part_paths = []
+    for bucket, bucket_paths in sorted(_spilled_by_bucket(sub_paths).items()):
+        part_paths.append(str(sub_dir / f"part-{bucket:04d}.csv"))
+        groups += _aggregate_bucket(bucket_paths, part_paths[-1], sub_spill, level + 1)
+    merge_part_files(part_paths, part_path)
+    shutil.rmtree(sub_dir)
+    return groups
+
+
+class ChunkManifest:
+    """
+    Manifiesto de checkpoints por chunk para reanudar un procesamiento
+    
+    Guarda la huella del archivo de entrada (tamaño + mtime), el tamaño de
+    chunk y, por cada chunk terminado, sus filas de entrada/salida y su
+    archivo parcial. Manifiesto y partes se escriben de forma atómica
+    (archivo temporal + rename), y las partes tienen nombre determinista por
+    índice de chunk, de modo que reintentar un chunk lo reemplaza sin
+    duplicar filas.
+    """
+    
+    def __init__(self, input_path: str, output_path: str, chunk_size: int, resume: bool = True):
+        """
+        Args:
+            input_path: Ruta del archivo de entrada
+            output_path: Ruta del archivo de salida final
+            chunk_size: Tamaño de chunk (debe coincidir para reanudar)
+            resume: Reutilizar el manifiesto existente si es compatible
+        """
+        self.output_path = Path(output_path)
+        self.path = Path(f"{output_path}.manifest.json")
+        self.parts_dir = Path(f"{output_path}.parts")
+        stat = Path(input_path).stat()
+        self.fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'chunk_size': chunk_size}
+        
+        state = None
+        if resume and self.path.exists():
+            state = json.loads(self.path.read_text(encoding='utf-8'))
+            if state.get('fingerprint') != self.fingerprint:
+                logger.warning(f"El manifiesto {self.path} no corresponde a la entrada actual, se reinicia")
+                state = None
+        if state is None:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+            state = {'fingerprint': self.fingerprint, 'complete': False, 'chunks': {}}
+        self.state = state
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+    
+    @property
+    def complete(self) -> bool:
+        return self.state['complete']
+    
+    @property
+    def completed(self) -> Dict[int, Dict[str, Any]]:
+        return {int(index): entry for index, entry in self.state['chunks'].items()}
+    
+    def prefix(self) -> tuple:
+        """Chunks terminados consecutivos desde el inicio: (nº de chunks, filas de entrada)"""
+        completed = self.completed
+        count = rows = 0
+        while count in completed:
+            rows += completed[count]['input_rows']
+            count += 1
+        return count, rows
+    
+    def truncate(self, count: int) -> None:
+        """Olvidar los chunks registrados a partir del índice count"""
+        for index in [index for index in self.completed if index >= count]:
+            self.part_path(index).unlink(missing_ok=True)
+            del self.state['chunks'][str(index)]
+    
+    def is_done(self, index: int) -> bool:
+        return str(index) in self.state['chunks']
+    
+    def part_path(self, index: int) -> Path:
+        return self.parts_dir / f"part-{index:06d}.csv"
+    
+    def write_part(self, index: int, df: pd.DataFrame, input_rows: int) -> None:
+        """Escribir la parte de un chunk y registrarlo como terminado (ambos atómicos)"""
+        part_path = self.part_path(index)
+        tmp_path = part_path.with_name(part_path.name + '.tmp')
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, part_path)
+        self.state['chunks'][str(index)] = {
+            'part': part_path.name,
+            'input_rows': input_rows,
+            'output_rows': len(df)
+        }
+        self._persist()
+    
+    def finish(self) -> int:
+        """
+        Unir las partes en la salida final (atómicamente) y cerrar el manifiesto
+        
+        Returns:
+            Filas totales de la salida
+        """
+        completed = self.completed
+        part_paths = [str(self.parts_dir / completed[index]['part']) for index in sorted(completed)]
+        tmp_path = self.output_path.with_name(self.output_path.name + '.tmp')
+        merge_part_files(part_paths, str(tmp_path))
+        os.replace(tmp_path, self.output_path)
+        
+        self.state['complete'] = True
+        self._persist()
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        return sum(entry['output_rows'] for entry in completed.values())
+    
+    def _persist(self) -> None:
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
 class BatchProcessor:
     """Procesador de datos por lotes con soporte para procesamiento paralelo"""
     
-    def __init__(self, chunk_size: int = 10000, n_workers: int = None):
+    def __init__(
+        self,
+        chunk_size: int = 10000,
+        n_workers: int = None,
+        adaptive: bool = False,
+        target_chunk_mb: float = 64.0,
+        target_chunk_seconds: float = 1.0,
+        min_chunk_size: int = 1000,
+        max_chunk_size: int = 1_000_000
+    ):
         """
         Inicializar procesador
         
         Args:
-            chunk_size: Tamaño de cada lote
+            chunk_size: Tamaño de cada lote (inicial si adaptive)
             n_workers: Número de trabajadores paralelos (None = auto)
+            adaptive: Ajustar el tamaño de lote durante la ejecución
+                (process_file_sequential y process_file_parallel)
+            target_chunk_mb: Memoria objetivo por lote en modo adaptativo
+            target_chunk_seconds: Latencia de transformación objetivo por lote
+            min_chunk_size: Tamaño mínimo de lote en modo adaptativo
+            max_chunk_size: Tamaño máximo de lote en modo adaptativo
         """
         self.chunk_size = chunk_size
         self.n_workers = n_workers or mp.cpu_count() - 1
-        logger.info(f"Procesador inicializado: chunk_size={chunk_size}, workers={self.n_workers}")
+        self.adaptive = adaptive
+        self.target_chunk_mb = target_chunk_mb
+        self.target_chunk_seconds = target_chunk_seconds
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        logger.info(
+            f"Procesador inicializado: chunk_size={chunk_size}, workers={self.n_workers}, adaptive={adaptive}"
+        )
+    
+    def _new_sizer(self) -> Optional[AdaptiveChunkSizer]:
+        """Crear el ajustador de tamaño de chunk (None si no es adaptativo)"""
+        if not self.adaptive:
+            return None
+        return AdaptiveChunkSizer(
+            self.chunk_size, self.target_chunk_mb * 1024 * 1024, self.target_chunk_seconds,
+            self.min_chunk_size, self.max_chunk_size
+        )
+    
+    def _iter_csv_chunks(
+        self,
+        input_path: str,
+        sizer: Optional[AdaptiveChunkSizer] = None,
+        skip_rows: int = 0
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Leer un CSV por chunks de tamaño fijo o adaptativo
+        
+        Args:
+            input_path: Ruta del archivo CSV
+            sizer: Ajustador de tamaño (None = chunk_size fijo)
+            skip_rows: Filas de datos iniciales a saltar sin parsear
+            
+        Yields:
+            DataFrames con cada chunk
+        """
+        with pd.read_csv(
+            input_path, iterator=True,
+            skiprows=range(1, skip_rows + 1) if skip_rows else None
+        ) as reader:
+            while True:
+                try:
+                    yield reader.get_chunk(sizer.size if sizer is not None else self.chunk_size)
+                except StopIteration:
+                    return
     
     def process_chunk(self, chunk: pd.DataFrame, transform_func: Callable) -> pd.DataFrame:
         """
@@ -63,15 +1539,29 @@ class BatchProcessor:
         self,
         input_path: str,
         output_path: str,
-        transform_func: Callable
+        transform_func: Callable,
+        dedup: Optional[SeenKeys] = None,
+        checkpoint: bool = False,
+        resume: bool = False,
+        profiler: Optional[BatchProfiler] = None
     ) -> Dict[str, Any]:
         """
         Procesar archivo secuencialmente por chunks
         
+        Con checkpoint cada chunk se escribe en su propia parte y se registra
+        en un ChunkManifest ('<salida>.manifest.json'); la salida final se
+        genera al terminar todos los chunks, de forma atómica. Con resume se
+        saltan los chunks ya terminados (los iniciales sin parsearlos) y un
+        reintento nunca duplica filas.
+        
         Args:
             input_path: Ruta del archivo de entrada
             output_path: Ruta del archivo de salida
             transform_func: Función de transformación
+            dedup: Claves vistas para descartar duplicados entre chunks (opcional)
+            checkpoint: Registrar checkpoints por chunk
+            resume: Reanudar desde el último manifiesto compatible (implica checkpoint)
+            profiler: Instrumentación por chunk (opcional; resumen en stats['profile'])
             
         Returns:
             Diccionario con estadísticas del procesamiento
@@ -85,18 +1575,65 @@ class BatchProcessor:
             'errors': 0
         }
         
+        manifest = None
+        skip_chunks = skip_rows = 0
+        if checkpoint or resume:
+            manifest = ChunkManifest(input_path, output_path, self.chunk_size, resume=resume)
+            if manifest.complete:
+                logger.info(f"Procesamiento ya completado según {manifest.path}")
+                stats['chunks_skipped'] = len(manifest.completed)
+                stats['duration'] = time.time() - start_time
+                return stats
+            skip_chunks, skip_rows = manifest.prefix()
+            if self.adaptive:
+                # Con tamaño adaptativo los límites de chunk cambian entre
+                # ejecuciones: solo el prefijo terminado es reutilizable
+                manifest.truncate(skip_chunks)
+            stats['chunks_skipped'] = 0
+            if skip_chunks:
+                logger.info(f"Reanudando tras {skip_chunks} chunks ({skip_rows} filas) terminados")
+        
         first_chunk = True
+        sizer = self._new_sizer()
+        if profiler is not None:
+            profiler.start()
+        chunks = _timed_iter(self._iter_csv_chunks(input_path, sizer, skip_rows))
         
-        for chunk_df in pd.read_csv(input_path, chunksize=self.chunk_size):
+        for index, (chunk_df, read_seconds) in enumerate(chunks, start=skip_chunks):
+            if manifest is not None and manifest.is_done(index):
+                stats['chunks_skipped'] += 1
+                continue
             try:
                 # Procesar chunk
+                chunk_start = time.perf_counter()
                 transformed_chunk = transform_func(chunk_df)
+                transform_seconds = time.perf_counter() - chunk_start
+                chunk_bytes = estimate_frame_bytes(chunk_df) if sizer is not None or profiler is not None else None
+                if sizer is not None:
+                    sizer.observe(len(chunk_df), chunk_bytes, transform_seconds)
+                if dedup is not None:
+                    transformed_chunk = dedup.filter(transformed_chunk, commit=False)
                 
-                # Guardar resultado
-                mode = 'w' if first_chunk else 'a'
-                header = first_chunk
-                transformed_chunk.to_csv(output_path, mode=mode, header=header, index=False)
+                # Guardar resultado (las claves se confirman solo si se escribe)
+                write_start = time.perf_counter()
+                if manifest is not None:
+                    manifest.write_part(index, transformed_chunk, len(chunk_df))
+                else:
+                    mode = 'w' if first_chunk else 'a'
+                    header = first_chunk
+                    transformed_chunk.to_csv(output_path, mode=mode, header=header, index=False)
+                if dedup is not None:
+                    dedup.commit()
+                    if manifest is not None:
+                        dedup.save()
                 
+                if profiler is not None:
+                    profiler.record_chunk(
+                        chunk=index, worker='main', read_seconds=read_seconds,
+                        transform_seconds=transform_seconds, write_seconds=time.perf_counter() - write_start,
+                        rows_in=len(chunk_df), rows_out=len(transformed_chunk), bytes_in=int(chunk_bytes),
+                        peak_rss_bytes=peak_rss_bytes()
+                    )
                 stats['chunks_processed'] += 1
                 stats['total_rows'] += len(transformed_chunk)
                 first_chunk = False
@@ -104,9 +1641,23 @@ class BatchProcessor:
                 logger.info(f"Chunk {stats['chunks_processed']} procesado: {len(transformed_chunk)} filas")
                 
             except Exception as e:
-                logger.error(f"Error en chunk {stats['chunks_processed']}: {str(e)}")
+                logger.error(f"Error en chunk {index}: {str(e)}")
                 stats['errors'] += 1
         
+        if manifest is not None:
+            if stats['errors'] == 0:
+                stats['output_rows'] = manifest.finish()
+            else:
+                logger.warning(f"Chunks con error pendientes: reanudar con resume=True ({manifest.path})")
+        
+        if dedup is not None:
+            dedup.save()
+            stats['duplicates_dropped'] = dedup.dropped
+        if sizer is not None:
+            stats.update(sizer.report())
+        if profiler is not None:
+            profiler.stop()
+            stats['profile'] = profiler.summary()
         stats['duration'] = time.time() - start_time
         logger.info(f"Procesamiento completado en {stats['duration']:.2f} segundos")
         
@@ -116,44 +1667,420 @@ class BatchProcessor:
         self,
         input_path: str,
         output_path: str,
-        transform_func: Callable
+        transform_func: Callable,
+        dedup: Optional[SeenKeys] = None,
+        ordered: bool = True,
+        max_prefetch: Optional[int] = None,
+        transport: str = 'pickle',
+        profiler: Optional[BatchProfiler] = None
     ) -> Dict[str, Any]:
         """
-        Procesar archivo en paralelo
+        Procesar archivo en paralelo en streaming
+        
+        Los chunks se leen de forma perezosa y se envían al pool con imap; un
+        semáforo limita los chunks leídos y aún no escritos a 'max_prefetch',
+        y cada resultado se anexa al CSV de salida en cuanto llega. La memoria
+        depende de chunk_size y max_prefetch, no del tamaño del archivo.
         
         Args:
             input_path: Ruta del archivo de entrada
             output_path: Ruta del archivo de salida
             transform_func: Función de transformación
+            dedup: Claves vistas para descartar duplicados entre chunks (opcional,
+                se aplica en el proceso principal en el orden de escritura)
+            ordered: Escribir en el orden de entrada (False = según terminan)
+            max_prefetch: Máximo de chunks en vuelo (None = 2 × workers)
+            transport: 'pickle' (DataFrames serializados) o 'shared_memory'
+                (columnas numéricas por memoria compartida; a los workers
+                solo se envían descriptores)
+            profiler: Instrumentación por chunk y por worker (opcional; resumen
+                en stats['profile'])
             
         Returns:
             Diccionario con estadísticas del procesamiento
         """
-        logger.info(f"Iniciando procesamiento paralelo con {self.n_workers} workers")
+        if transport not in ('pickle', 'shared_memory'):
+            raise ValueError(f"Transporte no soportado: {transport}")
+        shared = transport == 'shared_memory'
+        max_prefetch = max_prefetch or 2 * self.n_workers
+        logger.info(
+            f"Iniciando procesamiento paralelo con {self.n_workers} workers "
+            f"(prefetch={max_prefetch}, ordered={ordered})"
+        )
         start_time = time.time()
         
-        # Leer chunks
-        chunks = list(pd.read_csv(input_path, chunksize=self.chunk_size))
-        logger.info(f"Archivo dividido en {len(chunks)} chunks")
+        stats = {
+            'chunks_processed': 0,
+            'total_rows': 0,
+            'errors': 0
+        }
+        slots = threading.Semaphore(max_prefetch)
+        stopped = threading.Event()
+        in_flight = set()
+        sizer = self._new_sizer()
+        chunk_info: Dict[int, tuple] = {}
         
-        # Procesar en paralelo
-        with mp.Pool(processes=self.n_workers) as pool:
-            process_func = partial(self.process_chunk, transform_func=transform_func)
-            results = pool.map(process_func, chunks)
+        def feed_chunks():
+            # Se ejecuta en el hilo alimentador del pool: bloquea si hay
+            # max_prefetch chunks pendientes de escribir
+            chunks = _timed_iter(self._iter_csv_chunks(input_path, sizer))
+            for seq, (chunk_df, read_seconds) in enumerate(chunks):
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                if sizer is not None or profiler is not None:
+                    chunk_info[seq] = {
+                        'rows': len(chunk_df),
+                        'bytes': estimate_frame_bytes(chunk_df),
+                        'read_seconds': read_seconds,
+                        'queued_at': time.time()
+                    }
+                if shared:
+                    descriptor = frame_to_shared_memory(chunk_df)
+                    in_flight.add(descriptor['shm'])
+                    yield seq, descriptor
+                else:
+                    yield seq, chunk_df
         
-        # Combinar resultados
-        df_final = pd.concat([r for r in results if not r.empty], ignore_index=True)
+        if shared:
+            # El rastreador de recursos debe existir antes de crear el pool para
+            # que los workers lo compartan y no den por "fugados" los bloques
+            resource_tracker.ensure_running()
+            process_func = partial(_process_shared_chunk, transform_func=transform_func)
+        else:
+            process_func = partial(_process_pickled_chunk, transform_func=transform_func)
+        first_chunk = True
+        if profiler is not None:
+            profiler.start()
+        # in_flight: chunks compartidos cuyo resultado aún no se leyó (su
+        # bloque de entrada y el de resultado se liberan al terminar el pool)
+        try:
+            with mp.Pool(processes=self.n_workers) as pool:
+                imap = pool.imap if ordered else pool.imap_unordered
+                try:
+                    for outcome in imap(process_func, feed_chunks()):
+                        slots.release()
+                        stats['chunks_processed'] += 1
+                        if shared:
+                            release_shared_memory(outcome['source'])
+                        info = chunk_info.pop(outcome['seq'], None)
+                        if sizer is not None:
+                            sizer.observe(info['rows'], info['bytes'], outcome['seconds'])
+                        if outcome['error']:
+                            logger.error(f"Error procesando chunk {outcome['seq']}: {outcome['error']}")
+                            stats['errors'] += 1
+                            if shared:
+                                in_flight.discard(outcome['source'])
+                            continue
+                        result = outcome['result']
+                        write_start = time.perf_counter()
+                        if shared:
+                            result = frame_from_shared_memory(result, unlink=True)
+                            in_flight.discard(outcome['source'])
+                        if dedup is not None:
+                            result = dedup.filter(result, commit=False)
+                        
+                        result.to_csv(output_path, mode='w' if first_chunk else 'a', header=first_chunk, index=False)
+                        if dedup is not None:
+                            dedup.commit()
+                        first_chunk = False
+                        stats['total_rows'] += len(result)
+                        if profiler is not None:
+                            profiler.record_chunk(
+                                chunk=outcome['seq'], worker=outcome['worker'], read_seconds=info['read_seconds'],
+                                queue_wait_seconds=max(0.0, outcome['started_at'] - info['queued_at']),
+                                transform_seconds=outcome['seconds'], write_seconds=time.perf_counter() - write_start,
+                                rows_in=info['rows'], rows_out=len(result), bytes_in=int(info['bytes']),
+                                peak_rss_bytes=outcome['peak_rss_bytes']
+                            )
+                finally:
+                    # Desbloquear el hilo alimentador si se interrumpe la escritura
+                    stopped.set()
+                    for _ in range(max_prefetch):
+                        slots.release()
+        finally:
+            # Tras terminar el pool ningún worker puede crear más bloques
+            for name in list(in_flight):
+                release_shared_memory(name)
+                release_shared_memory(result_block_name(name))
         
-        # Guardar resultado
-        df_final.to_csv(output_path, index=False)
+        if dedup is not None:
+            dedup.save()
+            stats['duplicates_dropped'] = dedup.dropped
+        if sizer is not None:
+            stats.update(sizer.report())
+        if profiler is not None:
+            profiler.stop()
+            stats['profile'] = profiler.summary()
+        stats['duration'] = time.time() - start_time
+        
+        logger.info(
+            f"Procesamiento completado en {stats['duration']:.2f} segundos: "
+            f"{stats['chunks_processed']} chunks, {stats['total_rows']} filas"
+        )
+        
+        return stats
+    
+    def process_file_supervised(
+        self,
+        input_path: str,
+        output_path: str,
+        transform_func: Callable,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        quarantine_path: Optional[str] = None,
+        max_prefetch: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Procesar archivo en paralelo con supervisión de fallos
+        
+        - Un chunk cuya transformación lanza una excepción se reintenta hasta
+          max_retries veces con backoff exponencial (backoff_seconds · 2^n).
+        - Si un worker muere (segfault, OOM, os._exit) el pool se reemplaza y
+          los chunks que estaban en vuelo se reintentan de uno en uno para
+          identificar al culpable sin penalizar a los demás.
+        - Un chunk que agota sus reintentos se escribe en el archivo de
+          cuarentena (JSON lines con error, intentos y filas) y el
+          procesamiento continúa.
+        
+        La salida se escribe en el orden de entrada con a lo sumo max_prefetch
+        chunks leídos y aún no escritos.
+        
+        Args:
+            input_path: Ruta del archivo de entrada
+            output_path: Ruta del archivo de salida
+            transform_func: Función de transformación (debe poder serializarse)
+            max_retries: Reintentos por chunk antes de ponerlo en cuarentena
+            backoff_seconds: Espera base entre reintentos
+            quarantine_path: Archivo de cuarentena (None = '<salida>.quarantine.jsonl')
+            max_prefetch: Máximo de chunks pendientes de escribir (None = 2 × workers)
+            
+        Returns:
+            Diccionario con estadísticas del procesamiento
+        """
+        max_prefetch = max_prefetch or 2 * self.n_workers
+        quarantine_path = Path(quarantine_path or f"{output_path}.quarantine.jsonl")
+        logger.info(f"Iniciando procesamiento supervisado con {self.n_workers} workers (reintentos={max_retries})")
+        start_time = time.time()
         
         stats = {
-            'chunks_processed': len(chunks),
-            'total_rows': len(df_final),
-            'duration': time.time() - start_time
+            'chunks_processed': 0,
+            'total_rows': 0,
+            'errors': 0,
+            'retries': 0,
+            'worker_restarts': 0,
+            'quarantined': 0
         }
+        process_func = partial(_process_pickled_chunk, transform_func=transform_func)
         
-        logger.info(f"Procesamiento completado en {stats['duration']:.2f} segundos")
+        chunks = self._iter_csv_chunks(input_path)
+        pending: Dict[int, Dict[str, Any]] = {}  # leídos y aún no escritos
+        results: Dict[int, Optional[pd.DataFrame]] = {}  # terminados, a la espera de su turno
+        running: Dict[Any, int] = {}
+        retry_heap: List[tuple] = []
+        isolation = deque()
+        next_seq = next_write = next_row = 0
+        exhausted = broken = False
+        first_chunk = True
+        quarantine_path.unlink(missing_ok=True)
+        
+        def fail(seq: int, error: str) -> None:
+            task = pending[seq]
+            task['attempts'] += 1
+            task['error'] = error
+            if task['attempts'] > max_retries:
+                self._quarantine(quarantine_path, seq, task)
+                stats['quarantined'] += 1
+                stats['errors'] += 1
+                results[seq] = None
+            else:
+                stats['retries'] += 1
+                delay = backoff_seconds * 2 ** (task['attempts'] - 1)
+                logger.warning(f"Chunk {seq} falló (intento {task['attempts']}), reintento en {delay:.2f}s: {error}")
+                heapq.heappush(retry_heap, (time.monotonic() + delay, seq))
+        
+        def submit(seq: int) -> None:
+            nonlocal broken
+            try:
+                running[executor.submit(process_func, (seq, pending[seq]['chunk']))] = seq
+            except BrokenProcessPool:
+                # El pool se rompió antes de que lo notara un future: reenviar
+                # sin penalizar el chunk una vez reemplazado
+                broken = True
+                heapq.heappush(retry_heap, (time.monotonic(), seq))
+        
+        executor = ProcessPoolExecutor(max_workers=self.n_workers)
+        try:
+            while True:
+                # Alimentar chunks nuevos (en pausa mientras se aíslan sospechosos)
+                while not exhausted and not isolation and len(pending) < max_prefetch:
+                    chunk_df = next(chunks, None)
+                    if chunk_df is None:
+                        exhausted = True
+                        break
+                    pending[next_seq] = {'chunk': chunk_df, 'start_row': next_row, 'attempts': 0, 'error': None}
+                    submit(next_seq)
+                    next_row += len(chunk_df)
+                    next_seq += 1
+                
+                if isolation:
+                    if not running:
+                        submit(isolation.popleft())
+                else:
+                    while (not broken and retry_heap and retry_heap[0][0] <= time.monotonic()
+                           and len(running) < max_prefetch):
+                        submit(heapq.heappop(retry_heap)[1])
+                
+                if running:
+                    timeout = max(0.0, retry_heap[0][0] - time.monotonic()) if retry_heap and not isolation else None
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                elif retry_heap:
+                    time.sleep(max(0.0, retry_heap[0][0] - time.monotonic()))
+                    done = set()
+                elif exhausted and not pending:
+                    break
+                else:
+                    done = set()
+                
+                crashed = []
+                for future in done:
+                    seq = running.pop(future)
+                    try:
+                        outcome = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(seq)
+                        continue
+                    if outcome['error']:
+                        fail(seq, outcome['error'])
+                    else:
+                        results[seq] = outcome['result']
+                
+                if crashed or broken:
+                    # Un worker murió: todos los chunks en vuelo fallan con el pool
+                    crashed += list(running.values())
+                    running.clear()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = ProcessPoolExecutor(max_workers=self.n_workers)
+                    broken = False
+                    stats['worker_restarts'] += 1
+                    logger.warning(f"Worker caído con chunks {sorted(crashed)} en vuelo, pool reemplazado")
+                    if len(crashed) == 1:
+                        fail(crashed[0], 'El proceso worker terminó de forma inesperada')
+                        if crashed[0] not in results:
+                            # Reintentar aislado (sin backoff que lo mezcle con otros)
+                            retry_heap = [entry for entry in retry_heap if entry[1] != crashed[0]]
+                            heapq.heapify(retry_heap)
+                            isolation.appendleft(crashed[0])
+                    elif crashed:
+                        isolation.extend(sorted(crashed))
+                
+                # Escribir en orden los chunks terminados
+                while next_write in results:
+                    result = results.pop(next_write)
+                    pending.pop(next_write)
+                    stats['chunks_processed'] += 1
+                    if result is not None:
+                        result.to_csv(output_path, mode='w' if first_chunk else 'a', header=first_chunk, index=False)
+                        first_chunk = False
+                        stats['total_rows'] += len(result)
+                    next_write += 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        stats['duration'] = time.time() - start_time
+        logger.info(
+            f"Procesamiento supervisado completado en {stats['duration']:.2f} segundos: "
+            f"{stats['total_rows']} filas, {stats['retries']} reintentos, "
+            f"{stats['quarantined']} chunks en cuarentena"
+        )
+        
+        return stats
+    
+    def _quarantine(self, quarantine_path: Path, seq: int, task: Dict[str, Any]) -> None:
+        """Anexar un chunk fallido (error, intentos y filas) al archivo de cuarentena"""
+        chunk_df = task['chunk']
+        logger.error(f"Chunk {seq} en cuarentena tras {task['attempts']} intentos: {task['error']}")
+        record = {
+            'chunk': seq,
+            'start_row': task['start_row'],
+            'rows': len(chunk_df),
+            'attempts': task['attempts'],
+            'error': task['error'],
+            'quarantined_at': datetime.now().isoformat(),
+            'data': json.loads(chunk_df.to_json(orient='records', date_format='iso'))
+        }
+        with open(quarantine_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+    
+    def process_file_byte_ranges(
+        self,
+        input_path: str,
+        output_path: str,
+        transform_func: Callable,
+        part_size_mb: int = 64,
+        merge: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Procesar archivo en paralelo dividiéndolo por rangos de bytes
+        
+        El proceso principal solo calcula desplazamientos alineados a saltos
+        de línea; cada worker abre el archivo (mmap), parsea su rango, lo
+        transforma y escribe su propio archivo parcial. Así no se serializan
+        DataFrames entre procesos. No admite saltos de línea dentro de campos
+        entrecomillados.
+        
+        Args:
+            input_path: Ruta del archivo de entrada
+            output_path: Ruta del archivo de salida (con merge=False, directorio
+                con archivos part-NNNNN.csv)
+            transform_func: Función de transformación (debe poder serializarse)
+            part_size_mb: Tamaño aproximado de cada rango en MB
+            merge: Unir las partes en un único CSV al terminar
+            
+        Returns:
+            Diccionario con estadísticas del procesamiento
+        """
+        logger.info(f"Iniciando procesamiento por rangos de bytes con {self.n_workers} workers")
+        start_time = time.time()
+        
+        size = Path(input_path).stat().st_size
+        n_parts = max(self.n_workers, -(-size // (part_size_mb * 1024 * 1024)))
+        ranges = split_byte_ranges(input_path, n_parts)
+        logger.info(f"Archivo dividido en {len(ranges)} rangos")
+        
+        parts_dir = Path(output_path) if not merge else Path(f"{output_path}.parts")
+        parts_dir.mkdir(parents=True, exist_ok=True)
+        part_paths = [str(parts_dir / f"part-{i:05d}.csv") for i in range(len(ranges))]
+        
+        stats = {
+            'chunks_processed': 0,
+            'total_rows': 0,
+            'errors': 0
+        }
+        results = []
+        with mp.Pool(processes=self.n_workers) as pool:
+            tasks = [(input_path, part_path, transform_func, byte_range)
+                     for part_path, byte_range in zip(part_paths, ranges)]
+            for result in pool.starmap(_process_byte_range, tasks):
+                stats['chunks_processed'] += 1
+                if result['error']:
+                    logger.error(f"Error en rango {result['error']}")
+                    stats['errors'] += 1
+                    continue
+                stats['total_rows'] += result['rows']
+                results.append(result['part'])
+        
+        if merge:
+            merge_part_files(results, output_path)
+            shutil.rmtree(parts_dir)
+        else:
+            stats['parts'] = results
+        stats['duration'] = time.time() - start_time
+        
+        logger.info(
+            f"Procesamiento completado en {stats['duration']:.2f} segundos: "
+            f"{stats['chunks_processed']} rangos, {stats['total_rows']} filas"
+        )
         
         return stats
     
@@ -162,85 +2089,291 @@ class BatchProcessor:
         input_path: str,
         output_path: str,
         group_by: List[str],
-        agg_dict: Dict[str, Any]
+        agg_dict: Dict[str, Any],
+        hll_precision: int = 12,
+        compression: int = 100,
+        memory_budget_mb: Optional[float] = None,
+        n_buckets: int = 16,
+        spill_dir: Optional[str] = None,
+        byte_ranges: bool = False
     ) -> Dict[str, Any]:
         """
-        Realizar agregaciones por lotes
+        Realizar agregaciones por lotes con estados parciales combinables
+        
+        Por defecto el proceso principal lee el archivo con read_csv por
+        chunks (con prefetch acotado); cada worker agrega un chunk en un
+        AggregationState y el proceso principal los combina. Con
+        byte_ranges=True el archivo se divide en rangos de bytes que cada
+        worker parsea y agrega por su cuenta, y los estados se combinan en el
+        pool por reducción en árbol (pares); es más rápido, pero no admite
+        saltos de línea dentro de campos entrecomillados (ver
+        split_byte_ranges). En ambos casos mean/min/max/count/nunique son
+        correctos y la memoria depende del número de grupos.
+        
+        Agregaciones soportadas: sum, count, size, mean, min, max, nunique
+        (exacto), approx_nunique (HyperLogLog), median y pNN (t-digest).
+        
+        Con memory_budget_mb la agregación es externa: cuando el estado de un
+        worker supera su parte del presupuesto, se divide por hash de clave en
+        n_buckets archivos en disco; al final cada bucket se combina volcado
+        a volcado y finaliza por separado (en paralelo). Un bucket cuyo estado
+        combinado no cabe en el presupuesto se reparte de nuevo en
+        sub-buckets, de forma recursiva. La salida queda ordenada dentro de
+        cada bucket, no globalmente.
         
         Args:
             input_path: Ruta del archivo de entrada
             output_path: Ruta del archivo de salida
             group_by: Columnas para agrupar
-            agg_dict: Diccionario de agregaciones
+            agg_dict: Diccionario de agregaciones ({col: agg} o {col: [agg, ...]})
+            hll_precision: Precisión de HyperLogLog (error ~1.04 / sqrt(2^p))
+            compression: Compresión de t-digest (más alto = cuantiles más precisos)
+            memory_budget_mb: Presupuesto de memoria para estados parciales
+                (None = todo en memoria)
+            n_buckets: Número de buckets de hash para el modo externo
+            spill_dir: Directorio para los volcados (None = junto a la salida)
+            byte_ranges: Parsear rangos de bytes en los workers (solo CSV sin
+                saltos de línea dentro de campos entrecomillados)
             
         Returns:
             Diccionario con estadísticas
         """
+        if memory_budget_mb is not None:
+            return self._aggregate_external(
+                input_path, output_path, group_by, agg_dict, hll_precision, compression,
+                memory_budget_mb, n_buckets, spill_dir, byte_ranges
+            )
         logger.info(f"Iniciando agregación por: {group_by}")
         start_time = time.time()
         
-        aggregated_chunks = []
+        agg_spec = {col: [aggs] if isinstance(aggs, str) else list(aggs) for col, aggs in agg_dict.items()}
+        template = AggregationState(group_by, agg_spec, hll_precision, compression)
         
-        for chunk_df in pd.read_csv(input_path, chunksize=self.chunk_size):
-            # Agregar chunk
-            agg_chunk = chunk_df.groupby(group_by).agg(agg_dict)
-            aggregated_chunks.append(agg_chunk)
+        with mp.Pool(processes=self.n_workers) as pool:
+            states, partials = self._aggregate_partials(pool, input_path, template, byte_ranges)
+            
+            # Reducción en árbol: se combinan pares en paralelo hasta un único estado
+            while len(states) > 1:
+                pairs = [states[i:i + 2] for i in range(0, len(states), 2)]
+                states = pool.map(AggregationState.merge, pairs)
         
-        # Combinar y agregar de nuevo
-        df_combined = pd.concat(aggregated_chunks)
-        df_final = df_combined.groupby(level=group_by).sum()
+        df_final = (states[0] if states else template).finalize()
         
         # Guardar resultado
         df_final.to_csv(output_path)
         
         stats = {
             'groups': len(df_final),
+            'partials': partials,
             'duration': time.time() - start_time
         }
         
         logger.info(f"Agregación completada: {stats['groups']} grupos en {stats['duration']:.2f} segundos")
         
         return stats
+    
+    def _aggregate_partials(
+        self,
+        pool: Any,
+        input_path: str,
+        template: AggregationState,
+        byte_ranges: bool,
+        spill: Optional[Dict[str, Any]] = None
+    ) -> tuple:
+        """
+        Agregar el archivo en estados parciales con el pool (ver aggregate_by_key)
+        
+        Args:
+            pool: Pool de procesos
+            input_path: Ruta del archivo CSV
+            template: Estado vacío con las agregaciones a calcular
+            byte_ranges: Parsear rangos de bytes en los workers
+            spill: Configuración de volcado a disco (None = todo en memoria)
+            
+        Returns:
+            Tupla (estados parciales, o listas de archivos volcados si hay
+            spill; número de rangos o chunks agregados)
+        """
+        if byte_ranges:
+            size = Path(input_path).stat().st_size
+            ranges = split_byte_ranges(input_path, max(self.n_workers, -(-size // (64 * 1024 * 1024))))
+            results = pool.starmap(
+                _aggregate_byte_range,
+                [(input_path, byte_range, template, self.chunk_size, spill) for byte_range in ranges]
+            )
+            return results, len(ranges)
+        
+        columns = list(dict.fromkeys(template.group_by + list(template.agg_spec)))
+        max_prefetch = 2 * self.n_workers
+        slots = threading.Semaphore(max_prefetch)
+        stopped = threading.Event()
+        
+        def feed_chunks():
+            # Hilo alimentador del pool: bloquea con max_prefetch chunks sin combinar
+            for chunk_df in pd.read_csv(input_path, chunksize=self.chunk_size, usecols=columns):
+                slots.acquire()
+                if stopped.is_set():
+                    return
+                yield chunk_df
+        
+        state = template
+        spilled = []
+        chunks = 0
+        try:
+            for partial_state in pool.imap_unordered(partial(_aggregate_chunk, template=template), feed_chunks()):
+                slots.release()
+                chunks += 1
+                state = AggregationState.merge([state, partial_state])
+                if spill is not None and state.memory_bytes() > spill['budget_bytes']:
+                    spilled += _spill_state(state, spill, f"chunks-{chunks:08d}")
+                    state = template
+        finally:
+            stopped.set()
+            for _ in range(max_prefetch):
+                slots.release()
+        
+        if spill is None:
+            return [state], chunks
+        if len(state):
+            spilled += _spill_state(state, spill, 'chunks-final')
+        return [spilled], chunks
+    
+    def _aggregate_external(
+        self,
+        input_path: str,
+        output_path: str,
+        group_by: List[str],
+        agg_dict: Dict[str, Any],
+        hll_precision: int,
+        compression: int,
+        memory_budget_mb: float,
+        n_buckets: int,
+        spill_dir: Optional[str],
+        byte_ranges: bool
+    ) -> Dict[str, Any]:
+        """
+        Agregación externa por hash con volcado a disco (ver aggregate_by_key)
+        
+        Returns:
+            Diccionario con estadísticas
+        """
+        logger.info(f"Iniciando agregación externa por: {group_by} (presupuesto {memory_budget_mb} MB)")
+        start_time = time.time()
+        
+        agg_spec = {col: [aggs] if isinstance(aggs, str) else list(aggs) for col, aggs in agg_dict.items()}
+        template = AggregationState(group_by, agg_spec, hll_precision, compression)
+        
+        work_dir = Path(tempfile.mkdtemp(prefix='agg_spill_', dir=spill_dir or Path(output_path).parent))
+        spill = {
+            'dir': str(work_dir),
+            'buckets': n_buckets,
+            'budget_bytes': memory_budget_mb * 1024 * 1024 / self.n_workers
+        }
+        try:
+            with mp.Pool(processes=self.n_workers) as pool:
+                spilled, partials = self._aggregate_partials(pool, input_path, template, byte_ranges, spill)
+                files_by_bucket = _spilled_by_bucket([path for paths in spilled for path in paths])
+                
+                # Cada bucket se combina y finaliza de forma independiente
+                buckets = sorted(files_by_bucket)
+                part_paths = [str(work_dir / f"part-{bucket:04d}.csv") for bucket in buckets]
+                groups = pool.starmap(
+                    _aggregate_bucket,
+                    [(files_by_bucket[bucket], part_path, spill) for bucket, part_path in zip(buckets, part_paths)]
+                )
+            
+            if part_paths:
+                merge_part_files(part_paths, output_path)
+            else:
+                template.finalize().to_csv(output_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        
+        stats = {
+            'groups': int(sum(groups)),
+            'partials': partials,
+            'spilled_files': sum(len(paths) for paths in spilled),
+            'buckets': len(buckets),
+            'duration': time.time() - start_time
+        }
+        
+        logger.info(
+            f"Agregación externa completada: {stats['groups']} grupos, "
+            f"{stats['spilled_files']} volcados en {stats['duration']:.2f} segundos"
+        )
+        
+        return stats
 
 
 # Funciones de transformación de ejemplo
-def clean_sales_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Limpiar datos de ventas"""
-    df = df.copy()
+AGE_GROUP_BINS = np.array([0, 25, 35, 50, 100], dtype=np.float64)
+AGE_GROUP_DTYPE = pd.CategoricalDtype(['18-25', '26-35', '36-50', '51+'], ordered=True)
+VALUE_SEGMENT_BINS = np.array([0, 1000, 5000, np.inf], dtype=np.float64)
+VALUE_SEGMENT_DTYPE = pd.CategoricalDtype(['Low', 'Medium', 'High'], ordered=True)
+
+
+def _bin_categorical(values: pd.Series, bins: np.ndarray, dtype: pd.CategoricalDtype) -> pd.Categorical:
+    """
+    Equivalente vectorizado de pd.cut(values, bins, labels) (intervalos (a, b])
     
-    # Eliminar duplicados
-    df = df.drop_duplicates()
+    Calcula los códigos con searchsorted y construye el categórico a partir de
+    ellos, sin crear etiquetas por fila; fuera de rango o nulo = NaN.
+    """
+    positions = np.searchsorted(bins, values.to_numpy(dtype=np.float64, na_value=np.nan), side='left')
+    codes = positions - 1
+    codes[(positions == 0) | (positions == len(bins))] = -1
+    return pd.Categorical.from_codes(codes.astype(np.int8), dtype=dtype)
+
+
+def clean_sales_data(df: pd.DataFrame, processed_at: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Limpiar datos de ventas
+    
+    Duplicados y nulos en cantidad/precio_unitario se descartan con una sola
+    máscara y una sola selección (ninguna si no hay filas que descartar); el
+    DataFrame de entrada no se modifica.
     
-    # Eliminar valores nulos
-    df = df.dropna(subset=['cantidad', 'precio_unitario'])
+    Args:
+        df: Chunk de ventas
+        processed_at: Timestamp de procesamiento (None = ahora); pasar el mismo
+            valor a todos los chunks de una ejecución con functools.partial
+        
+    Returns:
+        DataFrame limpio con 'total' y 'processed_at'
+    """
+    # Eliminar duplicados y valores nulos en una sola pasada
+    keep = ~df.duplicated().to_numpy()
+    keep &= df['cantidad'].notna().to_numpy() & df['precio_unitario'].notna().to_numpy()
+    if keep.all():
+        df = df.copy(deep=False)
+    else:
+        df = df.take(np.flatnonzero(keep))
     
     # Calcular total
     df['total'] = df['cantidad'] * df['precio_unitario']
     
     # Agregar timestamp de procesamiento
-    df['processed_at'] = datetime.now()
+    df['processed_at'] = pd.Timestamp(processed_at or datetime.now())
     
     return df
 
 
 def enrich_customer_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Enriquecer datos de clientes"""
-    df = df.copy()
+    """
+    Enriquecer datos de clientes
+    
+    Los segmentos son categóricos ordenados con categorías compartidas entre
+    chunks (AGE_GROUP_DTYPE, VALUE_SEGMENT_DTYPE); el DataFrame de entrada
+    no se copia ni se modifica.
+    """
+    df = df.copy(deep=False)
     
     # Categorizar por edad
-    df['age_group'] = pd.cut(
-        df['edad'],
-        bins=[0, 25, 35, 50, 100],
-        labels=['18-25', '26-35', '36-50', '51+']
-    )
+    df['age_group'] = _bin_categorical(df['edad'], AGE_GROUP_BINS, AGE_GROUP_DTYPE)
     
     # Categorizar por segmento de valor
     if 'total_gastado' in df.columns:
-        df['value_segment'] = pd.cut(
-            df['total_gastado'],
-            bins=[0, 1000, 5000, float('inf')],
-            labels=['Low', 'Medium', 'High']
-        )
+        df['value_segment'] = _bin_categorical(df['total_gastado'], VALUE_SEGMENT_BINS, VALUE_SEGMENT_DTYPE)
     
     return df
 
@@ -253,7 +2386,7 @@ def main():
     logger.info("=" * 60)
     
     # Configuración
-    processor = BatchProcessor(chunk_size=1000, n_workers=4)
+    processor = BatchProcessor(chunk_size=1000, n_workers=4, adaptive=True)
     
     # Ejemplo 1: Procesamiento secuencial
     logger.info("\n--- Ejemplo 1: Procesamiento Secuencial ---")
@@ -265,7 +2398,7 @@ def main():
         stats_seq = processor.process_file_sequential(
             input_file,
             output_file,
-            clean_sales_data
+            partial(clean_sales_data, processed_at=datetime.now())
         )
         
         logger.info(f"Resultados:")
@@ -0,0 +1,165 @@
+"""
+Conjunto de Claves por Hash
+===========================
+
+Utilidad compartida por la deduplicación de batch_processing (SeenKeys) y
+de data_ingestion_pipeline (RowDeduplicator):
+
+- hash_rows: hash uint64 por fila de las columnas clave (vectorizado)
+- HashedKeySet: conjunto de hashes en corridas ordenadas de NumPy con
+  fusión por niveles (8 bytes por clave, sin conservar las filas)
+- HashJournal: registro append-only para persistir el conjunto de forma
+  incremental entre volcados completos
+
+La pertenencia es exacta sobre el hash de 64 bits, no sobre la clave: dos
+claves distintas con el mismo hash se tratan como duplicadas. La
+probabilidad de alguna colisión entre n claves es ~n²/2^65 (~3e-8 con un
+millón de claves, ~3e-4 con cien millones).
+"""
+
+import numpy as np
+import os
+import pandas as pd
+from pathlib import Path
+from typing import List, Optional
+
+
+def hash_rows(df: pd.DataFrame, columns: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Hash uint64 por fila de las columnas clave
+    
+    Las columnas clave deben conservar su tipo entre chunks y ejecuciones:
+    1 (int) y 1.0 (float) producen hashes distintos.
+    
+    Args:
+        df: DataFrame
+        columns: Columnas clave (None = todas las columnas)
+    
+    Returns:
+        Arreglo uint64 con un hash por fila
+    """
+    keys = df if columns is None else df[columns]
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+
+
+class HashedKeySet:
+    """
+    Conjunto de hashes uint64 en corridas ordenadas con fusión por niveles
+    
+    Cada lote nuevo se guarda como una corrida ordenada. Mientras la corrida
+    anterior no sea más de MERGE_RATIO veces mayor que la última, ambas se
+    fusionan (como en un LSM-tree): las corridas quedan en tamaños
+    decrecientes, hay O(log n) corridas que consultar con búsqueda binaria y
+    cada hash se reescribe O(log n) veces en total, en lugar de reordenar
+    el conjunto completo cada pocos lotes.
+    """
+    
+    MERGE_RATIO = 2
+    
+    def __init__(self, hashes: Optional[np.ndarray] = None):
+        """
+        Args:
+            hashes: Hashes iniciales (p. ej. un estado persistido), sin repetidos
+        """
+        self._runs: List[np.ndarray] = []
+        if hashes is not None and len(hashes):
+            self._runs.append(np.sort(np.asarray(hashes, dtype=np.uint64)))
+    
+    def __len__(self) -> int:
+        return int(sum(len(run) for run in self._runs))
+    
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por las corridas"""
+        return int(sum(run.nbytes for run in self._runs))
+    
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Máscara booleana de los hashes ya presentes en el conjunto"""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            idx = np.searchsorted(run, hashes)
+            idx[idx == len(run)] = 0
+            found |= run[idx] == hashes
+        return found
+    
+    def first_unseen(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Posiciones (ordenadas) de la primera aparición de cada hash que no
+        está en el conjunto; no modifica el conjunto
+        
+        Args:
+            hashes: Hashes de un chunk
+        
+        Returns:
+            Posiciones de las filas nuevas dentro del chunk
+        """
+        _, first = np.unique(hashes, return_index=True)
+        first = first[~self.contains(hashes[first])]
+        first.sort()
+        return first
+    
+    def add(self, hashes: np.ndarray) -> None:
+        """
+        Añadir hashes nuevos (sin repetidos y ausentes del conjunto, como los
+        que selecciona first_unseen)
+        
+        Args:
+            hashes: Hashes a añadir
+        """
+        if len(hashes) == 0:
+            return
+        self._runs.append(np.sort(hashes))
+        while len(self._runs) > 1 and len(self._runs[-2]) <= self.MERGE_RATIO * len(self._runs[-1]):
+            last = self._runs.pop()
+            # Timsort ('stable') fusiona dos corridas ya ordenadas en tiempo lineal
+            self._runs[-1] = np.sort(np.concatenate((self._runs[-1], last)), kind='stable')
+    
+    def to_array(self) -> np.ndarray:
+        """Todos los hashes en un único arreglo ordenado (compacta las corridas)"""
+        if len(self._runs) > 1:
+            self._runs = [np.sort(np.concatenate(self._runs), kind='stable')]
+        return self._runs[0] if self._runs else np.empty(0, dtype=np.uint64)
+
+
+class HashJournal:
+    """
+    Registro append-only ('<estado>.log') de los hashes confirmados desde el
+    último volcado completo del estado
+    
+    Guardar tras cada chunk solo escribe los hashes nuevos (O(nuevos) en vez
+    de reescribir el estado completo); el propietario compacta (reescribe el
+    estado y vacía el registro) cuando el registro crece más que el estado.
+    Un registro truncado por una caída conserva los hashes completos.
+    """
+    
+    def __init__(self, state_path: Path):
+        """
+        Args:
+            state_path: Archivo de estado al que acompaña el registro
+        """
+        self.path = state_path.with_name(state_path.name + '.log')
+        self.entries = self.path.stat().st_size // 8 if self.path.exists() else 0
+    
+    def read(self) -> np.ndarray:
+        """Hashes registrados"""
+        if self.entries == 0:
+            return np.empty(0, dtype=np.uint64)
+        return np.fromfile(self.path, dtype=np.uint64, count=self.entries)
+    
+    def append(self, hashes: np.ndarray) -> None:
+        """Anexar hashes de forma duradera (fsync)"""
+        if len(hashes) == 0:
+            return
+        with open(self.path, 'ab') as f:
+            if f.tell() != self.entries * 8:
+                # Descartar una escritura incompleta previa
+                f.truncate(self.entries * 8)
+            f.write(np.ascontiguousarray(hashes, dtype=np.uint64).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries += len(hashes)
+    
+    def clear(self) -> None:
+        """Vaciar el registro (tras un volcado completo del estado)"""
+        self.path.unlink(missing_ok=True)
+        self.entries = 0
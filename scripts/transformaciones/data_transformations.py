@@ -9,55 +9,157 @@ Autor: Curso de Ingeniería de Datos
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Set, Tuple, Union
 import re
+import json
+import warnings
+from abc import ABC, abstractmethod
 from datetime import datetime
 
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.0
+    from pandas._libs.tslibs.parsing import guess_datetime_format
 
-def limpiar_columnas_texto(df: pd.DataFrame, columnas: List[str]) -> pd.DataFrame:
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Sin pyarrow solo está disponible el motor de texto 'python'
+    pa = None
+
+# Patrón simple de validación de email (compilado una vez)
+PATRON_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+# Sufijos de las columnas derivadas de una fecha
+SUFIJOS_FECHA = ('anio', 'mes', 'dia', 'dia_semana', 'trimestre', 'semana')
+
+
+def _motor_texto(motor: str) -> str:
+    """
+    Resolver el motor de texto: 'auto', 'arrow' o 'python'
+    
+    'auto' usa Python (semántica exacta de str y re). 'arrow' es más rápido
+    con muchos valores distintos pero no equivale en todos los casos:
+    utf8_lower no aplica reglas especiales de Unicode ('ΟΔΟΣ' da 'οδοσ' y no
+    'οδος'; 'İ' da 'i' y no 'i̇') y RE2 no admite un '\n' final con '$'
+    ('a@b.co\n' es inválido con Arrow y válido con re.match).
+    """
+    if motor == 'auto':
+        return 'python'
+    if motor not in ('arrow', 'python'):
+        raise ValueError("Motor debe ser 'auto', 'arrow' o 'python'")
+    if motor == 'arrow' and pa is None:
+        raise ImportError("El motor 'arrow' requiere pyarrow")
+    return motor
+
+
+def _textos_distintos(serie: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Factorizar una Serie en códigos y valores distintos como texto
+    
+    Los nulos conservan su representación de astype(str) ('None', 'nan',
+    'NaT', ...) como valores distintos adicionales.
+    
+    Returns:
+        Tupla (códigos por fila, valores distintos como str)
+    """
+    codigos, distintos = pd.factorize(serie)
+    distintos = np.asarray(pd.Index(distintos).astype(str), dtype=object)
+    nulos = codigos < 0
+    if nulos.any():
+        codigos_nulos, distintos_nulos = pd.factorize(serie[nulos].astype(str))
+        codigos[nulos] = codigos_nulos + len(distintos)
+        distintos = np.concatenate([distintos, np.asarray(distintos_nulos, dtype=object)])
+    return codigos, distintos
+
+
+def _limpiar_distintos(valores: np.ndarray, motor: str) -> np.ndarray:
+    """strip + minúsculas sobre valores distintos (kernels Arrow o Python)"""
+    if motor == 'arrow':
+        arreglo = pa.array(valores, type=pa.string())
+        return pc.utf8_lower(pc.utf8_trim_whitespace(arreglo)).to_numpy(zero_copy_only=False)
+    return np.array([valor.strip().lower() for valor in valores], dtype=object)
+
+
+def _limpiar_series_texto(series: List[pd.Series], motor: str = 'auto') -> List[pd.Series]:
+    """
+    Limpiar varias Series de texto en una llamada
+    
+    Cada Serie se factoriza; los valores distintos de todas se unen, se
+    limpian una sola vez y el resultado se expande con los códigos, sin
+    Series intermedias del tamaño de la columna.
+    """
+    if not series:
+        return []
+    motor = _motor_texto(motor)
+    partes = [_textos_distintos(serie) for serie in series]
+    todos = pd.Index(np.concatenate([distintos for _, distintos in partes])).unique()
+    limpios = _limpiar_distintos(todos.to_numpy(dtype=object), motor)
+    
+    resultado = []
+    for serie, (codigos, distintos) in zip(series, partes):
+        posiciones = todos.get_indexer(distintos)
+        resultado.append(pd.Series(limpios[posiciones][codigos], index=serie.index, name=serie.name))
+    return resultado
+
+
+def limpiar_columnas_texto(df: pd.DataFrame, columnas: List[str],
+                           motor: str = 'auto') -> pd.DataFrame:
     """
     Limpia columnas de texto: elimina espacios, convierte a minúsculas
     
+    Solo se procesan los valores distintos de las columnas (ver
+    _limpiar_series_texto), con str de Python o, con motor='arrow', con
+    kernels de Arrow (ver _motor_texto para las diferencias).
+    
     Args:
         df: DataFrame a procesar
         columnas: Lista de columnas a limpiar
+        motor: 'auto', 'arrow' o 'python'
         
     Returns:
         DataFrame con columnas limpias
     """
     df_copy = df.copy()
     
-    for col in columnas:
-        if col in df_copy.columns:
-            df_copy[col] = (df_copy[col]
-                           .astype(str)
-                           .str.strip()
-                           .str.lower())
+    presentes = [col for col in columnas if col in df_copy.columns]
+    limpias = _limpiar_series_texto([df_copy[col] for col in presentes], motor)
+    for col, serie in zip(presentes, limpias):
+        df_copy[col] = serie
     
     return df_copy
 
 
-def validar_emails(df: pd.DataFrame, columna_email: str) -> pd.DataFrame:
+def validar_emails(df: pd.DataFrame, columna_email: str,
+                   motor: str = 'auto') -> pd.DataFrame:
     """
     Valida y marca emails válidos/inválidos
     
+    El patrón precompilado se evalúa una sola vez por valor distinto y el
+    resultado se expande con los códigos de factorize: con str.match sobre
+    los distintos o, con motor='arrow', con match_substring_regex (RE2; ver
+    _motor_texto para las diferencias).
+    
     Args:
         df: DataFrame con columna de emails
         columna_email: Nombre de la columna con emails
+        motor: 'auto', 'arrow' o 'python'
         
     Returns:
         DataFrame con columna adicional de validación
     """
     df_copy = df.copy()
     
-    # Patrón simple de validación de email
-    patron_email = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    codigos, distintos = _textos_distintos(df_copy[columna_email])
+    if _motor_texto(motor) == 'arrow':
+        validos = pc.match_substring_regex(
+            pa.array(distintos, type=pa.string()), PATRON_EMAIL.pattern
+        ).to_numpy(zero_copy_only=False)
+    else:
+        validos = pd.Series(distintos, dtype=object).str.match(PATRON_EMAIL).to_numpy(dtype=bool)
     
-    df_copy[f'{columna_email}_valido'] = (
-        df_copy[columna_email]
-        .astype(str)
-        .str.match(patron_email)
-    )
+    df_copy[f'{columna_email}_valido'] = validos[codigos]
     
     return df_copy
 
@@ -65,32 +167,62 @@ def validar_emails(df: pd.DataFrame, columna_email: str) -> pd.DataFrame:
 def eliminar_outliers(df: pd.DataFrame, 
                       columna: str, 
                       metodo: str = 'iqr',
-                      umbral: float = 1.5) -> pd.DataFrame:
+                      umbral: float = 1.5,
+                      backend: str = 'exacto',
+                      error: float = 0.01,
+                      sketch: Optional[Any] = None,
+                      retorno: str = 'dataframe',
+                      informar: bool = True) -> Union[pd.DataFrame, pd.Series, np.ndarray]:
     """
     Elimina outliers usando IQR o desviación estándar
     
+    Con metodo='iqr' los cuartiles se obtienen según backend:
+    'exacto' (un único quantile sobre la columna) o 'kll' (sketch KLL con
+    error de rango acotado por 'error', memoria O(1/error) y combinable entre
+    chunks y workers). Si se pasa un sketch ya ajustado (SketchKLL o DigestoT,
+    p. ej. combinado de varios workers) se usan sus cuartiles y la columna
+    solo se recorre para construir la máscara.
+    
     Args:
         df: DataFrame a procesar
         columna: Columna numérica a analizar
         metodo: 'iqr' o 'std'
         umbral: Factor de umbral (1.5 para IQR, 3 para std)
+        backend: 'exacto' o 'kll' (solo para 'iqr')
+        error: Error de rango máximo del sketch KLL (0.01 = 1%)
+        sketch: Sketch de cuantiles ya ajustado (opcional, solo para 'iqr')
+        retorno: 'dataframe' (copia filtrada), 'mascara' (Serie booleana de
+                 filas a conservar) o 'indices' (posiciones de filas a conservar)
+        informar: Imprimir la cantidad de outliers removidos
         
     Returns:
-        DataFrame sin outliers
+        DataFrame sin outliers, máscara o posiciones según retorno
     """
-    df_copy = df.copy()
+    if retorno not in ('dataframe', 'mascara', 'indices'):
+        raise ValueError("Retorno debe ser 'dataframe', 'mascara' o 'indices'")
+    valores = df[columna]
     
     if metodo == 'iqr':
-        Q1 = df_copy[columna].quantile(0.25)
-        Q3 = df_copy[columna].quantile(0.75)
+        if sketch is not None:
+            Q1, Q3 = sketch.cuantil(0.25), sketch.cuantil(0.75)
+        elif backend == 'exacto':
+            Q1, Q3 = valores.quantile([0.25, 0.75])
+        elif backend == 'kll':
+            sketch = SketchKLL(error)
+            validos = _valores_validos(valores)
+            for inicio in range(0, len(validos), SketchKLL.BLOQUE):
+                sketch.actualizar(validos[inicio:inicio + SketchKLL.BLOQUE])
+            Q1, Q3 = sketch.cuantil(0.25), sketch.cuantil(0.75)
+        else:
+            raise ValueError("Backend debe ser 'exacto' o 'kll'")
         IQR = Q3 - Q1
         
         limite_inferior = Q1 - umbral * IQR
         limite_superior = Q3 + umbral * IQR
         
     elif metodo == 'std':
-        media = df_copy[columna].mean()
-        std = df_copy[columna].std()
+        media = valores.mean()
+        std = valores.std()
         
         limite_inferior = media - umbral * std
         limite_superior = media + umbral * std
@@ -99,43 +231,44 @@ def eliminar_outliers(df: pd.DataFrame,
         raise ValueError("Método debe ser 'iqr' o 'std'")
     
     mask = (
-        (df_copy[columna] >= limite_inferior) &
-        (df_copy[columna] <= limite_superior)
+        (valores >= limite_inferior) &
+        (valores <= limite_superior)
     )
     
-    outliers_removidos = (~mask).sum()
-    print(f"Outliers removidos de '{columna}': {outliers_removidos}")
+    if informar:
+        outliers_removidos = (~mask).sum()
+        print(f"Outliers removidos de '{columna}': {outliers_removidos}")
     
-    return df_copy[mask]
+    if retorno == 'mascara':
+        return mask
+    if retorno == 'indices':
+        return np.flatnonzero(mask.to_numpy())
+    return df[mask]
 
 
 def normalizar_fechas(df: pd.DataFrame, 
                      columna_fecha: str,
-                     formato: Optional[str] = None) -> pd.DataFrame:
+                     formato: Optional[str] = None,
+                     parser: Optional['ParserFechas'] = None) -> pd.DataFrame:
     """
     Normaliza columnas de fecha a datetime
     
+    Sin formato, se infiere una vez a partir de una muestra y se parsean
+    solo los valores distintos (ver ParserFechas).
+    
     Args:
         df: DataFrame a procesar
         columna_fecha: Columna con fechas
         formato: Formato de fecha (opcional)
+        parser: ParserFechas reutilizable entre chunks (opcional, ignora formato)
         
     Returns:
         DataFrame con fechas normalizadas
     """
     df_copy = df.copy()
     
-    if formato:
-        df_copy[columna_fecha] = pd.to_datetime(
-            df_copy[columna_fecha],
-            format=formato,
-            errors='coerce'
-        )
-    else:
-        df_copy[columna_fecha] = pd.to_datetime(
-            df_copy[columna_fecha],
-            errors='coerce'
-        )
+    parser = parser or ParserFechas(formato)
+    df_copy[columna_fecha] = parser.parsear(df_copy[columna_fecha])
     
     # Contar fechas inválidas
     invalidas = df_copy[columna_fecha].isnull().sum()
@@ -146,13 +279,19 @@ def normalizar_fechas(df: pd.DataFrame,
 
 
 def crear_columnas_temporales(df: pd.DataFrame, 
-                              columna_fecha: str) -> pd.DataFrame:
+                              columna_fecha: str,
+                              parser: Optional['ParserFechas'] = None) -> pd.DataFrame:
     """
     Crea columnas derivadas de fecha (año, mes, día, etc.)
     
+    La fecha se parsea una sola vez (nada si ya es datetime) y las seis
+    columnas se calculan con aritmética entera sobre los días desde epoch:
+    año en int16 y el resto en int8 (Int16/Int8 si hay fechas nulas).
+    
     Args:
         df: DataFrame con columna de fecha
         columna_fecha: Nombre de la columna fecha
+        parser: ParserFechas reutilizable entre chunks (opcional)
         
     Returns:
         DataFrame con columnas temporales adicionales
@@ -160,15 +299,13 @@ def crear_columnas_temporales(df: pd.DataFrame,
     df_copy = df.copy()
     
     # Asegurar que es datetime
-    df_copy[columna_fecha] = pd.to_datetime(df_copy[columna_fecha])
+    if not pd.api.types.is_datetime64_any_dtype(df_copy[columna_fecha]):
+        parser = parser or ParserFechas()
+        df_copy[columna_fecha] = parser.parsear(df_copy[columna_fecha], errors='raise')
     
     # Crear columnas derivadas
-    df_copy[f'{columna_fecha}_anio'] = df_copy[columna_fecha].dt.year
-    df_copy[f'{columna_fecha}_mes'] = df_copy[columna_fecha].dt.month
-    df_copy[f'{columna_fecha}_dia'] = df_copy[columna_fecha].dt.day
-    df_copy[f'{columna_fecha}_dia_semana'] = df_copy[columna_fecha].dt.dayofweek
-    df_copy[f'{columna_fecha}_trimestre'] = df_copy[columna_fecha].dt.quarter
-    df_copy[f'{columna_fecha}_semana'] = df_copy[columna_fecha].dt.isocalendar().week
+    for sufijo, valores in _componentes_fecha(df_copy[columna_fecha]).items():
+        df_copy[f'{columna_fecha}_{sufijo}'] = valores
     
     return df_copy
 
@@ -323,6 +460,1279 @@ def detectar_duplicados_avanzado(df: pd.DataFrame,
     return resultado
 
 
+class ParserFechas:
+    """
+    Parser de fechas con formato inferido y memoización de valores distintos
+    
+    El formato se infiere una sola vez de una muestra de valores distintos
+    (el más frecuente según guess_datetime_format) y se reutiliza en cada
+    llamada. Cada columna se factoriza y solo sus valores distintos que no
+    están en la caché se parsean, de forma vectorizada con el formato
+    inferido; los que no encajan (columnas con formatos mezclados) se
+    parsean con format='mixed'. Un formato explícito se respeta: los valores
+    que no encajan son inválidos. El resultado se expande con los códigos,
+    así que el costo depende de la cardinalidad y no del número de filas.
+    Las columnas casi sin repetidos se parsean sin pasar por la caché.
+    Un mismo parser puede usarse en todos los chunks de un archivo.
+    
+    Las fechas con zona horaria u offset conservan la zona (offsets
+    distintos, o columnas que mezclan fechas con y sin zona, se expresan en
+    UTC); las fechas sin zona quedan como datetime64[ns] sin zona. La zona
+    se memoriza por valor y se resuelve en cada llamada, de modo que un
+    chunk sin zona da datetime64[ns] aunque otros chunks tuvieran offset.
+    """
+    
+    def __init__(self, formato: Optional[str] = None, dayfirst: bool = False,
+                 tamano_muestra: int = 200, max_cache: int = 1_000_000,
+                 max_ratio_cache: float = 0.5):
+        """
+        Args:
+            formato: Formato fijo (None = inferir de la primera columna)
+            dayfirst: Preferir día/mes en fechas ambiguas al inferir
+            tamano_muestra: Valores distintos usados para inferir el formato
+            max_cache: Valores distintos memorizados (se vacía al superarlo)
+            max_ratio_cache: Proporción de valores distintos por fila a partir
+                de la cual no se usa la caché (si hay más de tamano_muestra)
+        """
+        self.formato = formato
+        self.formato_inferido = False
+        self.dayfirst = dayfirst
+        self.tamano_muestra = tamano_muestra
+        self.max_cache = max_cache
+        self.max_ratio_cache = max_ratio_cache
+        self._claves = pd.Index([], dtype=object)
+        self._valores = np.empty(0, dtype=np.int64)
+        self._zonas = np.empty(0, dtype=object)
+    
+    def inferir_formato(self, valores: np.ndarray) -> Optional[str]:
+        """Formato más frecuente en una muestra de valores (None si ninguno)"""
+        with warnings.catch_warnings():
+            # Avisos de día/mes ambiguo: la decisión la toma dayfirst
+            warnings.simplefilter('ignore', UserWarning)
+            formatos = pd.Series([
+                guess_datetime_format(valor, dayfirst=self.dayfirst)
+                for valor in valores[:self.tamano_muestra]
+            ], dtype=object).dropna()
+        return None if formatos.empty else formatos.mode()[0]
+    
+    def _a_datetime(self, valores: np.ndarray, formato: str) -> Tuple[np.ndarray, Any]:
+        """
+        Parsear con un formato a int64 (ns desde epoch, UTC si hay zona)
+        
+        Returns:
+            Tupla (arreglo int64, zona): zona None si no hay fechas válidas
+            y '' si no tienen zona
+        """
+        with warnings.catch_warnings():
+            # Offsets distintos: pandas devuelve objetos (y avisa); se repite en UTC
+            warnings.simplefilter('ignore', FutureWarning)
+            fechas = pd.to_datetime(valores, format=formato, dayfirst=self.dayfirst, errors='coerce')
+        if not isinstance(fechas, pd.DatetimeIndex):
+            fechas = pd.to_datetime(valores, format=formato, dayfirst=self.dayfirst,
+                                    errors='coerce', utc=True)
+        zona = fechas.tz
+        if zona is not None:
+            fechas = fechas.tz_convert('UTC').tz_localize(None)
+        if fechas.isna().all():
+            return fechas.to_numpy(dtype='datetime64[ns]').view(np.int64), None
+        return fechas.to_numpy(dtype='datetime64[ns]').view(np.int64), zona or ''
+    
+    @staticmethod
+    def _unir_zonas(actual: Any, nueva: Any) -> Any:
+        """Zona común de dos grupos de fechas: UTC si difieren"""
+        if nueva is None:
+            return actual
+        if actual is None or actual == nueva:
+            return nueva
+        return 'UTC'
+    
+    def _parsear_distintos(self, valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parsear valores distintos a int64 (NaT incluido; UTC si hay zona)
+        
+        Returns:
+            Tupla (arreglo int64, zona de cada valor: None si es NaT y ''
+            si no tiene zona)
+        """
+        if self.formato is None:
+            self.formato = self.inferir_formato(valores)
+            self.formato_inferido = True
+        nat = np.iinfo(np.int64).min
+        enteros, zona = self._a_datetime(valores, self.formato or 'mixed')
+        zonas = np.full(len(valores), zona, dtype=object)
+        fallidos = np.flatnonzero(enteros == nat)
+        if self.formato and self.formato_inferido and len(fallidos):
+            # Solo un formato inferido admite formatos mezclados; uno explícito se exige
+            enteros[fallidos], zonas[fallidos] = self._a_datetime(valores[fallidos], 'mixed')
+        zonas[enteros == nat] = None
+        return enteros, zonas
+    
+    def parsear(self, serie: pd.Series, errors: str = 'coerce') -> pd.Series:
+        """
+        Convertir una Serie a datetime64[ns] (con zona si el texto la indica)
+        
+        Args:
+            serie: Serie con fechas (texto u otro tipo)
+            errors: 'coerce' (inválidas como NaT) o 'raise'
+            
+        Returns:
+            Serie datetime con el mismo índice y nombre
+        """
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            return serie
+        if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+            return pd.to_datetime(serie, errors=errors)
+        
+        codigos, distintos = pd.factorize(serie)
+        # Valores distintos pueden coincidir como texto (date(2024, 1, 1) y
+        # '2024-01-01'): se factoriza de nuevo sobre el texto
+        codigos_texto, distintos = pd.factorize(distintos.astype(str))
+        codigos = np.where(codigos < 0, -1, codigos_texto[codigos])
+        
+        if len(distintos) > max(self.max_ratio_cache * len(serie), self.tamano_muestra):
+            # Casi sin repetidos: la caché no ahorra parseos y crece sin reutilizarse
+            tabla, zonas = self._parsear_distintos(np.asarray(distintos, dtype=object))
+            posiciones = np.arange(len(distintos))
+        else:
+            posiciones = self._claves.get_indexer(distintos)
+            nuevos = np.flatnonzero(posiciones < 0)
+            if len(nuevos):
+                if len(self._claves) + len(nuevos) > self.max_cache:
+                    self._claves = pd.Index([], dtype=object)
+                    self._valores = np.empty(0, dtype=np.int64)
+                    self._zonas = np.empty(0, dtype=object)
+                    posiciones = np.full(len(distintos), -1)
+                    nuevos = np.arange(len(distintos))
+                posiciones[nuevos] = len(self._claves) + np.arange(len(nuevos))
+                valores_nuevos, zonas_nuevas = self._parsear_distintos(np.asarray(distintos[nuevos], dtype=object))
+                self._valores = np.r_[self._valores, valores_nuevos]
+                self._zonas = np.r_[self._zonas, zonas_nuevas]
+                self._claves = self._claves.append(pd.Index(distintos[nuevos], dtype=object))
+            tabla, zonas = self._valores, self._zonas
+        
+        # Zona común de los valores de esta llamada
+        zona = None
+        for zona_valor in set(zonas[posiciones].tolist()):
+            zona = self._unir_zonas(zona, zona_valor)
+        
+        valores = tabla[posiciones][codigos]
+        nat = np.iinfo(np.int64).min
+        valores[codigos < 0] = nat
+        
+        if errors == 'raise':
+            invalidas = (valores == nat) & (codigos >= 0)
+            if invalidas.any():
+                ejemplos = serie[invalidas].unique()[:5].tolist()
+                raise ValueError(f"Fechas no reconocidas en '{serie.name}': {ejemplos}")
+        
+        fechas = pd.Series(valores.view('datetime64[ns]'), index=serie.index, name=serie.name)
+        if zona:
+            fechas = fechas.dt.tz_localize('UTC').dt.tz_convert(zona)
+        return fechas
+
+
+def _componentes_fecha(fechas: pd.Series) -> Dict[str, Any]:
+    """
+    Año, mes, día, día de semana, trimestre y semana ISO en una pasada
+    
+    Se trabaja sobre los días desde 1970-01-01 (enteros) con el algoritmo
+    civil_from_days de H. Hinnant, sin objetos Timestamp ni pasadas .dt
+    separadas.
+    
+    Args:
+        fechas: Serie datetime (con o sin zona horaria)
+        
+    Returns:
+        Dict {sufijo: arreglo} con int16 para el año e int8 para el resto
+        (Int16/Int8 nulables si hay NaT)
+    """
+    if getattr(fechas.dt, 'tz', None) is not None:
+        fechas = fechas.dt.tz_localize(None)
+    dias = fechas.to_numpy(dtype='datetime64[D]').view(np.int64)
+    nulos = np.isnat(fechas.to_numpy(dtype='datetime64[D]'))
+    dias = np.where(nulos, 0, dias)
+    
+    # civil_from_days: eras de 400 años contadas desde el 1 de marzo
+    z = dias + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    dia = doy - (153 * mp + 2) // 5 + 1
+    mes = np.where(mp < 10, mp + 3, mp - 9)
+    anio = yoe + era * 400 + (mes <= 2)
+    
+    dia_semana = (dias + 3) % 7  # 1970-01-01 fue jueves; lunes = 0
+    
+    # Semana ISO: día del año y semanas (52/53) del año y del anterior
+    def inicio_anio(y):
+        y = y - 1
+        era_y = y // 400
+        yoe_y = y - era_y * 400
+        return era_y * 146097 + yoe_y * 365 + yoe_y // 4 - yoe_y // 100 + 306 - 719468
+    
+    def semanas_anio(y):
+        p = lambda a: (a + a // 4 - a // 100 + a // 400) % 7
+        return np.where((p(y) == 4) | (p(y - 1) == 3), 53, 52)
+    
+    ordinal = dias - inicio_anio(anio) + 1
+    semana = (ordinal - (dia_semana + 1) + 10) // 7
+    semana = np.where(semana > semanas_anio(anio), 1, semana)
+    semana = np.where(semana < 1, semanas_anio(anio - 1), semana)
+    
+    componentes = {
+        'anio': (anio, np.int16),
+        'mes': (mes, np.int8),
+        'dia': (dia, np.int8),
+        'dia_semana': (dia_semana, np.int8),
+        'trimestre': ((mes - 1) // 3 + 1, np.int8),
+        'semana': (semana, np.int8)
+    }
+    resultado = {}
+    for sufijo, (valores, dtype) in componentes.items():
+        valores = valores.astype(dtype)
+        if nulos.any():
+            valores = pd.array(valores, dtype=pd.api.types.pandas_dtype(dtype).name.capitalize())
+            valores[nulos] = pd.NA
+        resultado[sufijo] = pd.Series(valores, index=fechas.index)
+    return resultado
+
+
+class PlanTransformaciones:
+    """
+    Constructor perezoso de transformaciones con ejecución en una sola pasada
+    
+    Cada método registra un paso (mismos parámetros y semántica que la función
+    homónima del módulo) y devuelve el plan para encadenar. Nada se ejecuta
+    hasta ejecutar() o ejecutar_por_chunks(). Al compilar el plan:
+    
+    - Los pasos consecutivos del mismo tipo se fusionan (una sola limpieza de
+      texto, imputación o codificación para todas sus columnas) y
+      normalizar_fechas seguido de crear_columnas_temporales sobre la misma
+      columna parsea las fechas una sola vez.
+    - Si se llamó a seleccionar(), se descartan los pasos y columnas cuyo
+      resultado no llega a la salida y solo se leen las columnas de entrada
+      necesarias (ver columnas_requeridas()).
+    
+    La ejecución trabaja sobre un diccionario de columnas que comparte las
+    Series de entrada sin modificar; solo las columnas transformadas generan
+    datos nuevos y el DataFrame de salida se construye una única vez.
+    
+    Ejemplo:
+        plan = (PlanTransformaciones()
+                .limpiar_columnas_texto(['nombre', 'ciudad'])
+                .imputar_valores_faltantes({'edad': 'median'})
+                .estandarizar_columnas(['edad'])
+                .seleccionar(['nombre', 'edad_std']))
+        df_salida = plan.ejecutar(df)
+    """
+    
+    def __init__(self):
+        self.pasos: List[Tuple[str, Any]] = []
+        self.seleccion: Optional[List[str]] = None
+        # Un parser por columna de fecha: formato y caché se reutilizan entre chunks
+        self._parsers: Dict[Tuple[str, Optional[str]], ParserFechas] = {}
+    
+    def limpiar_columnas_texto(self, columnas: List[str]) -> 'PlanTransformaciones':
+        """Registrar limpieza de texto (strip + minúsculas)"""
+        self.pasos.append(('limpiar_texto', list(columnas)))
+        return self
+    
+    def normalizar_fechas(self, columna_fecha: str,
+                          formato: Optional[str] = None) -> 'PlanTransformaciones':
+        """Registrar conversión a datetime (fechas inválidas como NaT)"""
+        self.pasos.append(('fechas', {
+            'columna': columna_fecha,
+            'formato': formato,
+            'coerce': True,
+            'derivar': False
+        }))
+        return self
+    
+    def crear_columnas_temporales(self, columna_fecha: str) -> 'PlanTransformaciones':
+        """Registrar columnas derivadas de fecha (año, mes, día, etc.)"""
+        self.pasos.append(('fechas', {
+            'columna': columna_fecha,
+            'formato': None,
+            'coerce': False,
+            'derivar': True
+        }))
+        return self
+    
+    def imputar_valores_faltantes(self, estrategia: Dict[str, str]) -> 'PlanTransformaciones':
+        """Registrar imputación de faltantes {columna: método}"""
+        self.pasos.append(('imputar', dict(estrategia)))
+        return self
+    
+    def estandarizar_columnas(self, columnas: List[str]) -> 'PlanTransformaciones':
+        """Registrar estandarización (nuevas columnas '<col>_std')"""
+        self.pasos.append(('estandarizar', list(columnas)))
+        return self
+    
+    def codificar_categoricas(self, columnas: List[str],
+                              metodo: str = 'onehot') -> 'PlanTransformaciones':
+        """Registrar codificación 'onehot' o 'label'"""
+        if metodo not in ('onehot', 'label'):
+            raise ValueError("Método debe ser 'onehot' o 'label'")
+        self.pasos.append(('codificar', {'metodo': metodo, 'columnas': list(columnas)}))
+        return self
+    
+    def seleccionar(self, columnas: List[str]) -> 'PlanTransformaciones':
+        """Fijar las columnas (y su orden) del DataFrame de salida"""
+        self.seleccion = list(columnas)
+        return self
+    
+    @staticmethod
+    def _columnas_fecha(columna: str) -> List[str]:
+        """Nombres de las columnas derivadas de una fecha"""
+        return [f'{columna}_{sufijo}' for sufijo in SUFIJOS_FECHA]
+    
+    @staticmethod
+    def _fusionar(pasos: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+        """Fusionar pasos consecutivos compatibles"""
+        fusionados: List[Tuple[str, Any]] = []
+        for paso, arg in pasos:
+            previo, arg_previo = fusionados[-1] if fusionados else (None, None)
+            
+            if paso == previo and paso in ('limpiar_texto', 'estandarizar'):
+                arg = arg_previo + [col for col in arg if col not in arg_previo]
+            elif paso == previo == 'imputar' and not set(arg) & set(arg_previo):
+                # Solo columnas disjuntas: una segunda imputación de la misma
+                # columna puede seguir teniendo efecto ('forward' deja los
+                # faltantes iniciales para 'backward'; 'mean' sobre un chunk
+                # sin valores deja NaN para una constante posterior)
+                arg = {**arg_previo, **arg}
+            elif paso == previo == 'codificar' and arg['metodo'] == arg_previo['metodo']:
+                arg = {
+                    'metodo': arg['metodo'],
+                    'columnas': arg_previo['columnas'] + [
+                        col for col in arg['columnas'] if col not in arg_previo['columnas']
+                    ]
+                }
+            elif (paso == previo == 'fechas' and arg['columna'] == arg_previo['columna']
+                  and arg_previo['coerce'] and not arg['coerce']):
+                # normalizar_fechas + crear_columnas_temporales: un solo parseo
+                arg = {**arg_previo, 'derivar': arg_previo['derivar'] or arg['derivar']}
+            else:
+                fusionados.append((paso, arg))
+                continue
+            fusionados[-1] = (paso, arg)
+        
+        return fusionados
+    
+    def _podar(self, paso: str, arg: Any,
+               vivas: Set[str]) -> Optional[Tuple[Any, Set[str], Set[str]]]:
+        """
+        Restringir un paso a las columnas vivas aguas abajo
+        
+        Returns:
+            Tupla (argumento restringido, columnas leídas, columnas escritas)
+            o None si el paso no contribuye a la salida
+        """
+        if paso in ('limpiar_texto', 'imputar'):
+            columnas = [col for col in arg if col in vivas]
+            if not columnas:
+                return None
+            arg = columnas if paso == 'limpiar_texto' else {col: arg[col] for col in columnas}
+            return arg, set(columnas), set(columnas)
+        
+        if paso == 'estandarizar':
+            columnas = [col for col in arg if f'{col}_std' in vivas]
+            if not columnas:
+                return None
+            return columnas, set(columnas), {f'{col}_std' for col in columnas}
+        
+        if paso == 'fechas':
+            columna = arg['columna']
+            derivadas = set(self._columnas_fecha(columna))
+            derivar = arg['derivar'] and bool(derivadas & vivas)
+            if columna not in vivas and not derivar:
+                return None
+            escritas = {columna} | (derivadas if derivar else set())
+            return {**arg, 'derivar': derivar}, {columna}, escritas
+        
+        # codificar one-hot: los nombres de las columnas dependen de los datos
+        # (un nombre seleccionado puede ser una dummy o una columna de
+        # entrada), así que el paso no se poda ni marca columnas escritas
+        if arg['metodo'] == 'onehot':
+            return arg, set(arg['columnas']), set()
+        columnas = [col for col in arg['columnas'] if f'{col}_encoded' in vivas]
+        if not columnas:
+            return None
+        return {'metodo': arg['metodo'], 'columnas': columnas}, set(columnas), {f'{col}_encoded' for col in columnas}
+    
+    def compilar(self) -> Tuple[List[Tuple[str, Any]], Optional[Set[str]]]:
+        """
+        Fusionar y podar el plan
+        
+        Returns:
+            Tupla (pasos optimizados, columnas de entrada requeridas o None si
+            se necesitan todas)
+        """
+        pasos = self._fusionar(self.pasos)
+        if self.seleccion is None:
+            return pasos, None
+        
+        vivas = set(self.seleccion)
+        podados = []
+        ambiguas = False
+        for paso, arg in reversed(pasos):
+            restringido = self._podar(paso, arg, vivas)
+            if restringido is None:
+                continue
+            arg, leidas, escritas = restringido
+            if paso == 'codificar' and arg['metodo'] == 'onehot':
+                ambiguas |= any(nombre.startswith(f'{col}_') for nombre in vivas for col in arg['columnas'])
+            vivas = (vivas - escritas) | leidas
+            podados.append((paso, arg))
+        
+        # Si alguna columna viva puede ser una dummy one-hot, no se sabe cuáles
+        # existen en la entrada: se leen todas
+        return podados[::-1], None if ambiguas else vivas
+    
+    def columnas_requeridas(self) -> Optional[List[str]]:
+        """
+        Columnas de entrada que el plan necesita (p. ej. para usecols de read_csv)
+        
+        Returns:
+            Lista ordenada de columnas o None si no hay selección
+        """
+        _, requeridas = self.compilar()
+        return None if requeridas is None else sorted(requeridas)
+    
+    def _aplicar(self, paso: str, arg: Any, columnas: Dict[str, pd.Series]) -> None:
+        """Ejecutar un paso sobre el diccionario de columnas"""
+        if paso == 'limpiar_texto':
+            presentes = [col for col in arg if col in columnas]
+            limpias = _limpiar_series_texto([columnas[col] for col in presentes])
+            columnas.update(zip(presentes, limpias))
+        
+        elif paso == 'fechas':
+            col = arg['columna']
+            clave = (col, arg['formato'])
+            if clave not in self._parsers:
+                self._parsers[clave] = ParserFechas(arg['formato'])
+            if arg['coerce']:
+                fechas = self._parsers[clave].parsear(columnas[col])
+                invalidas = fechas.isnull().sum()
+                if invalidas > 0:
+                    print(f"Advertencia: {invalidas} fechas inválidas en '{col}'")
+            else:
+                fechas = self._parsers[clave].parsear(columnas[col], errors='raise')
+            columnas[col] = fechas
+            if arg['derivar']:
+                for sufijo, valores in _componentes_fecha(fechas).items():
+                    columnas[f'{col}_{sufijo}'] = valores
+        
+        elif paso == 'imputar':
+            for col, metodo in arg.items():
+                if col not in columnas:
+                    print(f"Advertencia: Columna '{col}' no existe")
+                    continue
+                serie = columnas[col]
+                if metodo == 'mean':
+                    columnas[col] = serie.fillna(serie.mean())
+                elif metodo == 'median':
+                    columnas[col] = serie.fillna(serie.median())
+                elif metodo == 'mode':
+                    columnas[col] = serie.fillna(serie.mode()[0])
+                elif metodo == 'forward':
+                    columnas[col] = serie.ffill()
+                elif metodo == 'backward':
+                    columnas[col] = serie.bfill()
+                else:
+                    # Valor constante
+                    columnas[col] = serie.fillna(metodo)
+        
+        elif paso == 'estandarizar':
+            for col in arg:
+                if col in columnas:
+                    serie = columnas[col]
+                    columnas[f'{col}_std'] = (serie - serie.mean()) / serie.std()
+        
+        elif paso == 'codificar':
+            for col in arg['columnas']:
+                if arg['metodo'] == 'label':
+                    columnas[f'{col}_encoded'] = pd.Series(
+                        pd.factorize(columnas[col])[0], index=columnas[col].index
+                    )
+            if arg['metodo'] == 'onehot':
+                dummies = [
+                    pd.get_dummies(columnas.pop(col), prefix=col, drop_first=True)
+                    for col in arg['columnas']
+                ]
+                for tabla in dummies:
+                    columnas.update(tabla.items())
+    
+    def ejecutar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Ejecutar el plan sobre un DataFrame (no se modifica)
+        
+        Args:
+            df: DataFrame de entrada
+            
+        Returns:
+            DataFrame transformado
+        """
+        pasos, requeridas = self.compilar()
+        columnas = {
+            col: df[col] for col in df.columns
+            if requeridas is None or col in requeridas
+        }
+        
+        for paso, arg in pasos:
+            self._aplicar(paso, arg, columnas)
+        
+        if self.seleccion is not None:
+            columnas = {col: columnas[col] for col in self.seleccion}
+        
+        return pd.DataFrame(columnas, index=df.index)
+    
+    def ejecutar_por_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Ejecutar el plan chunk a chunk (p. ej. sobre read_csv(chunksize=...))
+        
+        Las estadísticas (media, mediana, moda, desviación) se calculan por
+        chunk, igual que al aplicar las funciones del módulo a cada chunk.
+        Para estadísticas globales usar los transformadores ajustables
+        (Estandarizador, ImputadorFaltantes, EliminadorOutliers).
+        
+        Args:
+            chunks: Iterable de DataFrames
+            
+        Yields:
+            DataFrame transformado por cada chunk
+        """
+        for chunk in chunks:
+            yield self.ejecutar(chunk)
+
+
+def _valor_json(valor: Any) -> Any:
+    """Convertir escalares de numpy/pandas a tipos nativos serializables"""
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+def _etiquetar_valor(valor: Any) -> List[Any]:
+    """
+    Representación JSON [tipo, valor] de un valor candidato a moda
+    
+    La etiqueta conserva el tipo al recargar (2 frente a 2.0 frente a '2') y
+    permite serializar fechas y duraciones, que json no admite.
+    """
+    if isinstance(valor, pd.Timestamp):
+        return ['timestamp', valor.isoformat(), None if valor.tz is None else str(valor.tz)]
+    if isinstance(valor, pd.Timedelta):
+        return ['timedelta', valor.value]
+    for tipo, clase in (('bool', bool), ('int', int), ('float', float), ('str', str)):
+        if isinstance(valor, clase):
+            return [tipo, valor]
+    raise TypeError(f"Valor no serializable como candidato a moda: {type(valor).__name__}")
+
+
+def _desetiquetar_valor(tipo: str, valor: Any, zona: Optional[str] = None) -> Any:
+    """Inverso de _etiquetar_valor"""
+    if tipo == 'timestamp':
+        fecha = pd.Timestamp(valor)
+        try:
+            return fecha if zona is None else fecha.tz_convert(zona)
+        except (ValueError, KeyError):
+            # Zonas de desfase fijo: el desfase ya va en el texto ISO
+            return fecha
+    if tipo == 'timedelta':
+        return pd.Timedelta(valor)
+    return {'bool': bool, 'int': int, 'float': float, 'str': str}[tipo](valor)
+
+
+def _valores_validos(serie: pd.Series) -> np.ndarray:
+    """Valores numéricos no nulos de una Serie como float64"""
+    return serie.dropna().to_numpy(dtype=np.float64)
+
+
+class AcumuladorWelford:
+    """
+    Media y varianza en una pasada (Welford), combinables entre chunks
+    
+    Cada chunk se resume con numpy y se combina con el estado acumulado
+    (fórmula de Chan), sin guardar los valores.
+    """
+    
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+    
+    def actualizar(self, valores: np.ndarray) -> None:
+        """Incorporar valores (sin nulos)"""
+        if len(valores) == 0:
+            return
+        otro = AcumuladorWelford()
+        otro.n = len(valores)
+        otro.media = float(valores.mean())
+        otro.m2 = float(((valores - otro.media) ** 2).sum())
+        self.combinar(otro)
+    
+    def combinar(self, otro: 'AcumuladorWelford') -> None:
+        """Combinar con otro acumulador"""
+        if otro.n == 0:
+            return
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        self.media += delta * otro.n / n
+        self.m2 += otro.m2 + delta ** 2 * self.n * otro.n / n
+        self.n = n
+    
+    @property
+    def std(self) -> float:
+        """Desviación estándar muestral (ddof=1, como pandas)"""
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else float('nan')
+    
+    def a_dict(self) -> Dict[str, Any]:
+        return {'n': self.n, 'media': self.media, 'm2': self.m2}
+    
+    @classmethod
+    def desde_dict(cls, estado: Dict[str, Any]) -> 'AcumuladorWelford':
+        acumulador = cls()
+        acumulador.n = int(estado['n'])
+        acumulador.media = float(estado['media'])
+        acumulador.m2 = float(estado['m2'])
+        return acumulador
+
+
+class DigestoT:
+    """
+    Cuantiles aproximados en una pasada (t-digest), combinables entre chunks
+    
+    Los valores se acumulan en un buffer y se comprimen en centroides con la
+    función de escala k1: centroides pequeños en las colas y grandes en el
+    centro, ~compresion/2 centroides en total. Mientras no haya compresión
+    los cuantiles coinciden con los exactos de pandas (interpolación lineal).
+    """
+    
+    def __init__(self, compresion: int = 200):
+        self.compresion = compresion
+        self.medias = np.empty(0)
+        self.pesos = np.empty(0)
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+        self._buffer: List[np.ndarray] = []
+        self._tamano_buffer = 0
+    
+    @property
+    def n(self) -> float:
+        return float(self.pesos.sum()) + self._tamano_buffer
+    
+    def actualizar(self, valores: np.ndarray) -> None:
+        """Incorporar valores (sin nulos)"""
+        if len(valores) == 0:
+            return
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self._buffer.append(valores)
+        self._tamano_buffer += len(valores)
+        if self._tamano_buffer > 20 * self.compresion:
+            self._comprimir()
+    
+    def combinar(self, otro: 'DigestoT') -> None:
+        """Combinar con otro digesto"""
+        otro._comprimir()
+        self._comprimir()
+        self.medias = np.r_[self.medias, otro.medias]
+        self.pesos = np.r_[self.pesos, otro.pesos]
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self._comprimir(forzar=True)
+    
+    def _comprimir(self, forzar: bool = False) -> None:
+        """Volcar el buffer y fusionar centroides según la función de escala"""
+        if not self._buffer and not forzar:
+            return
+        medias = np.concatenate([self.medias, *self._buffer])
+        pesos = np.concatenate([self.pesos, *(np.ones(len(b)) for b in self._buffer)])
+        self._buffer, self._tamano_buffer = [], 0
+        if len(medias) <= self.compresion:
+            orden = np.argsort(medias, kind='stable')
+            self.medias, self.pesos = medias[orden], pesos[orden]
+            return
+        
+        orden = np.argsort(medias, kind='stable')
+        medias, pesos = medias[orden], pesos[orden]
+        acumulado = np.cumsum(pesos)
+        q = (acumulado - pesos / 2) / acumulado[-1]
+        k = self.compresion / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        cubeta = np.floor(k).astype(np.int64)
+        
+        limites = np.flatnonzero(np.r_[True, cubeta[1:] != cubeta[:-1]])
+        self.pesos = np.add.reduceat(pesos, limites)
+        self.medias = np.add.reduceat(medias * pesos, limites) / self.pesos
+    
+    def cuantil(self, q: float) -> float:
+        """
+        Cuantil q (0-1) interpolando entre centroides
+        
+        Cada centroide se ubica en el rango medio de los valores que resume y
+        los extremos son el mínimo y el máximo exactos.
+        """
+        self._comprimir()
+        total = self.pesos.sum()
+        if total == 0:
+            return float('nan')
+        antes = np.cumsum(self.pesos) - self.pesos
+        centros = antes + (self.pesos - 1) / 2
+        rangos = np.r_[0.0, centros, total - 1]
+        valores = np.r_[self.minimo, self.medias, self.maximo]
+        return float(np.interp(q * (total - 1), rangos, valores))
+    
+    def a_dict(self) -> Dict[str, Any]:
+        self._comprimir()
+        return {
+            'compresion': self.compresion,
+            'medias': self.medias.tolist(),
+            'pesos': self.pesos.tolist(),
+            'minimo': self.minimo,
+            'maximo': self.maximo
+        }
+    
+    @classmethod
+    def desde_dict(cls, estado: Dict[str, Any]) -> 'DigestoT':
+        digesto = cls(estado['compresion'])
+        digesto.medias = np.asarray(estado['medias'], dtype=np.float64)
+        digesto.pesos = np.asarray(estado['pesos'], dtype=np.float64)
+        digesto.minimo = float(estado['minimo'])
+        digesto.maximo = float(estado['maximo'])
+        return digesto
+
+
+class SketchKLL:
+    """
+    Cuantiles aproximados con error de rango acotado (sketch KLL)
+    
+    Jerarquía de compactadores: el nivel h guarda valores que representan
+    2^h observaciones. Cuando un nivel supera su capacidad se ordena y se
+    promueve uno de cada dos valores (desplazamiento aleatorio) al nivel
+    siguiente. Con k = 1.7/error la diferencia entre el rango estimado y el
+    real queda por debajo de error·n con alta probabilidad, usando O(k)
+    valores en memoria. Dos sketches con el mismo error se combinan uniendo
+    nivel a nivel, por lo que chunks y workers pueden resumirse por separado.
+    """
+    
+    # Tamaño de bloque al alimentar una columna completa
+    BLOQUE = 1_000_000
+    
+    def __init__(self, error: float = 0.01, semilla: Optional[int] = None):
+        if not 0 < error < 1:
+            raise ValueError("El error debe estar entre 0 y 1")
+        self.error = error
+        self.k = max(8, int(np.ceil(1.7 / error)))
+        self.niveles: List[np.ndarray] = [np.empty(0)]
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+        self._rng = np.random.default_rng(semilla)
+    
+    @property
+    def n(self) -> int:
+        return int(sum(len(nivel) << h for h, nivel in enumerate(self.niveles)))
+    
+    def _capacidad(self, nivel: int) -> int:
+        """Capacidad decreciente 2/3 por nivel hacia abajo desde el más alto"""
+        altura = len(self.niveles) - 1 - nivel
+        return max(2, int(np.ceil(self.k * (2 / 3) ** altura)))
+    
+    def _compactar(self) -> None:
+        nivel = 0
+        while nivel < len(self.niveles):
+            valores = self.niveles[nivel]
+            if len(valores) > self._capacidad(nivel):
+                if nivel + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                valores = np.sort(valores)
+                # Con cantidad impar el mayor queda en el nivel
+                impar = len(valores) % 2
+                pares = valores[:len(valores) - impar]
+                promovidos = pares[self._rng.integers(2)::2]
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], promovidos])
+                self.niveles[nivel] = valores[len(valores) - impar:]
+            nivel += 1
+    
+    def actualizar(self, valores: np.ndarray) -> None:
+        """Incorporar valores (sin nulos)"""
+        if len(valores) == 0:
+            return
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+    
+    def combinar(self, otro: 'SketchKLL') -> None:
+        """Combinar con otro sketch del mismo error"""
+        if otro.k != self.k:
+            raise ValueError("Los sketches KLL deben tener el mismo error")
+        for h, valores in enumerate(otro.niveles):
+            if h == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            self.niveles[h] = np.concatenate([self.niveles[h], valores])
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self._compactar()
+    
+    def cuantil(self, q: float) -> float:
+        """
+        Cuantil q (0-1) con interpolación lineal entre valores ponderados
+        
+        Sin compactaciones coincide con el cuantil exacto de pandas.
+        """
+        valores = np.concatenate(self.niveles)
+        if len(valores) == 0:
+            return float('nan')
+        pesos = np.concatenate([
+            np.full(len(nivel), float(1 << h)) for h, nivel in enumerate(self.niveles)
+        ])
+        orden = np.argsort(valores, kind='stable')
+        valores, pesos = valores[orden], pesos[orden]
+        total = pesos.sum()
+        centros = np.cumsum(pesos) - pesos + (pesos - 1) / 2
+        rangos = np.r_[0.0, centros, total - 1]
+        return float(np.interp(q * (total - 1), rangos, np.r_[self.minimo, valores, self.maximo]))
+    
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            'error': self.error,
+            'niveles': [nivel.tolist() for nivel in self.niveles],
+            'minimo': self.minimo,
+            'maximo': self.maximo
+        }
+    
+    @classmethod
+    def desde_dict(cls, estado: Dict[str, Any]) -> 'SketchKLL':
+        sketch = cls(estado['error'])
+        sketch.niveles = [np.asarray(nivel, dtype=np.float64) for nivel in estado['niveles']]
+        sketch.minimo = float(estado['minimo'])
+        sketch.maximo = float(estado['maximo'])
+        return sketch
+
+
+class SketchCountMin:
+    """
+    Moda aproximada en una pasada con count-min sketch
+    
+    El sketch (profundidad × ancho) estima la frecuencia de cualquier valor
+    por exceso; se conservan los 'candidatos' valores con mayor frecuencia
+    estimada para responder la moda. Cada chunk se cuenta con value_counts y
+    solo sus valores distintos pasan por el sketch.
+    """
+    
+    # Semillas fijas: sketches serializados o de otros workers son combinables
+    _SEMILLAS = np.array([
+        0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+        0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x27D4EB2F165667C5, 0x94D049BB133111EB
+    ], dtype=np.uint64)
+    
+    def __init__(self, ancho: int = 2048, profundidad: int = 4, candidatos: int = 32):
+        if profundidad > len(self._SEMILLAS):
+            raise ValueError(f"Profundidad máxima: {len(self._SEMILLAS)}")
+        self.ancho = ancho
+        self.profundidad = profundidad
+        self.max_candidatos = candidatos
+        self.tabla = np.zeros((profundidad, ancho), dtype=np.int64)
+        self.candidatos: Dict[Any, int] = {}
+    
+    @staticmethod
+    def _claves(valores: pd.Index) -> np.ndarray:
+        """Valores a hashear: los numéricos como float64 (2 y 2.0 son el mismo valor)"""
+        if pd.api.types.is_bool_dtype(valores):
+            return valores.to_numpy()
+        if (pd.api.types.is_numeric_dtype(valores)
+                or valores.inferred_type in ('integer', 'floating', 'mixed-integer-float')):
+            return valores.to_numpy(dtype=np.float64)
+        return valores.to_numpy()
+    
+    def _posiciones(self, valores: pd.Index) -> np.ndarray:
+        """Columna de la tabla para cada valor en cada fila (profundidad × n)"""
+        hashes = pd.util.hash_array(self._claves(valores))
+        mezcla = hashes[None, :] * self._SEMILLAS[:self.profundidad, None]
+        return ((mezcla >> np.uint64(32)) % np.uint64(self.ancho)).astype(np.int64)
+    
+    def _estimar(self, valores: pd.Index) -> np.ndarray:
+        posiciones = self._posiciones(valores)
+        filas = np.arange(self.profundidad)[:, None]
+        return self.tabla[filas, posiciones].min(axis=0)
+    
+    def _actualizar_candidatos(self, valores: pd.Index) -> None:
+        """Reestimar y recortar el conjunto de candidatos"""
+        if self.candidatos:
+            valores = pd.Index(list(self.candidatos)).append(valores)
+        todos = valores.unique()
+        estimados = self._estimar(todos)
+        mejores = np.argsort(-estimados, kind='stable')[:self.max_candidatos]
+        self.candidatos = {
+            _valor_json(todos[i]): int(estimados[i]) for i in mejores
+        }
+    
+    def actualizar(self, serie: pd.Series) -> None:
+        """Incorporar los valores no nulos de una Serie"""
+        conteos = serie.value_counts(dropna=True)
+        if conteos.empty:
+            return
+        posiciones = self._posiciones(conteos.index)
+        for fila in range(self.profundidad):
+            np.add.at(self.tabla[fila], posiciones[fila], conteos.to_numpy())
+        self._actualizar_candidatos(conteos.index)
+    
+    def combinar(self, otro: 'SketchCountMin') -> None:
+        """Combinar con otro sketch de igual forma"""
+        if (otro.ancho, otro.profundidad) != (self.ancho, self.profundidad):
+            raise ValueError("Los sketches deben tener igual ancho y profundidad")
+        self.tabla += otro.tabla
+        if otro.candidatos:
+            self._actualizar_candidatos(pd.Index(list(otro.candidatos)))
+    
+    def moda(self) -> Any:
+        """Valor con mayor frecuencia estimada (el menor en caso de empate)"""
+        if not self.candidatos:
+            return None
+        maximo = max(self.candidatos.values())
+        empatados = [valor for valor, cuenta in self.candidatos.items() if cuenta == maximo]
+        try:
+            return min(empatados)
+        except TypeError:
+            return empatados[0]
+    
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            'ancho': self.ancho,
+            'profundidad': self.profundidad,
+            'candidatos': self.max_candidatos,
+            'tabla': self.tabla.tolist(),
+            'valores': [[*_etiquetar_valor(valor), cuenta] for valor, cuenta in self.candidatos.items()]
+        }
+    
+    @classmethod
+    def desde_dict(cls, estado: Dict[str, Any]) -> 'SketchCountMin':
+        sketch = cls(estado['ancho'], estado['profundidad'], estado['candidatos'])
+        sketch.tabla = np.asarray(estado['tabla'], dtype=np.int64)
+        # Formato anterior sin etiqueta de tipo: [valor, cuenta]
+        sketch.candidatos = {
+            (entrada[0] if len(entrada) == 2 else _desetiquetar_valor(*entrada[:-1])): int(entrada[-1])
+            for entrada in estado['valores']
+        }
+        return sketch
+
+
+class TransformadorAjustable(ABC):
+    """
+    Base para transformaciones con estado ajustado en una pasada
+    
+    ajustar() recorre un DataFrame o un iterable de chunks acumulando
+    estadísticas con acumuladores de una pasada; transformar() aplica el
+    estado ajustado, de modo que todos los chunks se transforman con las
+    mismas estadísticas. Los ajustes parciales de varios workers se unen con
+    combinar() y el estado se serializa a JSON (guardar/cargar) para
+    transformar en paralelo o en otra ejecución.
+    """
+    
+    def __init__(self):
+        self.acumuladores: Dict[str, Dict[str, Any]] = {}
+        self.ajustado = False
+    
+    @abstractmethod
+    def _nuevos_acumuladores(self) -> Dict[str, Dict[str, Any]]:
+        """Acumuladores vacíos por columna"""
+    
+    @abstractmethod
+    def _parametros(self) -> Dict[str, Any]:
+        """Argumentos del constructor (para serializar el estado)"""
+    
+    def ajustar(self, datos: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> 'TransformadorAjustable':
+        """
+        Ajustar desde cero sobre un DataFrame o un iterable de chunks
+        
+        Args:
+            datos: DataFrame o iterable de DataFrames (p. ej. read_csv con chunksize)
+            
+        Returns:
+            El propio transformador
+        """
+        self.acumuladores = self._nuevos_acumuladores()
+        self.ajustado = False
+        chunks = [datos] if isinstance(datos, pd.DataFrame) else datos
+        for chunk in chunks:
+            self.ajustar_parcial(chunk)
+        return self
+    
+    def ajustar_parcial(self, chunk: pd.DataFrame) -> 'TransformadorAjustable':
+        """Acumular las estadísticas de un chunk adicional"""
+        if not self.acumuladores:
+            self.acumuladores = self._nuevos_acumuladores()
+        for columna, acumuladores in self.acumuladores.items():
+            if columna not in chunk.columns:
+                continue
+            for tipo, acumulador in acumuladores.items():
+                if tipo == 'moda':
+                    acumulador.actualizar(chunk[columna])
+                else:
+                    acumulador.actualizar(_valores_validos(chunk[columna]))
+        self.ajustado = True
+        return self
+    
+    def combinar(self, otro: 'TransformadorAjustable') -> 'TransformadorAjustable':
+        """Unir el ajuste de otro transformador con los mismos parámetros"""
+        if not self.acumuladores:
+            self.acumuladores = self._nuevos_acumuladores()
+        for columna, acumuladores in otro.acumuladores.items():
+            for tipo, acumulador in acumuladores.items():
+                self.acumuladores[columna][tipo].combinar(acumulador)
+        self.ajustado = self.ajustado or otro.ajustado
+        return self
+    
+    def _verificar_ajuste(self) -> None:
+        if not self.ajustado:
+            raise ValueError(f"{type(self).__name__} no está ajustado: llamar a ajustar() primero")
+    
+    def a_dict(self) -> Dict[str, Any]:
+        """Estado serializable (parámetros y acumuladores)"""
+        return {
+            'tipo': type(self).__name__,
+            'parametros': self._parametros(),
+            'ajustado': self.ajustado,
+            'acumuladores': {
+                columna: {tipo: acumulador.a_dict() for tipo, acumulador in acumuladores.items()}
+                for columna, acumuladores in self.acumuladores.items()
+            }
+        }
+    
+    @classmethod
+    def desde_dict(cls, estado: Dict[str, Any]) -> 'TransformadorAjustable':
+        """Reconstruir un transformador desde a_dict()"""
+        if estado['tipo'] != cls.__name__:
+            raise ValueError(f"Estado de {estado['tipo']}, se esperaba {cls.__name__}")
+        transformador = cls(**estado['parametros'])
+        clases = {
+            'welford': AcumuladorWelford,
+            'digesto': DigestoT,
+            'kll': SketchKLL,
+            'moda': SketchCountMin
+        }
+        transformador.acumuladores = {
+            columna: {tipo: clases[tipo].desde_dict(valor) for tipo, valor in acumuladores.items()}
+            for columna, acumuladores in estado['acumuladores'].items()
+        }
+        transformador.ajustado = estado['ajustado']
+        return transformador
+    
+    def guardar(self, ruta: str) -> None:
+        """Guardar el estado ajustado en JSON"""
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.a_dict(), f)
+    
+    @classmethod
+    def cargar(cls, ruta: str) -> 'TransformadorAjustable':
+        """Cargar un estado guardado con guardar()"""
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return cls.desde_dict(json.load(f))
+
+
+class Estandarizador(TransformadorAjustable):
+    """
+    Versión ajustable de estandarizar_columnas (media y std globales)
+    
+    Ejemplo:
+        est = Estandarizador(['monto']).ajustar(pd.read_csv(ruta, chunksize=100000))
+        for chunk in pd.read_csv(ruta, chunksize=100000):
+            salida = est.transformar(chunk)
+    """
+    
+    def __init__(self, columnas: List[str]):
+        super().__init__()
+        self.columnas = list(columnas)
+    
+    def _parametros(self) -> Dict[str, Any]:
+        return {'columnas': self.columnas}
+    
+    def _nuevos_acumuladores(self) -> Dict[str, Dict[str, Any]]:
+        return {col: {'welford': AcumuladorWelford()} for col in self.columnas}
+    
+    def transformar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Agregar '<col>_std' con las estadísticas ajustadas
+        
+        Args:
+            df: DataFrame o chunk a transformar
+            
+        Returns:
+            DataFrame con columnas estandarizadas
+        """
+        self._verificar_ajuste()
+        df_copy = df.copy()
+        
+        for col in self.columnas:
+            if col in df_copy.columns:
+                welford = self.acumuladores[col]['welford']
+                df_copy[f'{col}_std'] = (df_copy[col] - welford.media) / welford.std
+        
+        return df_copy
+
+
+class ImputadorFaltantes(TransformadorAjustable):
+    """
+    Versión ajustable de imputar_valores_faltantes
+    
+    'mean' se ajusta con Welford, 'median' con t-digest y 'mode' con
+    count-min sketch. 'forward', 'backward' y los valores constantes no
+    requieren ajuste y se aplican sobre cada chunk.
+    """
+    
+    METODOS_AJUSTADOS = ('mean', 'median', 'mode')
+    
+    def __init__(self, estrategia: Dict[str, Any], compresion: int = 200):
+        super().__init__()
+        self.estrategia = dict(estrategia)
+        self.compresion = compresion
+    
+    def _parametros(self) -> Dict[str, Any]:
+        return {'estrategia': self.estrategia, 'compresion': self.compresion}
+    
+    def _nuevos_acumuladores(self) -> Dict[str, Dict[str, Any]]:
+        acumuladores = {}
+        for columna, metodo in self.estrategia.items():
+            if metodo == 'mean':
+                acumuladores[columna] = {'welford': AcumuladorWelford()}
+            elif metodo == 'median':
+                acumuladores[columna] = {'digesto': DigestoT(self.compresion)}
+            elif metodo == 'mode':
+                acumuladores[columna] = {'moda': SketchCountMin()}
+        return acumuladores
+    
+    def valores_imputacion(self) -> Dict[str, Any]:
+        """Valor de relleno ajustado por columna (solo mean/median/mode)"""
+        self._verificar_ajuste()
+        valores = {}
+        for columna, acumuladores in self.acumuladores.items():
+            if 'welford' in acumuladores:
+                valores[columna] = acumuladores['welford'].media
+            elif 'digesto' in acumuladores:
+                valores[columna] = acumuladores['digesto'].cuantil(0.5)
+            else:
+                valores[columna] = acumuladores['moda'].moda()
+        return valores
+    
+    def transformar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Imputar faltantes con los valores ajustados
+        
+        Args:
+            df: DataFrame o chunk a transformar
+            
+        Returns:
+            DataFrame con valores imputados (ValueError si una estrategia
+            mean/median/mode no está ajustada)
+        """
+        requiere_ajuste = any(metodo in self.METODOS_AJUSTADOS for metodo in self.estrategia.values())
+        ajustados = self.valores_imputacion() if requiere_ajuste else {}
+        df_copy = df.copy()
+        
+        for columna, metodo in self.estrategia.items():
+            if columna not in df_copy.columns:
+                print(f"Advertencia: Columna '{columna}' no existe")
+                continue
+            
+            if columna in ajustados:
+                df_copy[columna] = df_copy[columna].fillna(ajustados[columna])
+            elif metodo == 'forward':
+                df_copy[columna] = df_copy[columna].ffill()
+            elif metodo == 'backward':
+                df_copy[columna] = df_copy[columna].bfill()
+            else:
+                # Valor constante
+                df_copy[columna] = df_copy[columna].fillna(metodo)
+        
+        return df_copy
+
+
+class EliminadorOutliers(TransformadorAjustable):
+    """
+    Versión ajustable de eliminar_outliers (límites globales)
+    
+    'iqr' ajusta Q1 y Q3 con t-digest (backend='tdigest') o con sketch KLL
+    de error de rango acotado (backend='kll'); 'std' ajusta media y
+    desviación con Welford.
+    """
+    
+    def __init__(self, columna: str, metodo: str = 'iqr', umbral: float = 1.5,
+                 compresion: int = 200, backend: str = 'tdigest', error: float = 0.01):
+        if metodo not in ('iqr', 'std'):
+            raise ValueError("Método debe ser 'iqr' o 'std'")
+        if backend not in ('tdigest', 'kll'):
+            raise ValueError("Backend debe ser 'tdigest' o 'kll'")
+        super().__init__()
+        self.columna = columna
+        self.metodo = metodo
+        self.umbral = umbral
+        self.compresion = compresion
+        self.backend = backend
+        self.error = error
+    
+    def _parametros(self) -> Dict[str, Any]:
+        return {
+            'columna': self.columna,
+            'metodo': self.metodo,
+            'umbral': self.umbral,
+            'compresion': self.compresion,
+            'backend': self.backend,
+            'error': self.error
+        }
+    
+    def _nuevos_acumuladores(self) -> Dict[str, Dict[str, Any]]:
+        if self.metodo == 'std':
+            return {self.columna: {'welford': AcumuladorWelford()}}
+        if self.backend == 'kll':
+            return {self.columna: {'kll': SketchKLL(self.error)}}
+        return {self.columna: {'digesto': DigestoT(self.compresion)}}
+    
+    def limites(self) -> Tuple[float, float]:
+        """Límites (inferior, superior) ajustados"""
+        self._verificar_ajuste()
+        acumuladores = self.acumuladores[self.columna]
+        if self.metodo == 'iqr':
+            sketch = acumuladores.get('kll') or acumuladores['digesto']
+            q1 = sketch.cuantil(0.25)
+            q3 = sketch.cuantil(0.75)
+            iqr = q3 - q1
+            return q1 - self.umbral * iqr, q3 + self.umbral * iqr
+        welford = acumuladores['welford']
+        return welford.media - self.umbral * welford.std, welford.media + self.umbral * welford.std
+    
+    def transformar(self, df: pd.DataFrame, retorno: str = 'dataframe',
+                    informar: bool = True) -> Union[pd.DataFrame, pd.Series, np.ndarray]:
+        """
+        Filtrar las filas fuera de los límites ajustados
+        
+        Args:
+            df: DataFrame o chunk a filtrar
+            retorno: 'dataframe', 'mascara' o 'indices' (como eliminar_outliers)
+            informar: Imprimir la cantidad de outliers removidos
+            
+        Returns:
+            DataFrame sin outliers, máscara o posiciones según retorno
+        """
+        if retorno not in ('dataframe', 'mascara', 'indices'):
+            raise ValueError("Retorno debe ser 'dataframe', 'mascara' o 'indices'")
+        limite_inferior, limite_superior = self.limites()
+        mask = (
+            (df[self.columna] >= limite_inferior) &
+            (df[self.columna] <= limite_superior)
+        )
+        
+        if informar:
+            outliers_removidos = (~mask).sum()
+            print(f"Outliers removidos de '{self.columna}': {outliers_removidos}")
+        
+        if retorno == 'mascara':
+            return mask
+        if retorno == 'indices':
+            return np.flatnonzero(mask.to_numpy())
+        return df[mask]
+
+
 # Ejemplo de uso
 if __name__ == "__main__":
     print("Funciones de transformación cargadas correctamente")
@@ -337,3 +1747,5 @@ if __name__ == "__main__":
     print("  - crear_bins_numericos")
     print("  - codificar_categoricas")
     print("  - detectar_duplicados_avanzado")
+    print("  - PlanTransformaciones (plan perezoso en una sola pasada)")
+    print("  - Estandarizador, ImputadorFaltantes, EliminadorOutliers (ajustar/transformar)")
@@ -0,0 +1,526 @@
+import json
+import os
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+import pandas as pd
+import numpy as np
+import pytest
+from scripts.pipelines.batch_processing import (
+    AggregationState, BatchProcessor, BatchProfiler, SeenKeys, clean_sales_data, enrich_customer_data, estimate_frame_bytes,
+    frame_from_shared_memory, frame_to_shared_memory, merge_part_files, split_byte_ranges
+)
+
+
+def _ventas_csv(path, rows):
+    pd.DataFrame(rows, columns=['venta_id', 'cantidad', 'precio_unitario']).to_csv(path, index=False)
+    return str(path)
+
+
+def test_deduplicacion_entre_chunks_y_ejecuciones(tmp_path):
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', [
+        (1, 2, 10.0), (2, 1, 5.0), (1, 2, 10.0), (3, 4, 2.5), (2, 1, 5.0),
+    ])
+    output_path = tmp_path / 'limpio.csv'
+    processor = BatchProcessor(chunk_size=2, n_workers=1)
+    state = tmp_path / 'seen.npy'
+
+    stats = processor.process_file_sequential(
+        input_path, str(output_path), clean_sales_data,
+        dedup=SeenKeys(columns=['venta_id'], state_path=str(state))
+    )
+    assert stats['duplicates_dropped'] == 2
+    assert pd.read_csv(output_path)['venta_id'].tolist() == [1, 2, 3]
+
+    seen = SeenKeys(columns=['venta_id'], state_path=str(state))
+    assert len(seen) == 3
+    assert seen.filter(pd.DataFrame({'venta_id': [3, 4]}))['venta_id'].tolist() == [4]
+
+
+def _suma_doble(df):
+    df['doble'] = df['cantidad'] * 2
+    return df
+
+
+def test_procesamiento_paralelo_en_streaming(tmp_path):
+    rows = [(i, i % 7, 1.0) for i in range(1000)]
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', rows)
+    processor = BatchProcessor(chunk_size=64, n_workers=2)
+
+    ordered_path = tmp_path / 'ordenado.csv'
+    stats = processor.process_file_parallel(input_path, str(ordered_path), _suma_doble, max_prefetch=2)
+    result = pd.read_csv(ordered_path)
+    assert stats['chunks_processed'] == 16
+    assert stats['total_rows'] == 1000
+    assert result['venta_id'].tolist() == list(range(1000))
+    assert (result['doble'] == result['cantidad'] * 2).all()
+
+    unordered_path = tmp_path / 'desordenado.csv'
+    stats = processor.process_file_parallel(input_path, str(unordered_path), _suma_doble, ordered=False)
+    assert sorted(pd.read_csv(unordered_path)['venta_id']) == list(range(1000))
+
+
+def test_rangos_de_bytes_alineados_a_lineas(tmp_path):
+    rows = [(i, i % 5, 1.5) for i in range(500)]
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', rows)
+
+    ranges = split_byte_ranges(input_path, 7)
+    data = Path(input_path).read_bytes()
+    assert ranges[0][0] == data.index(b'\n') + 1
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b'\n'
+
+
+def test_procesamiento_por_rangos_de_bytes(tmp_path):
+    rows = [(i, i % 7, 2.0) for i in range(3000)]
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', rows)
+    processor = BatchProcessor(n_workers=3)
+
+    output_path = tmp_path / 'limpio.csv'
+    stats = processor.process_file_byte_ranges(input_path, str(output_path), _suma_doble)
+    result = pd.read_csv(output_path)
+    assert stats['chunks_processed'] == 3 and stats['errors'] == 0
+    assert result['venta_id'].tolist() == list(range(3000))
+    assert not (tmp_path / 'limpio.csv.parts').exists()
+
+    parts_dir = tmp_path / 'particionado'
+    stats = processor.process_file_byte_ranges(input_path, str(parts_dir), _suma_doble, merge=False)
+    assert len(stats['parts']) == 3
+    assert sum(len(pd.read_csv(p)) for p in stats['parts']) == 3000
+
+
+def _columnas_segun_rango(df):
+    # Cada rango produce las columnas en otro orden o sin filas
+    if df['venta_id'].iloc[0] == 0:
+        return df.iloc[:0, :0]
+    if df['venta_id'].iloc[0] % 2:
+        return df[['precio_unitario', 'venta_id']]
+    return df[['venta_id', 'precio_unitario']]
+
+
+def test_union_de_partes_reindexa_a_la_cabecera(tmp_path):
+    rows = [(i, 1, float(i)) for i in range(3001)]
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', rows)
+    output_path = tmp_path / 'salida.csv'
+
+    BatchProcessor(n_workers=3).process_file_byte_ranges(input_path, str(output_path), _columnas_segun_rango)
+    result = pd.read_csv(output_path)
+    assert list(result.columns) in (['venta_id', 'precio_unitario'], ['precio_unitario', 'venta_id'])
+    assert (result['venta_id'] == result['precio_unitario']).all()
+    # El primer rango no aporta filas; el resto llega completo y alineado
+    primero = result['venta_id'].iloc[0]
+    assert primero > 0 and result['venta_id'].tolist() == list(range(primero, 3001))
+
+    vacia = tmp_path / 'vacia.csv'
+    pd.DataFrame(columns=['a', 'b']).to_csv(vacia, index=False)
+    merge_part_files([str(vacia)], str(tmp_path / 'solo_cabecera.csv'))
+    assert (tmp_path / 'solo_cabecera.csv').read_text() == 'a,b\n'
+
+
+def test_descriptor_memoria_compartida_ida_y_vuelta():
+    df = pd.DataFrame({
+        'id': range(5),
+        'precio': [1.5, 2.0, None, 4.0, 5.5],
+        'producto': list('abcde'),
+        'activo': [True, False, True, True, False],
+        'fecha': pd.date_range('2024-01-01', periods=5),
+    }, index=range(10, 15))
+    descriptor = frame_to_shared_memory(df)
+
+    assert sorted(p for _, positions, _ in descriptor['layout'] for p in positions) == [0, 1, 3, 4]
+    assert list(descriptor['rest'].columns) == [2]
+    pd.testing.assert_frame_equal(frame_from_shared_memory(descriptor, unlink=True), df)
+
+
+def test_procesamiento_paralelo_por_memoria_compartida(tmp_path):
+    rows = [(i, i % 7, 1.0) for i in range(1000)]
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', rows)
+    output_path = tmp_path / 'compartido.csv'
+
+    stats = BatchProcessor(chunk_size=100, n_workers=2).process_file_parallel(
+        input_path, str(output_path), _suma_doble, transport='shared_memory'
+    )
+    result = pd.read_csv(output_path)
+    assert stats['total_rows'] == 1000 and stats['errors'] == 0
+    assert result['venta_id'].tolist() == list(range(1000))
+    assert (result['doble'] == result['cantidad'] * 2).all()
+
+
+def test_memoria_compartida_se_libera_si_se_interrumpe(tmp_path):
+    import pytest
+
+    if not os.path.isdir('/dev/shm'):
+        pytest.skip('requiere /dev/shm')
+    rows = [(i, i % 7, 1.0) for i in range(1000)]
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', rows)
+    antes = set(os.listdir('/dev/shm'))
+
+    with pytest.raises(OSError):
+        BatchProcessor(chunk_size=50, n_workers=2).process_file_parallel(
+            input_path, str(tmp_path / 'no_existe' / 'salida.csv'), _suma_doble, transport='shared_memory'
+        )
+    assert set(os.listdir('/dev/shm')) - antes == set()
+
+
+@pytest.mark.parametrize('byte_ranges, partials', [(False, 14), (True, 3)])
+def test_agregacion_combinable_exacta_y_aproximada(tmp_path, byte_ranges, partials):
+    rng = np.random.default_rng(7)
+    n = 20000
+    df = pd.DataFrame({
+        'cliente_id': rng.integers(0, 20, n),
+        'cantidad': rng.integers(1, 10, n).astype(float),
+        'precio': rng.exponential(100, n),
+        'producto': rng.integers(0, 500, n),
+    })
+    df.loc[::13, 'cantidad'] = np.nan
+    input_path = tmp_path / 'ventas.csv'
+    df.to_csv(input_path, index=False)
+    output_path = tmp_path / 'agregado.csv'
+
+    stats = BatchProcessor(chunk_size=1500, n_workers=3).aggregate_by_key(
+        str(input_path), str(output_path), ['cliente_id'],
+        {
+            'cantidad': ['sum', 'mean', 'min', 'max', 'count'],
+            'precio': ['median', 'p90'],
+            'producto': ['nunique', 'approx_nunique'],
+        },
+        byte_ranges=byte_ranges
+    )
+    result = pd.read_csv(output_path, index_col='cliente_id')
+    grouped = df.groupby('cliente_id')
+
+    assert stats['groups'] == 20 and stats['partials'] == partials
+    assert np.allclose(result['cantidad_sum'], grouped['cantidad'].sum())
+    assert np.allclose(result['cantidad_mean'], grouped['cantidad'].mean())
+    assert (result['cantidad_min'] == grouped['cantidad'].min()).all()
+    assert (result['cantidad_max'] == grouped['cantidad'].max()).all()
+    assert (result['cantidad_count'] == grouped['cantidad'].count()).all()
+    assert (result['producto_nunique'] == grouped['producto'].nunique()).all()
+    hll_error = (result['producto_approx_nunique'] - grouped['producto'].nunique()).abs() / grouped['producto'].nunique()
+    assert hll_error.max() < 0.06
+    for column, q in [('precio_median', 0.5), ('precio_p90', 0.9)]:
+        ranks = [(df.loc[df['cliente_id'] == key, 'precio'] < value).mean() for key, value in result[column].items()]
+        assert np.abs(np.array(ranks) - q).max() < 0.02
+
+
+def test_approx_nunique_con_chunks_enteros_y_decimales(tmp_path):
+    df = pd.DataFrame({'k': np.zeros(4000, dtype=int), 'u': np.arange(4000) % 500})
+    input_path = tmp_path / 'mixto.csv'
+    df.to_csv(input_path, index=False)
+    # Un valor vacío convierte su chunk a float64; el resto queda en int64
+    lines = input_path.read_text().splitlines()
+    lines[-1] = '0,'
+    input_path.write_text('\n'.join(lines) + '\n')
+    output_path = tmp_path / 'agregado.csv'
+
+    BatchProcessor(chunk_size=1000, n_workers=2).aggregate_by_key(
+        str(input_path), str(output_path), ['k'], {'u': ['nunique', 'approx_nunique']}
+    )
+    result = pd.read_csv(output_path, index_col='k')
+
+    assert result.loc[0, 'u_nunique'] == 500
+    assert abs(result.loc[0, 'u_approx_nunique'] - 500) / 500 < 0.05
+
+
+@pytest.mark.parametrize('memory_budget_mb', [None, 0.05])
+def test_agregacion_con_campos_multilinea(tmp_path, memory_budget_mb):
+    df = pd.DataFrame({
+        'nota': [f"line\nbreak {i}" for i in range(2000)],
+        'k': np.arange(2000) % 7,
+        'v': np.arange(2000, dtype=float),
+    })
+    input_path = tmp_path / 'multilinea.csv'
+    df.to_csv(input_path, index=False)
+    output_path = tmp_path / 'agregado.csv'
+
+    for n_workers in (3, 5, 7):
+        BatchProcessor(chunk_size=300, n_workers=n_workers).aggregate_by_key(
+            str(input_path), str(output_path), ['k'], {'v': ['sum', 'count']},
+            memory_budget_mb=memory_budget_mb, n_buckets=2, spill_dir=str(tmp_path)
+        )
+        result = pd.read_csv(output_path, index_col='k').sort_index()
+        assert (result['v_sum'] == df.groupby('k')['v'].sum()).all()
+        assert (result['v_count'] == df.groupby('k')['v'].count()).all()
+
+
+def test_estado_de_agregacion_combina_en_cualquier_orden():
+    df = pd.DataFrame({'k': ['a', 'b', 'a', 'c', 'b'], 'v': [1.0, 5.0, 3.0, 2.0, None]})
+    template = AggregationState(['k'], {'v': ['mean', 'max', 'size']})
+    parts = [template.from_frame(df.iloc[i:i + 2]) for i in range(0, 5, 2)]
+
+    left = AggregationState.merge([AggregationState.merge(parts[:2]), parts[2]]).finalize()
+    right = AggregationState.merge([parts[2], AggregationState.merge(parts[:2][::-1])]).finalize()
+
+    pd.testing.assert_frame_equal(left, right)
+    assert left.loc['a', 'v_mean'] == 2.0 and left.loc['b', 'v_mean'] == 5.0
+    assert left['v_size'].tolist() == [2, 2, 1]
+    assert template.finalize().empty
+
+
+def test_agregacion_externa_con_volcado_a_disco(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 30000
+    df = pd.DataFrame({
+        'cliente_id': rng.integers(0, 8000, n),
+        'cantidad': rng.integers(1, 10, n),
+        'precio': rng.uniform(1, 50, n),
+    })
+    input_path = tmp_path / 'ventas.csv'
+    df.to_csv(input_path, index=False)
+    agg_dict = {'cantidad': ['sum', 'mean'], 'precio': 'max'}
+    processor = BatchProcessor(chunk_size=2000, n_workers=2)
+
+    processor.aggregate_by_key(str(input_path), str(tmp_path / 'memoria.csv'), ['cliente_id'], agg_dict)
+    stats = processor.aggregate_by_key(
+        str(input_path), str(tmp_path / 'externa.csv'), ['cliente_id'], agg_dict,
+        memory_budget_mb=0.2, n_buckets=4, spill_dir=str(tmp_path)
+    )
+
+    expected = pd.read_csv(tmp_path / 'memoria.csv', index_col='cliente_id')
+    result = pd.read_csv(tmp_path / 'externa.csv', index_col='cliente_id').sort_index()
+    assert stats['buckets'] == 4 and stats['spilled_files'] > 8
+    assert stats['groups'] == len(expected)
+    pd.testing.assert_frame_equal(result, expected)
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith('agg_spill_')] == []
+
+
+def test_bucket_que_no_cabe_se_reparte_recursivamente(tmp_path, monkeypatch):
+    import scripts.pipelines.batch_processing as batch
+
+    df = pd.DataFrame({'cliente_id': np.arange(6000) % 3000, 'cantidad': np.arange(6000)})
+    template = AggregationState(['cliente_id'], {'cantidad': ['sum', 'max']})
+    spill_dir = tmp_path / 'volcados'
+    spill_dir.mkdir()
+    spill = {'dir': str(spill_dir), 'buckets': 2, 'budget_bytes': 8000}
+    paths = []
+    for i, start in enumerate(range(0, 6000, 250)):
+        paths += batch._spill_state(template.from_frame(df.iloc[start:start + 250]), spill, f"{i:05d}")
+
+    merges = []
+    merge = AggregationState.merge
+    def merge_medido(states):
+        merged = merge(states)
+        merges.append(merged.memory_bytes())
+        return merged
+    monkeypatch.setattr(AggregationState, 'merge', staticmethod(merge_medido))
+    parts = []
+    for bucket, bucket_paths in sorted(batch._spilled_by_bucket(paths).items()):
+        parts.append(str(tmp_path / f"part-{bucket:04d}.csv"))
+        batch._aggregate_bucket(bucket_paths, parts[-1], spill)
+
+    result = pd.concat(pd.read_csv(part, index_col='cliente_id') for part in parts).sort_index()
+    expected = df.groupby('cliente_id')['cantidad'].agg(['sum', 'max']).add_prefix('cantidad_')
+    pd.testing.assert_frame_equal(result, expected, check_names=False)
+    # Cada bucket completo (~1500 grupos) triplica el presupuesto; los estados
+    # combinados no pasan de presupuesto + un volcado
+    assert template.from_frame(df).memory_bytes() / 2 > 3 * spill['budget_bytes']
+    assert max(merges) < 2 * spill['budget_bytes']
+    assert list(spill_dir.iterdir()) == []
+
+
+class _FallaEnChunk:
+    """Transformación que falla una vez en el chunk indicado"""
+
+    def __init__(self, venta_id):
+        self.venta_id = venta_id
+        self.calls = 0
+
+    def __call__(self, df):
+        self.calls += 1
+        if self.venta_id is not None and self.venta_id in set(df['venta_id']):
+            self.venta_id = None
+            raise RuntimeError('caída simulada')
+        return df
+
+
+def test_checkpoint_y_reanudacion_idempotente(tmp_path):
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', [(i, 1, 1.0) for i in range(100)])
+    output_path = tmp_path / 'salida.csv'
+    processor = BatchProcessor(chunk_size=10, n_workers=1)
+
+    transform = _FallaEnChunk(55)
+    stats = processor.process_file_sequential(input_path, str(output_path), transform, checkpoint=True)
+    assert stats['errors'] == 1
+    assert not output_path.exists()
+    manifest = json.loads(Path(f"{output_path}.manifest.json").read_text())
+    assert len(manifest['chunks']) == 9 and not manifest['complete']
+
+    stats = processor.process_file_sequential(input_path, str(output_path), transform, resume=True)
+    assert stats['chunks_processed'] == 1
+    assert stats['chunks_skipped'] == 4 and stats['errors'] == 0
+    assert pd.read_csv(output_path)['venta_id'].tolist() == list(range(100))
+    assert not Path(f"{output_path}.parts").exists()
+
+    stats = processor.process_file_sequential(input_path, str(output_path), transform, resume=True)
+    assert stats['chunks_processed'] == 0
+    assert len(pd.read_csv(output_path)) == 100
+
+
+def test_dedup_confirma_claves_solo_tras_escribir(tmp_path, monkeypatch):
+    from scripts.pipelines.batch_processing import ChunkManifest
+
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', [(i % 60, 1, 1.0) for i in range(100)])
+    output_path = tmp_path / 'salida.csv'
+    state = tmp_path / 'seen.npy'
+    processor = BatchProcessor(chunk_size=10, n_workers=1)
+
+    write_part = ChunkManifest.write_part
+    def falla_en_parte_3(self, index, df, input_rows):
+        if index == 3:
+            raise OSError('disco lleno')
+        return write_part(self, index, df, input_rows)
+    monkeypatch.setattr(ChunkManifest, 'write_part', falla_en_parte_3)
+    stats = processor.process_file_sequential(
+        input_path, str(output_path), _suma_doble, checkpoint=True,
+        dedup=SeenKeys(columns=['venta_id'], state_path=str(state))
+    )
+    assert stats['errors'] == 1
+    # Tras el volcado inicial solo se anexan las claves nuevas al registro
+    assert Path(f"{state}.log").exists()
+    monkeypatch.setattr(ChunkManifest, 'write_part', write_part)
+
+    stats = processor.process_file_sequential(
+        input_path, str(output_path), _suma_doble, resume=True,
+        dedup=SeenKeys(columns=['venta_id'], state_path=str(state))
+    )
+    assert stats['errors'] == 0
+    assert sorted(pd.read_csv(output_path)['venta_id']) == list(range(60))
+    assert len(SeenKeys(columns=['venta_id'], state_path=str(state))) == 60
+
+
+def test_estimacion_de_memoria_por_muestra():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'id': np.arange(50000),
+        'producto': rng.choice(['a', 'un nombre de producto largo', 'medio'], 50000),
+        'precio': rng.uniform(1, 10, 50000),
+    })
+    exacto = df.memory_usage(deep=True).sum()
+
+    assert abs(estimate_frame_bytes(df) - exacto) / exacto < 0.05
+    assert estimate_frame_bytes(df[['id', 'precio']]) == df[['id', 'precio']].memory_usage(deep=True).sum()
+    assert estimate_frame_bytes(df.iloc[:0]) == df.iloc[:0].memory_usage(deep=True).sum()
+
+
+def test_tamano_de_chunk_adaptativo(tmp_path):
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', [(i, i % 3, 1.0) for i in range(20000)])
+
+    # Objetivo de memoria holgado y transformación rápida: los chunks crecen
+    processor = BatchProcessor(chunk_size=1000, n_workers=1, adaptive=True, min_chunk_size=100)
+    stats = processor.process_file_sequential(input_path, str(tmp_path / 'a.csv'), _suma_doble)
+    assert stats['chunk_sizes'][:3] == [1000, 2000, 4000]
+    assert sum(stats['chunk_sizes']) == 20000
+    assert stats['bytes_per_row'] > 0
+
+    # Objetivo de memoria de ~200 filas (24 bytes por fila): los chunks se reducen
+    processor = BatchProcessor(chunk_size=1000, n_workers=2, adaptive=True, min_chunk_size=100,
+                               target_chunk_mb=200 * 24 / 1024 ** 2)
+    stats = processor.process_file_parallel(input_path, str(tmp_path / 'b.csv'), _suma_doble)
+    assert stats['chunk_size_final'] < 1000
+    assert stats['total_rows'] == 20000
+    assert pd.read_csv(tmp_path / 'b.csv')['venta_id'].tolist() == list(range(20000))
+
+
+def test_perfilado_por_etapa_y_por_worker(tmp_path):
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', [(i, i % 3, 1.0) for i in range(2000)])
+    processor = BatchProcessor(chunk_size=200, n_workers=2)
+
+    profiler = BatchProfiler(job='ventas')
+    stats = processor.process_file_sequential(input_path, str(tmp_path / 'a.csv'), _suma_doble, profiler=profiler)
+    profile = stats['profile']
+    assert profile['chunks'] == 10 and profile['rows_in'] == 2000 and profile['rows_out'] == 2000
+    assert set(profile['stages']) == {'read', 'transform', 'write'}
+    assert {'p50', 'p95', 'p99'} <= set(profile['stages']['transform'])
+    assert list(profile['workers']) == ['main']
+
+    profiler = BatchProfiler(job='ventas')
+    stats = processor.process_file_parallel(input_path, str(tmp_path / 'b.csv'), _suma_doble, profiler=profiler)
+    profile = stats['profile']
+    assert 'queue_wait' in profile['stages']
+    assert sum(worker['chunks'] for worker in profile['workers'].values()) == 10
+    assert all(0 <= worker['utilization'] <= 1 for worker in profile['workers'].values())
+
+    profiler.write_jsonl(str(tmp_path / 'metricas.jsonl'))
+    lines = [json.loads(line) for line in (tmp_path / 'metricas.jsonl').read_text().splitlines()]
+    assert [line['type'] for line in lines] == ['chunk'] * 10 + ['summary']
+
+    text = profiler.to_prometheus()
+    assert 'batch_stage_seconds{job="ventas",stage="transform",quantile="0.95"}' in text
+    assert 'batch_rows_total{job="ventas",direction="in"} 2000' in text
+
+
+def test_limpieza_de_ventas_sin_copias_equivale_a_la_original():
+    df = pd.DataFrame({
+        'venta_id': [1, 2, 2, 3, 4],
+        'cantidad': [2, 1, 1, None, 3],
+        'precio_unitario': [10.0, 5.0, 5.0, 4.0, None],
+    })
+    original = df.copy()
+    processed_at = pd.Timestamp('2024-05-01 12:00')
+
+    result = clean_sales_data(df, processed_at=processed_at)
+    expected = original.drop_duplicates().dropna(subset=['cantidad', 'precio_unitario'])
+
+    pd.testing.assert_frame_equal(df, original)
+    assert result.index.tolist() == expected.index.tolist()
+    assert result['total'].tolist() == [20.0, 5.0]
+    assert (result['processed_at'] == processed_at).all()
+
+    limpio = original.iloc[:2].copy()
+    assert clean_sales_data(limpio)['total'].tolist() == [20.0, 5.0]
+    assert 'total' not in limpio.columns
+
+
+def test_enriquecimiento_categorico_equivale_a_pd_cut():
+    df = pd.DataFrame({
+        'edad': [0, 18, 25, 26, 50, 51, 100, 101, None],
+        'total_gastado': [0, 1, 1000, 1000.5, 5000, 9e9, -1, None, 300],
+    })
+    result = enrich_customer_data(df)
+
+    expected_age = pd.cut(df['edad'], bins=[0, 25, 35, 50, 100], labels=['18-25', '26-35', '36-50', '51+'])
+    expected_value = pd.cut(df['total_gastado'], bins=[0, 1000, 5000, float('inf')], labels=['Low', 'Medium', 'High'])
+    pd.testing.assert_series_equal(result['age_group'], expected_age.rename('age_group'))
+    pd.testing.assert_series_equal(result['value_segment'], expected_value.rename('value_segment'))
+    assert list(df.columns) == ['edad', 'total_gastado']
+
+
+class _TransformacionInestable:
+    """Falla siempre en la venta 'veneno', mata el worker en la venta 'fatal'
+    y falla una sola vez (marcador en disco) en la venta 'transitoria'"""
+
+    def __init__(self, marker, veneno, fatal, transitoria):
+        self.marker = str(marker)
+        self.veneno, self.fatal, self.transitoria = veneno, fatal, transitoria
+
+    def __call__(self, df):
+        ids = set(df['venta_id'])
+        if self.fatal in ids:
+            os._exit(1)
+        if self.veneno in ids:
+            raise ValueError('chunk envenenado')
+        if self.transitoria in ids and not os.path.exists(self.marker):
+            open(self.marker, 'w').close()
+            raise RuntimeError('fallo transitorio')
+        return df
+
+
+def test_procesamiento_supervisado_reintenta_y_pone_en_cuarentena(tmp_path):
+    input_path = _ventas_csv(tmp_path / 'ventas.csv', [(i, 1, 1.0) for i in range(200)])
+    output_path = tmp_path / 'salida.csv'
+    transform = _TransformacionInestable(tmp_path / 'marcador', veneno=55, fatal=125, transitoria=175)
+
+    stats = BatchProcessor(chunk_size=10, n_workers=2).process_file_supervised(
+        input_path, str(output_path), transform, max_retries=2, backoff_seconds=0.01
+    )
+
+    assert stats['quarantined'] == 2 and stats['chunks_processed'] == 20
+    assert stats['worker_restarts'] >= 1 and stats['retries'] >= 3
+    ids = pd.read_csv(output_path)['venta_id'].tolist()
+    assert ids == [i for i in range(200) if not 50 <= i < 60 and not 120 <= i < 130]
+
+    quarantine = [json.loads(line) for line in Path(f"{output_path}.quarantine.jsonl").read_text().splitlines()]
+    assert sorted(record['start_row'] for record in quarantine) == [50, 120]
+    assert all(record['attempts'] == 3 and len(record['data']) == 10 for record in quarantine)
+    assert any('envenenado' in record['error'] for record in quarantine)
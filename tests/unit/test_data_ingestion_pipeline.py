@@ -0,0 +1,620 @@
+import json
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+import pandas as pd
+import pytest
+from scripts.pipelines.data_ingestion_pipeline import DataIngestionPipeline, RowDeduplicator, TransformPlan
+
+
+def _write_csv(path, n=5):
+    pd.DataFrame({'id': range(n), 'valor': range(n)}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_run_concurrente_con_metricas_por_fuente(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'execution': {'mode': 'concurrent', 'max_workers': 2, 'max_in_flight': 2},
+        'data_sources': {
+            'a': {'type': 'csv', 'path': _write_csv(tmp_path / 'a.csv', 3)},
+            'b': {'type': 'csv', 'path': _write_csv(tmp_path / 'b.csv', 4), 'depends_on': ['a']},
+            'c': {'type': 'csv', 'path': _write_csv(tmp_path / 'c.csv', 5)},
+        }
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['status'] == 'success'
+    assert results['sources_processed'] == 3
+    assert results['total_records'] == 12
+    metrics = results['source_metrics']
+    assert set(metrics) == {'a', 'b', 'c'}
+    assert {'extract', 'load'} <= set(metrics['a']['timings'])
+    # b depende de a: no puede empezar antes de que a termine
+    assert metrics['b']['started_at'] >= metrics['a']['finished_at']
+    assert results['slowest_source'] in metrics
+    assert (tmp_path / 'out' / 'b.csv').exists()
+
+
+def test_dependencia_fallida_omite_fuente(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'execution': {'mode': 'concurrent', 'max_workers': 2},
+        'data_sources': {
+            'rota': {'type': 'csv', 'path': str(tmp_path / 'no_existe.csv')},
+            'hija': {'type': 'csv', 'path': _write_csv(tmp_path / 'h.csv'), 'depends_on': 'rota'},
+        }
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['status'] == 'completed_with_errors'
+    assert results['source_metrics']['hija']['status'] == 'skipped'
+    assert results['sources_processed'] == 0
+
+
+def test_transformaciones_en_pool_de_procesos(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'execution': {'mode': 'concurrent', 'max_workers': 2, 'process_workers': 1},
+        'data_sources': {
+            'a': {
+                'type': 'csv',
+                'path': _write_csv(tmp_path / 'a.csv'),
+                'transformations': {'rename_columns': {'valor': 'value'}},
+            },
+        }
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['status'] == 'success'
+    assert 'transform' in results['source_metrics']['a']['timings']
+    assert 'value' in pd.read_csv(tmp_path / 'out' / 'a.csv').columns
+
+
+def test_dependencias_ciclicas_fallan(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {
+            'a': {'type': 'csv', 'path': 'x.csv', 'depends_on': ['b']},
+            'b': {'type': 'csv', 'path': 'y.csv', 'depends_on': ['a']},
+        }
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['status'] == 'failed'
+
+
+def test_streaming_csv_procesa_por_chunks(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {
+            'a': {
+                'type': 'csv',
+                'path': _write_csv(tmp_path / 'a.csv', 25),
+                'chunk_size': 10,
+                'transformations': {'rename_columns': {'valor': 'value'}},
+            },
+        }
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['source_metrics']['a']['chunks'] == 3
+    out = pd.read_csv(tmp_path / 'out' / 'a.csv')
+    assert list(out.columns) == ['id', 'value']
+    assert out['id'].tolist() == list(range(25))
+
+
+def test_iter_json_chunks_ndjson_y_arreglo(tmp_path):
+    records = [{'id': i, 'nombre': f'n{i}', 'tags': [i, {'x': '[,]'}]} for i in range(7)]
+    ndjson = tmp_path / 'datos.ndjson'
+    ndjson.write_text('\n'.join(json.dumps(r) for r in records) + '\n')
+    array = tmp_path / 'datos.json'
+    pd.DataFrame(records).to_json(array, orient='records')
+
+    pipeline = DataIngestionPipeline({'output_path': str(tmp_path / 'out')})
+    for path in (ndjson, array):
+        chunks = list(pipeline.iter_json_chunks(str(path), chunk_size=3))
+        assert [len(c) for c in chunks] == [3, 3, 1]
+        assert pd.concat(chunks)['id'].tolist() == list(range(7))
+
+
+def test_streaming_json_salida_ndjson(tmp_path):
+    source = tmp_path / 'in.json'
+    pd.DataFrame({'id': range(5)}).to_json(source, orient='records')
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {
+            'j': {'type': 'json', 'path': str(source), 'chunk_size': 2,
+                  'output': {'type': 'json', 'filename': 'j.jsonl'}},
+        }
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['total_records'] == 5
+    out = pd.read_json(tmp_path / 'out' / 'j.jsonl', lines=True)
+    assert out['id'].tolist() == list(range(5))
+
+
+def test_parquet_salida_con_opciones_y_proyeccion(tmp_path):
+    import pyarrow.parquet as pq
+
+    df = pd.DataFrame({
+        'id': range(1000),
+        'categoria': ['a', 'b', 'c', 'd'] * 250,
+        'valor': [float(i) for i in range(1000)],
+    })
+    pipeline = DataIngestionPipeline({'output_path': str(tmp_path)})
+    ok = pipeline.load_to_parquet(df, 'datos.parquet', {
+        'compression': 'zstd',
+        'row_group_size': 300,
+        'use_dictionary': ['categoria'],
+    })
+    assert ok
+
+    metadata = pq.ParquetFile(tmp_path / 'datos.parquet').metadata
+    assert metadata.num_row_groups == 4
+    assert metadata.row_group(0).column(1).compression == 'ZSTD'
+    assert any('DICTIONARY' in enc for enc in metadata.row_group(0).column(1).encodings)
+
+    leido = pipeline.extract_from_parquet(str(tmp_path / 'datos.parquet'), columns=['id', 'valor'])
+    assert list(leido.columns) == ['id', 'valor']
+    assert len(leido) == 1000
+
+
+def test_streaming_csv_a_parquet(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {
+            'a': {
+                'type': 'csv',
+                'path': _write_csv(tmp_path / 'a.csv', 25),
+                'chunk_size': 10,
+                'output': {'type': 'parquet', 'filename': 'a.parquet'},
+            },
+            'b': {
+                'type': 'parquet',
+                'path': str(tmp_path / 'out' / 'a.parquet'),
+                'columns': ['valor'],
+                'chunk_size': 7,
+                'depends_on': 'a',
+            },
+        }
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['status'] == 'success'
+    # Lotes de hasta 7 filas; pyarrow no cruza row groups al dividir
+    assert results['source_metrics']['b']['chunks'] >= 4
+    out = pd.read_csv(tmp_path / 'out' / 'b.csv')
+    assert list(out.columns) == ['valor']
+    assert out['valor'].tolist() == list(range(25))
+
+
+def test_carga_masiva_sqlite_con_wal(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / 'destino.db')
+    df = pd.DataFrame({
+        'id': range(2500),
+        'nombre': [f'n{i}' for i in range(2500)],
+        'precio': [None if i % 10 == 0 else i * 1.5 for i in range(2500)],
+        'fecha': pd.date_range('2024-01-01', periods=2500, freq='h'),
+    })
+    pipeline = DataIngestionPipeline({'output_path': str(tmp_path)})
+    ok = pipeline.load_to_database(df, {
+        'path': db_path, 'table': 'ventas', 'bulk': True, 'batch_size': 1000,
+        'journal_mode': 'WAL', 'synchronous': 'NORMAL',
+    })
+    assert ok
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    leido = pd.read_sql_query('SELECT * FROM ventas ORDER BY id', conn)
+    conn.close()
+    assert len(leido) == 2500
+    assert leido['precio'].isna().sum() == 250
+    assert leido['fecha'].iloc[1] == '2024-01-01 01:00:00'
+
+
+def test_carga_masiva_rechaza_pragmas_invalidos(tmp_path):
+    db_path = str(tmp_path / 'destino.db')
+    pipeline = DataIngestionPipeline({'output_path': str(tmp_path)})
+    df = pd.DataFrame({'id': [1, 2]})
+
+    for pragma in ({'journal_mode': 'WAL; DROP TABLE ventas'}, {'synchronous': 'LENTO'}):
+        with pytest.raises(ValueError):
+            pipeline._bulk_load_sqlite(df, {'path': db_path, 'table': 'ventas', **pragma})
+        assert not pipeline.load_to_database(df, {'path': db_path, 'table': 'ventas', 'bulk': True, **pragma})
+    assert pipeline.load_to_database(df, {'path': db_path, 'table': 'ventas', 'bulk': True, 'synchronous': 'normal'})
+
+
+def test_upsert_por_clave_primaria(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / 'destino.db')
+    pipeline = DataIngestionPipeline({'output_path': str(tmp_path)})
+    config = {'path': db_path, 'table': 'clientes', 'if_exists': 'upsert', 'primary_key': ['id']}
+
+    assert pipeline.load_to_database(pd.DataFrame({'id': [1, 2], 'ciudad': ['Lima', 'Quito']}), config)
+    assert pipeline.load_to_database(pd.DataFrame({'id': [2, 3], 'ciudad': ['Bogotá', 'Cali']}), config)
+
+    conn = sqlite3.connect(db_path)
+    filas = conn.execute('SELECT id, ciudad FROM clientes ORDER BY id').fetchall()
+    conn.close()
+    assert filas == [(1, 'Lima'), (2, 'Bogotá'), (3, 'Cali')]
+
+
+def test_carga_masiva_fechas_con_formato_de_to_sql(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / 'destino.db')
+    df = pd.DataFrame({
+        'fecha': pd.to_datetime(['2024-01-01 10:00:00', '2024-01-01 10:00:00.250000', None], format='ISO8601'),
+        'local': pd.to_datetime(['2024-01-01 10:00', '2024-07-01 10:00', '2024-07-01 11:00']).tz_localize('America/Santiago'),
+    })
+    pipeline = DataIngestionPipeline({'output_path': str(tmp_path)})
+    assert pipeline.load_to_database(df, {'path': db_path, 'table': 'masiva', 'bulk': True})
+    assert pipeline.load_to_database(df, {'path': db_path, 'table': 'to_sql'})
+
+    conn = sqlite3.connect(db_path)
+    masiva = conn.execute('SELECT * FROM masiva').fetchall()
+    to_sql = conn.execute('SELECT * FROM to_sql').fetchall()
+    conn.close()
+    assert masiva == to_sql
+    assert masiva[1] == ('2024-01-01 10:00:00.250000', '2024-07-01 10:00:00-04:00')
+
+
+def _ventas_db(path, n=1000):
+    import sqlite3
+
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE ventas (id INTEGER, region TEXT, monto REAL)')
+    conn.executemany(
+        'INSERT INTO ventas VALUES (?, ?, ?)',
+        [(None if i % 100 == 0 else i, 'norte' if i % 2 else 'sur', i * 1.0) for i in range(n)]
+    )
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_pool_de_conexiones_compartido_entre_fuentes(tmp_path):
+    db_path = _ventas_db(tmp_path / 'origen.db')
+    query = 'SELECT * FROM ventas WHERE region = :region'
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {
+            'norte': {'type': 'database', 'path': db_path, 'query': query, 'params': {'region': 'norte'}},
+            'sur': {'type': 'database', 'path': db_path, 'query': query, 'params': {'region': 'sur'},
+                    'chunk_size': 100},
+        }
+    }
+    pipeline = DataIngestionPipeline(config)
+    results = pipeline.run()
+
+    assert results['total_records'] == 1000
+    assert results['source_metrics']['sur']['chunks'] == 5
+    assert pipeline.db_pool.connections_opened == 1
+
+
+def test_lectura_paralela_por_rangos(tmp_path):
+    db_path = _ventas_db(tmp_path / 'origen.db')
+    pipeline = DataIngestionPipeline({'output_path': str(tmp_path)})
+    df = pipeline.extract_from_database({
+        'path': db_path,
+        'query': 'SELECT * FROM ventas WHERE monto >= ?',
+        'params': [0],
+        'partition': {'column': 'id', 'num_partitions': 4, 'parallel': 2},
+    })
+
+    assert len(df) == 1000
+    assert df['id'].isna().sum() == 10
+    assert df['id'].dropna().is_monotonic_increasing
+
+
+def _incremental_config(tmp_path, db_path, **extra):
+    return {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {
+            'ventas': {
+                'type': 'database',
+                'path': db_path,
+                'query': 'SELECT * FROM ventas WHERE id IS NOT NULL',
+                'incremental': {'column': 'id', 'unique': True},
+                **extra,
+            },
+        }
+    }
+
+
+def test_incremental_por_watermark_en_base_de_datos(tmp_path):
+    import sqlite3
+
+    db_path = _ventas_db(tmp_path / 'origen.db', n=50)
+    config = _incremental_config(tmp_path, db_path)
+
+    first = DataIngestionPipeline(config).run()
+    assert first['total_records'] == 49
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO ventas VALUES (?, ?, ?)', [(i, 'norte', 1.0) for i in range(50, 60)])
+    conn.commit()
+    conn.close()
+
+    second = DataIngestionPipeline(config).run()
+    assert second['total_records'] == 10
+    assert second['source_metrics']['ventas']['incremental']['watermark'] == 49
+
+    out = pd.read_csv(tmp_path / 'out' / 'ventas.csv')
+    assert sorted(out['id']) == list(range(1, 60))
+
+
+def test_incremental_reanuda_desde_ultimo_checkpoint(tmp_path):
+    db_path = _ventas_db(tmp_path / 'origen.db', n=50)
+    config = _incremental_config(tmp_path, db_path, chunk_size=10)
+
+    pipeline = DataIngestionPipeline(config)
+    original_load = pipeline.load_source
+    calls = {'n': 0}
+
+    def load_que_falla(*args, **kwargs):
+        calls['n'] += 1
+        if calls['n'] == 3:
+            raise RuntimeError('caída simulada')
+        return original_load(*args, **kwargs)
+
+    pipeline.load_source = load_que_falla
+    crashed = pipeline.run()
+    assert crashed['status'] == 'completed_with_errors'
+
+    resumed = DataIngestionPipeline(config).run()
+    assert resumed['source_metrics']['ventas']['incremental']['watermark'] == 20
+    assert resumed['total_records'] == 29
+
+    out = pd.read_csv(tmp_path / 'out' / 'ventas.csv')
+    assert sorted(out['id']) == list(range(1, 50))
+
+
+def test_incremental_archivo_sin_cambios_se_omite(tmp_path):
+    csv_path = _write_csv(tmp_path / 'a.csv', 5)
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {'a': {'type': 'csv', 'path': csv_path, 'incremental': True}},
+    }
+
+    assert DataIngestionPipeline(config).run()['total_records'] == 5
+    second = DataIngestionPipeline(config).run()
+    assert second['total_records'] == 0
+    assert second['source_metrics']['a']['incremental']['unchanged']
+
+    _write_csv(tmp_path / 'a.csv', 8)
+    third = DataIngestionPipeline(config).run()
+    assert third['total_records'] == 8
+    assert len(pd.read_csv(tmp_path / 'out' / 'a.csv')) == 8
+
+
+def test_motor_validacion_reporte_estructurado():
+    from scripts.pipelines.data_ingestion_pipeline import ValidationEngine
+
+    df = pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'precio': [10.0, -1.0, None, 500.0, 20.0],
+        'nombre': ['a', None, 'c', 'd', 'e'],
+    })
+    engine = ValidationEngine({
+        'required_columns': ['id', 'precio'],
+        'no_nulls': ['nombre', 'precio'],
+        'numeric_ranges': {'precio': {'min': 0, 'max': 100, 'severity': 'error'}},
+    })
+    report = engine.validate(df, row_offset=100)
+
+    assert not report['passed']
+    violations = {(v['rule'], v['column']): v for v in report['violations']}
+    rango = violations[('numeric_ranges', 'precio')]
+    assert rango['failed_rows'] == 2
+    assert rango['sample_rows'] == [101, 103]
+    assert violations[('no_nulls', 'nombre')]['severity'] == 'warning'
+    assert violations[('no_nulls', 'precio')]['sample_rows'] == [102]
+
+
+def test_validacion_por_chunk_con_severidad(tmp_path):
+    df = pd.DataFrame({'id': range(30), 'valor': [v if v != 25 else -5 for v in range(30)]})
+    df.to_csv(tmp_path / 'a.csv', index=False)
+    source = {
+        'type': 'csv', 'path': str(tmp_path / 'a.csv'), 'chunk_size': 10,
+        'validation': {'numeric_ranges': {'valor': (0, 100)}},
+    }
+    config = {'output_path': str(tmp_path / 'out'), 'data_sources': {'a': source}}
+
+    warned = DataIngestionPipeline(config).run()
+    summary = warned['source_metrics']['a']['validation']
+    assert warned['status'] == 'success'
+    assert summary['chunks'] == 3
+    assert summary['violations'][0]['sample_rows'] == [25]
+
+    source['validation']['severity'] = {'numeric_ranges': 'error'}
+    failed = DataIngestionPipeline(config).run()
+    assert failed['status'] == 'completed_with_errors'
+    assert failed['source_metrics']['a']['chunks'] == 2
+
+
+def test_plan_transformacion_fusionado_sin_copia():
+    df = pd.DataFrame({
+        'id': [1, 1, 2, 3],
+        'nombre': ['a', 'a', None, 'c'],
+        'monto': ['1.5', '1.5', '2.0', None],
+    })
+    plan = TransformPlan({
+        'remove_duplicates': ['id'],
+        'fill_nulls': {'nombre': 'N/A', 'monto': '0', 'inexistente': 0},
+        'rename_columns': {'nombre': 'cliente'},
+        'convert_types': {'monto': 'float64', 'inexistente': 'int64'},
+        'add_timestamp': True,
+    })
+    assert [step for step, _ in plan.steps] == [
+        'remove_duplicates', 'fill_nulls', 'rename_columns', 'convert_types', 'add_timestamp'
+    ]
+
+    result, report = plan.execute(df)
+
+    assert list(result.columns) == ['id', 'cliente', 'monto', 'ingestion_timestamp']
+    assert result['cliente'].tolist() == ['a', 'N/A', 'c']
+    assert result['monto'].tolist() == [1.5, 2.0, 0.0]
+    assert [r['step'] for r in report] == [step for step, _ in plan.steps]
+    assert report[0]['rows_in'] == 4 and report[0]['rows_out'] == 3
+    assert all(r['seconds'] >= 0 for r in report)
+
+
+def test_plan_sin_duplicados_opera_en_sitio():
+    df = pd.DataFrame({'id': [1, 2], 'valor': [None, 3.0]})
+    result, report = TransformPlan({
+        'remove_duplicates': True,
+        'fill_nulls': {'valor': 0.0},
+        'rename_columns': {'valor': 'importe'},
+    }).execute(df)
+
+    assert result is df
+    assert df['importe'].tolist() == [0.0, 3.0]
+    assert report[0]['memory_delta_bytes'] == 0
+
+
+def test_transform_data_no_modifica_el_original(tmp_path):
+    df = pd.DataFrame({'id': [1, 2], 'valor': [None, 3.0]})
+    pipeline = DataIngestionPipeline({'output_path': str(tmp_path)})
+
+    result = pipeline.transform_data(df, {
+        'fill_nulls': {'valor': 0.0},
+        'rename_columns': {'valor': 'importe'},
+        'convert_types': {'importe': 'float32'},
+    })
+
+    assert list(result.columns) == ['id', 'importe']
+    assert result['importe'].tolist() == [0.0, 3.0]
+    assert list(df.columns) == ['id', 'valor']
+    assert df['valor'].isna().iloc[0]
+
+
+def test_process_source_acumula_metricas_de_transformacion(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {
+            'ventas': {
+                'type': 'csv',
+                'path': _write_csv(tmp_path / 'ventas.csv', 10),
+                'chunk_size': 4,
+                'transformations': {'rename_columns': {'valor': 'importe'}, 'add_timestamp': True},
+            }
+        }
+    }
+    pipeline = DataIngestionPipeline(config)
+    outcome = pipeline.process_source('ventas', config['data_sources']['ventas'])
+
+    assert outcome['status'] == 'success'
+    steps = outcome['transform_steps']
+    assert set(steps) == {'rename_columns', 'add_timestamp'}
+    assert steps['rename_columns']['rows_in'] == 10
+
+
+def test_deduplicador_exacto_entre_chunks():
+    dedup = RowDeduplicator(columns=['id'])
+    first = dedup.filter(pd.DataFrame({'id': [1, 2, 2, 3], 'v': [1, 2, 3, 4]}))
+    second = dedup.filter(pd.DataFrame({'id': [3, 4, 1], 'v': [5, 6, 7]}))
+
+    assert first['v'].tolist() == [1, 2, 4]
+    assert second['id'].tolist() == [4]
+    assert dedup.seen == 4 and dedup.dropped == 3
+
+
+def test_deduplicador_bloom_persistente(tmp_path):
+    state = tmp_path / 'dedup.npz'
+    ids = pd.DataFrame({'id': range(5000)})
+    dedup = RowDeduplicator(method='bloom', capacity=10000, error_rate=0.01, state_path=str(state))
+    assert len(dedup.filter(ids)) >= 4900
+    dedup.save()
+
+    again = RowDeduplicator(method='bloom', capacity=10000, error_rate=0.01, state_path=str(state))
+    assert again.filter(ids).empty
+    assert again.memory_bytes == dedup.memory_bytes
+
+
+def test_process_source_deduplica_entre_ejecuciones(tmp_path):
+    path = tmp_path / 'ventas.csv'
+    pd.DataFrame({'id': [1, 2, 2, 3, 1, 4], 'valor': range(6)}).to_csv(path, index=False)
+    source = {
+        'type': 'csv', 'path': str(path), 'chunk_size': 2,
+        'deduplicate': {'columns': ['id'], 'persist': True},
+    }
+    config = {'output_path': str(tmp_path / 'out'), 'data_sources': {'ventas': source}}
+
+    outcome = DataIngestionPipeline(config).process_source('ventas', source)
+    assert outcome['records'] == 4
+    assert outcome['deduplication']['dropped'] == 2
+
+    pd.DataFrame({'id': [4, 5], 'valor': [6, 7]}).to_csv(path, index=False)
+    outcome = DataIngestionPipeline(config).process_source('ventas', source)
+    assert outcome['records'] == 1
+    # La salida conserva las filas de la ejecución anterior
+    salida = pd.read_csv(tmp_path / 'out' / 'ventas.csv')
+    assert salida['id'].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_carga_fallida_marca_fuente_como_fallida(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'data_sources': {
+            'a': {
+                'type': 'csv',
+                'path': _write_csv(tmp_path / 'a.csv'),
+                'output': {'type': 'database', 'path': str(tmp_path / 'no_existe' / 'x.db'), 'table': 't'}
+            },
+            'b': {'type': 'csv', 'path': _write_csv(tmp_path / 'b.csv'), 'depends_on': 'a'},
+        }
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['source_metrics']['a']['status'] == 'failed'
+    assert results['source_metrics']['b']['status'] == 'skipped'
+    assert results['total_records'] == 0
+    assert any('Error al cargar a' in error for error in results['errors'])
+
+
+def test_max_in_flight_invalido_falla(tmp_path):
+    config = {
+        'output_path': str(tmp_path / 'out'),
+        'execution': {'mode': 'concurrent', 'max_in_flight': 0},
+        'data_sources': {'a': {'type': 'csv', 'path': _write_csv(tmp_path / 'a.csv')}}
+    }
+    results = DataIngestionPipeline(config).run()
+
+    assert results['status'] == 'failed'
+    assert 'max_in_flight' in results['errors'][0]
+
+
+def test_streaming_fallido_no_deja_salida_parcial(tmp_path):
+    import sqlite3
+    df = pd.DataFrame({'id': range(30), 'valor': [v if v != 25 else -5 for v in range(30)]})
+    df.to_csv(tmp_path / 'a.csv', index=False)
+    db_path = str(tmp_path / 'destino.db')
+    source = {'type': 'csv', 'path': str(tmp_path / 'a.csv'), 'chunk_size': 10}
+    config = {'output_path': str(tmp_path / 'out'), 'data_sources': {'a': source}}
+
+    DataIngestionPipeline(config).run()
+    source['output'] = {'type': 'database', 'path': db_path, 'table': 'ventas', 'if_exists': 'append'}
+    DataIngestionPipeline(config).run()
+
+    source['validation'] = {
+        'numeric_ranges': {'valor': (0, 100)},
+        'severity': {'numeric_ranges': 'error'}
+    }
+    failed = DataIngestionPipeline(config).run()
+    source['output'] = {}
+    failed_csv = DataIngestionPipeline(config).run()
+
+    assert failed['status'] == failed_csv['status'] == 'completed_with_errors'
+    # Los chunks cargados antes del fallo no llegan al destino
+    assert len(pd.read_csv(tmp_path / 'out' / 'a.csv')) == 30
+    assert not list((tmp_path / 'out').glob('*.staging'))
+    with sqlite3.connect(db_path) as conn:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        assert tables == ['ventas']
+        assert conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0] == 30
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+import numpy as np
+from scripts.pipelines.hashed_keys import HashedKeySet
+
+
+def test_conjunto_fusiona_corridas_por_niveles():
+    keys = HashedKeySet()
+    rng = np.random.default_rng(0)
+    todos = rng.choice(2 ** 62, size=20_000, replace=False).astype(np.uint64)
+    for lote in np.array_split(todos, 200):
+        keys.add(lote[keys.first_unseen(lote)])
+
+    assert len(keys) == len(todos)
+    assert len(keys._runs) <= int(np.log2(len(todos))) + 1
+    tamanos = [len(run) for run in keys._runs]
+    assert tamanos == sorted(tamanos, reverse=True)
+    assert keys.contains(todos).all()
+    assert not keys.contains(np.array([2 ** 63 + 1], dtype=np.uint64)).any()
+    assert np.array_equal(keys.to_array(), np.sort(todos))
+
+
+def test_first_unseen_descarta_repetidos_y_vistos():
+    keys = HashedKeySet(np.array([5, 9], dtype=np.uint64))
+    hashes = np.array([7, 5, 7, 1, 9, 1], dtype=np.uint64)
+
+    assert keys.first_unseen(hashes).tolist() == [0, 3]
+    assert len(keys) == 2
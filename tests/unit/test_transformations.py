@@ -20,12 +20,23 @@ import os
 # Agregar ruta al path para importar módulos
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../scripts/transformaciones')))
 
-# Importar funciones a testear (descomentar cuando existan)
-# from data_transformations import (
-#     limpiar_columnas_texto,
-#     validar_emails,
-#     eliminar_outliers
-# )
+# Importar funciones a testear
+from data_transformations import (
+    limpiar_columnas_texto,
+    validar_emails,
+    eliminar_outliers,
+    normalizar_fechas,
+    crear_columnas_temporales,
+    imputar_valores_faltantes,
+    estandarizar_columnas,
+    codificar_categoricas,
+    PlanTransformaciones,
+    Estandarizador,
+    ImputadorFaltantes,
+    EliminadorOutliers,
+    SketchKLL,
+    ParserFechas
+)
 
 
 class TestLimpiezaDatos:
@@ -58,6 +69,64 @@ class TestLimpiezaDatos:
         assert df_ejemplo['salario'].dtype in ['int64', 'int32']
 
 
+class TestMotorTexto:
+    """Tests para la limpieza de texto y validación de emails por valores distintos"""
+    
+    @pytest.fixture
+    def df_texto(self):
+        """Fixture con texto repetido, nulos y columnas no textuales"""
+        return pd.DataFrame({
+            'nombre': ['  Juan  ', 'MARÍA', None, np.nan, 'MARÍA', ' Ana\t'],
+            'ciudad': ['LIMA ', 'lima', ' Quito', 'LIMA ', None, 'Bogotá'],
+            'codigo': [1.0, 2.5, None, 4.0, 2.5, 6.0],
+            'email': ['juan@example.com', 'invalido', None, 'ANA@demo.co', 'test@', 'juan@example.com']
+        })
+    
+    @pytest.mark.parametrize('motor', ['auto', 'python'])
+    def test_limpieza_equivale_a_str(self, df_texto, motor):
+        """Test que la limpieza por distintos coincide con astype(str).str.strip().str.lower()"""
+        columnas = ['nombre', 'ciudad', 'codigo']
+        resultado = limpiar_columnas_texto(df_texto, columnas, motor=motor)
+        
+        for col in columnas:
+            esperado = df_texto[col].astype(str).str.strip().str.lower()
+            assert resultado[col].tolist() == esperado.tolist()
+        assert df_texto['nombre'].iloc[0] == '  Juan  '  # la entrada no se modifica
+    
+    @pytest.mark.parametrize('motor', ['auto', 'python'])
+    def test_validacion_email_por_distintos(self, df_texto, motor):
+        """Test que la validación coincide con el patrón aplicado por fila"""
+        resultado = validar_emails(df_texto, 'email', motor=motor)
+        
+        assert resultado['email_valido'].tolist() == [True, False, False, True, False, True]
+    
+    def test_auto_conserva_la_semantica_de_python(self):
+        """Test que 'auto' coincide con str/re en casos donde Arrow difiere"""
+        df = pd.DataFrame({'texto': ['ΟΔΟΣ', 'İstanbul'], 'email': ['a@b.co\n', 'a@b.co']})
+        
+        limpio = limpiar_columnas_texto(df, ['texto'], motor='auto')
+        validado = validar_emails(df, 'email', motor='auto')
+        
+        assert limpio['texto'].tolist() == [valor.strip().lower() for valor in df['texto']]
+        assert validado['email_valido'].tolist() == [True, True]
+    
+    def test_motor_arrow_difiere_en_unicode_y_regex(self):
+        """Test que documenta las diferencias del motor 'arrow'"""
+        pytest.importorskip('pyarrow')
+        df = pd.DataFrame({'texto': ['ΟΔΟΣ', 'İstanbul'], 'email': ['a@b.co\n', 'a@b.co']})
+        
+        limpio = limpiar_columnas_texto(df, ['texto'], motor='arrow')
+        validado = validar_emails(df, 'email', motor='arrow')
+        
+        assert limpio['texto'].tolist() == ['οδοσ', 'istanbul']
+        assert validado['email_valido'].tolist() == [False, True]
+    
+    def test_motor_invalido(self, df_texto):
+        """Test que un motor desconocido falla"""
+        with pytest.raises(ValueError):
+            limpiar_columnas_texto(df_texto, ['nombre'], motor='numba')
+
+
 class TestValidacionDatos:
     """Tests para funciones de validación"""
     
@@ -143,6 +212,115 @@ class TestTransformacionFechas:
         assert list(df['dia']) == [15, 20, 25]
 
 
+class TestParserFechas:
+    """Tests para el parser de fechas con formato inferido y caché"""
+    
+    def test_formato_inferido_y_memoizado(self):
+        """Test que el formato se infiere una vez y los valores se memorizan"""
+        parser = ParserFechas(dayfirst=True)
+        chunk_1 = pd.Series(['25/01/2024', '26/01/2024', '25/01/2024', None])
+        chunk_2 = pd.Series(['26/01/2024', '27/01/2024'])
+        
+        fechas_1 = parser.parsear(chunk_1)
+        fechas_2 = parser.parsear(chunk_2)
+        
+        assert parser.formato == '%d/%m/%Y'
+        assert fechas_1.iloc[0] == pd.Timestamp('2024-01-25')
+        assert pd.isna(fechas_1.iloc[3])
+        assert fechas_2.iloc[1] == pd.Timestamp('2024-01-27')
+        assert len(parser._claves) == 3  # solo valores distintos
+    
+    def test_formatos_mezclados(self):
+        """Test que los valores que no encajan con el formato inferido se recuperan"""
+        df = pd.DataFrame({'fecha': ['2024-01-05', '2024-01-06', 'Jan 7, 2024', 'invalida']})
+        
+        resultado = normalizar_fechas(df, 'fecha')
+        
+        assert resultado['fecha'].iloc[2] == pd.Timestamp('2024-01-07')
+        assert resultado['fecha'].isnull().sum() == 1
+    
+    def test_formato_explicito_se_exige(self):
+        """Test que un formato explícito no recurre al parseo mixto"""
+        parser = ParserFechas('%Y-%m-%d')
+        
+        fechas = parser.parsear(pd.Series(['2024-01-05', 'Jan 7, 2024']))
+        
+        assert fechas.iloc[0] == pd.Timestamp('2024-01-05')
+        assert pd.isna(fechas.iloc[1])
+        with pytest.raises(ValueError):
+            parser.parsear(pd.Series(['Jan 7, 2024']), errors='raise')
+    
+    def test_zona_horaria_conservada(self):
+        """Test que las fechas con offset conservan la zona (UTC si difieren)"""
+        iguales = ParserFechas().parsear(pd.Series(['2024-01-01 10:00:00+01:00'] * 2))
+        distintos = ParserFechas().parsear(
+            pd.Series(['2024-01-01 10:00:00+01:00', '2024-01-01 10:00:00+02:00'])
+        )
+        
+        assert iguales.dt.tz is not None
+        assert iguales.iloc[0] == pd.Timestamp('2024-01-01 09:00', tz='UTC')
+        assert iguales.iloc[0].hour == 10
+        assert str(distintos.dt.tz) == 'UTC'
+        assert distintos.tolist() == [pd.Timestamp('2024-01-01 09:00', tz='UTC'),
+                                      pd.Timestamp('2024-01-01 08:00', tz='UTC')]
+    
+    def test_valores_distintos_con_el_mismo_texto(self):
+        """Test que date y str con el mismo texto comparten entrada de caché"""
+        from datetime import date
+        parser = ParserFechas()
+        serie = pd.Series([date(2024, 1, 1), '2024-01-01', '2024-01-02', None], dtype=object)
+        
+        primera = parser.parsear(serie)
+        segunda = parser.parsear(serie)
+        
+        pd.testing.assert_series_equal(primera, segunda)
+        assert primera.iloc[0] == primera.iloc[1] == pd.Timestamp('2024-01-01')
+        assert len(parser._claves) == 2
+    
+    def test_zona_resuelta_por_llamada(self):
+        """Test que un chunk sin zona sigue sin zona tras un chunk con offset"""
+        parser = ParserFechas()
+        sin_zona = pd.Series(['2024-01-01 10:00:00'] * 2)
+        
+        antes = parser.parsear(sin_zona)
+        con_zona = parser.parsear(pd.Series(['2024-01-01 10:00:00+01:00'] * 2))
+        despues = parser.parsear(sin_zona)
+        
+        assert antes.dtype == despues.dtype == 'datetime64[ns]'
+        assert con_zona.dt.tz is not None
+    
+    def test_columna_casi_sin_repetidos_no_usa_cache(self):
+        """Test que los valores casi únicos se parsean sin memorizarse"""
+        parser = ParserFechas()
+        serie = pd.Series(pd.date_range('2024-01-01', periods=1000, freq='h').astype(str))
+        
+        fechas = parser.parsear(serie)
+        
+        assert (fechas == pd.to_datetime(serie)).all()
+        assert len(parser._claves) == 0
+    
+    def test_componentes_enteros_compactos(self):
+        """Test de columnas derivadas contra .dt (incluye bordes de semana ISO)"""
+        fechas = pd.Series(pd.date_range('2019-12-25', '2027-01-10', freq='D'))
+        df = pd.DataFrame({'fecha': fechas})
+        
+        resultado = crear_columnas_temporales(df, 'fecha')
+        
+        assert resultado['fecha_anio'].dtype == np.int16
+        assert resultado['fecha_semana'].dtype == np.int8
+        assert (resultado['fecha_anio'] == fechas.dt.year).all()
+        assert (resultado['fecha_dia_semana'] == fechas.dt.dayofweek).all()
+        assert (resultado['fecha_trimestre'] == fechas.dt.quarter).all()
+        assert (resultado['fecha_semana'] == fechas.dt.isocalendar().week.astype(int)).all()
+    
+    def test_fechas_invalidas_en_columnas_temporales(self):
+        """Test que crear_columnas_temporales rechaza fechas no reconocidas"""
+        df = pd.DataFrame({'fecha': ['2024-01-05', 'invalida']})
+        
+        with pytest.raises(ValueError):
+            crear_columnas_temporales(df, 'fecha')
+
+
 class TestAgregaciones:
     """Tests para funciones de agregación"""
     
@@ -239,6 +417,248 @@ class TestCodificacion:
         assert df['categoria_encoded'].nunique() == 3
 
 
+class TestPlanTransformaciones:
+    """Tests para el plan perezoso de transformaciones"""
+    
+    @pytest.fixture
+    def df_clientes(self):
+        """Fixture con datos de clientes"""
+        return pd.DataFrame({
+            'nombre': ['  Juan  ', 'MARÍA', 'pedro  ', 'ANA'],
+            'edad': [25, np.nan, 35, 28],
+            'segmento': ['a', 'b', 'a', 'c'],
+            'notas': ['x', 'y', 'z', 'w']
+        })
+    
+    def test_equivale_a_encadenar_funciones(self, df_clientes):
+        """Test que el plan produce lo mismo que las funciones encadenadas"""
+        esperado = limpiar_columnas_texto(df_clientes, ['nombre'])
+        esperado = imputar_valores_faltantes(esperado, {'edad': 'mean'})
+        esperado = estandarizar_columnas(esperado, ['edad'])
+        esperado = codificar_categoricas(esperado, ['segmento'])
+        
+        plan = (PlanTransformaciones()
+                .limpiar_columnas_texto(['nombre'])
+                .imputar_valores_faltantes({'edad': 'mean'})
+                .estandarizar_columnas(['edad'])
+                .codificar_categoricas(['segmento']))
+        
+        pd.testing.assert_frame_equal(plan.ejecutar(df_clientes), esperado)
+        assert df_clientes['nombre'].iloc[0] == '  Juan  '  # la entrada no se modifica
+    
+    def test_onehot_no_poda_columnas_con_su_prefijo(self):
+        """Test que una columna de entrada con el prefijo one-hot se conserva"""
+        df = pd.DataFrame({'a': ['x', 'y', 'x'], 'a_b': [1, 2, 3]})
+        plan = PlanTransformaciones().codificar_categoricas(['a']).seleccionar(['a_b', 'a_y'])
+        
+        resultado = plan.ejecutar(df)
+        
+        assert plan.compilar()[1] is None
+        assert resultado['a_b'].tolist() == [1, 2, 3]
+        assert resultado['a_y'].tolist() == [False, True, False]
+    
+    def test_fusion_y_poda(self, df_clientes):
+        """Test que se fusionan pasos y se descartan los que no llegan a la salida"""
+        plan = (PlanTransformaciones()
+                .limpiar_columnas_texto(['nombre'])
+                .limpiar_columnas_texto(['notas'])
+                .imputar_valores_faltantes({'edad': 'median'})
+                .estandarizar_columnas(['edad'])
+                .seleccionar(['nombre', 'edad_std']))
+        
+        pasos, _ = plan.compilar()
+        
+        assert pasos == [
+            ('limpiar_texto', ['nombre']),
+            ('imputar', {'edad': 'median'}),
+            ('estandarizar', ['edad'])
+        ]
+        assert plan.columnas_requeridas() == ['edad', 'nombre']
+        
+        resultado = plan.ejecutar(df_clientes)
+        assert list(resultado.columns) == ['nombre', 'edad_std']
+        assert resultado['nombre'].tolist() == ['juan', 'maría', 'pedro', 'ana']
+    
+    def test_imputaciones_de_la_misma_columna_no_se_fusionan(self):
+        """Test que solo se fusionan imputaciones sobre columnas disjuntas"""
+        df = pd.DataFrame({'a': [np.nan, 1.0, np.nan], 'b': [np.nan, np.nan, np.nan]})
+        plan = (PlanTransformaciones()
+                .imputar_valores_faltantes({'a': 'forward', 'b': 'mean'})
+                .imputar_valores_faltantes({'a': 'backward', 'b': 0}))
+        
+        resultado = plan.ejecutar(df)
+        
+        assert len(plan.compilar()[0]) == 2
+        assert resultado['a'].tolist() == [1.0, 1.0, 1.0]
+        assert resultado['b'].tolist() == [0, 0, 0]
+        
+        plan = (PlanTransformaciones()
+                .imputar_valores_faltantes({'a': 'forward'})
+                .imputar_valores_faltantes({'b': 0}))
+        assert plan.compilar()[0] == [('imputar', {'a': 'forward', 'b': 0})]
+    
+    def test_fechas_se_parsean_una_vez(self):
+        """Test de fusión de normalizar_fechas y crear_columnas_temporales"""
+        df = pd.DataFrame({'fecha': ['2024-01-15', '2024-06-20', 'invalida']})
+        plan = (PlanTransformaciones()
+                .normalizar_fechas('fecha', formato='%Y-%m-%d')
+                .crear_columnas_temporales('fecha'))
+        
+        pasos, _ = plan.compilar()
+        resultado = plan.ejecutar(df)
+        
+        assert len(pasos) == 1
+        assert resultado['fecha_mes'].tolist()[:2] == [1, 6]
+        assert resultado['fecha'].isnull().sum() == 1
+    
+    def test_ejecucion_por_chunks(self, df_clientes):
+        """Test de ejecución chunk a chunk"""
+        plan = PlanTransformaciones().limpiar_columnas_texto(['nombre']).seleccionar(['nombre'])
+        chunks = [df_clientes.iloc[:2], df_clientes.iloc[2:]]
+        
+        resultado = pd.concat(plan.ejecutar_por_chunks(chunks))
+        
+        assert resultado['nombre'].tolist() == ['juan', 'maría', 'pedro', 'ana']
+
+
+class TestTransformadoresAjustables:
+    """Tests para transformadores con estado ajustado en una pasada"""
+    
+    @pytest.fixture
+    def chunks(self):
+        """Fixture con un DataFrame partido en chunks"""
+        rng = np.random.default_rng(7)
+        valores = rng.normal(100, 15, 5000)
+        valores[::37] = np.nan
+        df = pd.DataFrame({
+            'monto': valores,
+            'categoria': rng.choice(['a', 'b', 'c'], 5000, p=[0.2, 0.5, 0.3])
+        })
+        return df, [df.iloc[i:i + 700] for i in range(0, len(df), 700)]
+    
+    def test_estandarizador_usa_estadisticas_globales(self, chunks):
+        """Test que ajustar por chunks equivale a ajustar todo el DataFrame"""
+        df, partes = chunks
+        est = Estandarizador(['monto']).ajustar(partes)
+        
+        resultado = pd.concat(est.transformar(parte) for parte in partes)
+        esperado = estandarizar_columnas(df, ['monto'])
+        
+        np.testing.assert_allclose(resultado['monto_std'], esperado['monto_std'])
+    
+    def test_imputador_mediana_y_moda(self, chunks):
+        """Test de mediana (t-digest) y moda (count-min) en una pasada"""
+        df, partes = chunks
+        df = df.assign(categoria=df['categoria'].mask(df.index % 11 == 0))
+        imputador = ImputadorFaltantes({'monto': 'median', 'categoria': 'mode'})
+        imputador.ajustar(df.iloc[i:i + 700] for i in range(0, len(df), 700))
+        
+        valores = imputador.valores_imputacion()
+        
+        assert valores['monto'] == pytest.approx(df['monto'].median(), rel=0.01)
+        assert valores['categoria'] == 'b'
+        assert not imputador.transformar(df).isnull().any().any()
+    
+    def test_moda_con_enteros_y_decimales_equivalentes(self):
+        """Test que 2 y 2.0 cuentan como el mismo valor en el count-min"""
+        imputador = ImputadorFaltantes({'x': 'mode'})
+        imputador.ajustar([
+            pd.DataFrame({'x': [1, 2, 2, 3]}),
+            pd.DataFrame({'x': [2.0, 1.0, np.nan]}),
+        ])
+        
+        assert imputador.valores_imputacion()['x'] == 2
+    
+    def test_moda_de_fechas_serializable(self, tmp_path):
+        """Test de guardar/cargar un imputador de moda con candidatos Timestamp"""
+        fechas = pd.Series(pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-02', None]))
+        df = pd.DataFrame({'f': fechas, 'z': fechas.dt.tz_localize('Europe/Madrid')})
+        imputador = ImputadorFaltantes({'f': 'mode', 'z': 'mode'}).ajustar([df])
+        
+        ruta = tmp_path / 'moda.json'
+        imputador.guardar(str(ruta))
+        cargado = ImputadorFaltantes.cargar(str(ruta))
+        
+        assert cargado.valores_imputacion() == {
+            'f': pd.Timestamp('2024-01-02'),
+            'z': pd.Timestamp('2024-01-02', tz='Europe/Madrid'),
+        }
+        assert not cargado.transformar(df).isnull().any().any()
+    
+    def test_estado_serializable_y_combinable(self, chunks, tmp_path):
+        """Test de guardar/cargar y combinar ajustes de varios workers"""
+        df, partes = chunks
+        eliminador = EliminadorOutliers('monto').ajustar(partes[:3])
+        eliminador.combinar(EliminadorOutliers('monto').ajustar(partes[3:]))
+        
+        ruta = tmp_path / 'outliers.json'
+        eliminador.guardar(str(ruta))
+        cargado = EliminadorOutliers.cargar(str(ruta))
+        
+        q1, q3 = df['monto'].quantile([0.25, 0.75])
+        inferior, superior = cargado.limites()
+        assert inferior == pytest.approx(q1 - 1.5 * (q3 - q1), rel=0.02)
+        assert superior == pytest.approx(q3 + 1.5 * (q3 - q1), rel=0.02)
+        assert len(cargado.transformar(df)) <= len(df)
+    
+    def test_transformar_sin_ajustar(self):
+        """Test que transformar sin ajustar falla"""
+        with pytest.raises(ValueError):
+            Estandarizador(['monto']).transformar(pd.DataFrame({'monto': [1.0]}))
+        with pytest.raises(ValueError):
+            ImputadorFaltantes({'monto': 'mean'}).transformar(pd.DataFrame({'monto': [np.nan]}))
+        
+        # Las estrategias sin ajuste no lo requieren
+        resultado = ImputadorFaltantes({'monto': 0.0}).transformar(pd.DataFrame({'monto': [np.nan]}))
+        assert resultado['monto'].tolist() == [0.0]
+
+
+class TestOutliersConSketch:
+    """Tests para el backend de cuantiles aproximados de eliminar_outliers"""
+    
+    def test_error_de_rango_acotado_y_combinable(self):
+        """Test que el sketch KLL respeta el error de rango al combinar partes"""
+        valores = np.random.default_rng(3).lognormal(0, 1, 200000)
+        ordenados = np.sort(valores)
+        
+        sketch = SketchKLL(error=0.01, semilla=1)
+        for parte in np.array_split(valores, 4):
+            parcial = SketchKLL(error=0.01, semilla=2)
+            parcial.actualizar(parte)
+            sketch.combinar(parcial)
+        
+        assert sketch.n == len(valores)
+        for q in (0.25, 0.5, 0.75):
+            rango = np.searchsorted(ordenados, sketch.cuantil(q)) / len(valores)
+            assert abs(rango - q) < 0.01
+    
+    def test_retorno_mascara_e_indices(self):
+        """Test de retorno como máscara o posiciones en vez de copia"""
+        df = pd.DataFrame({'valor': [1, 2, 3, 4, 5, 6, 7, 8, 9, 100]})
+        
+        mascara = eliminar_outliers(df, 'valor', retorno='mascara', informar=False)
+        indices = eliminar_outliers(df, 'valor', backend='kll', retorno='indices', informar=False)
+        filtrado = eliminar_outliers(df, 'valor', informar=False)
+        
+        assert mascara.tolist() == [True] * 9 + [False]
+        assert indices.tolist() == list(range(9))
+        assert 100 not in filtrado['valor'].values
+    
+    def test_sketch_ajustado_en_eliminador(self, tmp_path):
+        """Test del backend KLL en EliminadorOutliers con estado serializado"""
+        df = pd.DataFrame({'valor': np.r_[np.arange(1000, dtype=float), 1e6]})
+        eliminador = EliminadorOutliers('valor', backend='kll').ajustar(
+            [df.iloc[:500], df.iloc[500:]]
+        )
+        ruta = tmp_path / 'kll.json'
+        eliminador.guardar(str(ruta))
+        
+        indices = EliminadorOutliers.cargar(str(ruta)).transformar(df, retorno='indices', informar=False)
+        
+        assert len(indices) == 1000
+        assert 1000 not in indices
+
+
 # Tests de integración
 class TestPipelineCompleto:
     """Tests de integración para pipeline completo"""